@@ -38,6 +38,10 @@ ALLOWED_HOSTS = ['*']
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Internal nginx location of MEDIA_ROOT (e.g. /protected-media/). When set,
+# media requests are answered with X-Accel-Redirect and nginx sends the file;
+# requests reaching the API without going through that nginx get an empty body.
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', default='')
 
 # Application definition
 
@@ -93,13 +97,23 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# DB_POOL_MODE=pgbouncer together with DB_HOST=pgbouncer, the transaction
+# pooling service started with the `pooled` profile of docker-compose.yml and
+# docker-compose.prod.yml. Server-side cursors do not survive across pooled
+# transactions and are disabled in that mode.
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', default='')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', default=''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': bool(int(os.environ.get('DB_CONN_HEALTH_CHECKS', default=1))),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_POOL_MODE == 'pgbouncer',
     }
 }
 
@@ -152,3 +166,67 @@ EMAIL_HOST_USER = ''
 EMAIL_HOST_PASSWORD = ''
 EMAIL_USE_TLS = True
 EMAIL_PORT = 587
+
+# Timeframe slot generation
+BOOKING_SLOT_CHUNK_SIZE = int(os.environ.get('BOOKING_SLOT_CHUNK_SIZE', default=2000))
+BOOKING_SLOT_WRITER = os.environ.get('BOOKING_SLOT_WRITER', default='copy')
+BOOKING_SLOT_BACKGROUND_THRESHOLD = int(os.environ.get('BOOKING_SLOT_BACKGROUND_THRESHOLD', default=5000))
+BOOKING_SLOT_MAX_ATTEMPTS = int(os.environ.get('BOOKING_SLOT_MAX_ATTEMPTS', default=5))
+BOOKING_SLOT_RETRY_DELAY = int(os.environ.get('BOOKING_SLOT_RETRY_DELAY', default=10))
+
+# Keyset pagination of the booking, timeframe and equipment lists
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', default=100))
+
+# Response cache of the public laboratory endpoints, also used to revoke
+# cached tokens. Invalidations must reach every gunicorn worker and the
+# worker containers, so deployments use CACHE_BACKEND=redis (see the redis
+# service of docker-compose.yml) or db (the cache table of the database,
+# created by createcachetable). The local memory cache is per process and
+# only meant for tests and a single runserver process.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', default='locmem')
+CACHE_BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+CACHE_LOCATIONS = {
+    'redis': 'redis://redis:6379/0',
+    'db': 'booking_cache',
+    'file': '/tmp/booking_cache',
+    'locmem': 'booking',
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get('CACHE_LOCATION', default=CACHE_LOCATIONS[CACHE_BACKEND]),
+    }
+}
+if CACHE_BACKEND != 'redis':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', default=10000))}
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', default=300))
+
+# Email outbox, delivered by the send_queued_emails worker
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', default=50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.environ.get('EMAIL_OUTBOX_RETRY_DELAY', default=30))
+# Seconds a worker may take to send its batch before another one claims it again
+EMAIL_OUTBOX_LEASE = int(os.environ.get('EMAIL_OUTBOX_LEASE', default=600))
+
+# In-process cache of authenticated tokens, see users.authentication
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', default=10000))
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', default=60))
+
+# Rows fetched per round trip by the streaming booking exports
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', default=2000))
+
+# Resumable uploads of laboratory content videos, see booking.uploads. Partial
+# files are kept out of MEDIA_ROOT and deleted after CHUNKED_UPLOAD_EXPIRATION
+# seconds without a new chunk.
+CHUNKED_UPLOAD_ROOT = os.environ.get('CHUNKED_UPLOAD_ROOT', default=os.path.join(BASE_DIR, 'chunked_uploads'))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', default=4 * 1024 ** 3))
+CHUNKED_UPLOAD_EXPIRATION = int(os.environ.get('CHUNKED_UPLOAD_EXPIRATION', default=24 * 60 * 60))
+
+# Unreferenced media files younger than this are kept by collect_media_garbage
+MEDIA_GC_GRACE_PERIOD = int(os.environ.get('MEDIA_GC_GRACE_PERIOD', default=24 * 60 * 60))
@@ -0,0 +1,61 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.models import Booking
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+import uuid
+
+GRANTED = 'granted'
+INVALID = 'invalid'
+NOT_STARTED = 'not_started'
+ENDED = 'ended'
+
+
+def parse_access_key(access_key):
+    """Return the access key as a UUID, None when it is missing or malformed"""
+    try:
+        return uuid.UUID(str(access_key))
+    except ValueError:
+        return None
+
+
+def access_queryset(access_key, password, now=None):
+    """Bookings opened by the access key and password right now, in a single query"""
+    now = now or timezone.now()
+    return Booking.objects.filter(Q(public=True) | Q(password=password), access_key=access_key,
+                                  start_date__lte=now, end_date__gt=now)
+
+
+def check_access(access_key, password, now=None):
+    """
+    Return the access verdict of a booking as a dict.
+
+    The booking is fetched by its unique access key with one query. Private
+    bookings also need the password. The reason is only specific (not
+    started or ended) once the key and password are valid.
+    """
+    now = now or timezone.now()
+    access_key = parse_access_key(access_key)
+    booking = None
+
+    if access_key is not None:
+        booking = Booking.objects.filter(access_key=access_key)\
+            .values('public', 'password', 'start_date', 'end_date').first()
+
+    if booking is None or not (booking['public'] or constant_time_compare(booking['password'] or '', password or '')):
+        return {'granted': False, 'reason': INVALID}
+
+    verdict = {'start_date': booking['start_date'], 'end_date': booking['end_date']}
+
+    if now < booking['start_date']:
+        return dict(verdict, granted=False, reason=NOT_STARTED)
+
+    if now >= booking['end_date']:
+        return dict(verdict, granted=False, reason=ENDED)
+
+    return dict(verdict, granted=True, reason=GRANTED, expires_in=int((booking['end_date'] - now).total_seconds()))
@@ -5,6 +5,7 @@ Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 """
 
 from django.contrib import admin
+from booking.materialization import requeue_failed_timeframes
 from booking.models import Booking, Equipment, Laboratory, TimeFrame, LaboratoryContent
 from core import models
 
@@ -26,8 +27,15 @@ class BookingAdmin(admin.ModelAdmin):
 
 class TimeFrameAdmin(admin.ModelAdmin):
     ordering = ['id']
-    list_display = ['id', 'start_date', 'end_date', 'start_hour', 'end_hour', 'slot_duration', 'equipment', 'enabled', 'owner']
+    list_display = ['id', 'start_date', 'end_date', 'start_hour', 'end_hour', 'slot_duration', 'equipment', 'enabled', 'owner',
+                    'status', 'materialized_slots', 'total_slots', 'materialization_attempts', 'next_attempt_date']
     search_fields = ['owner__email']
+    actions = ['requeue_materialization']
+
+    @admin.action(description='Retry the materialization of failed timeframes')
+    def requeue_materialization(self, request, queryset):
+        requeued = requeue_failed_timeframes(list(queryset.values_list('id', flat=True)))
+        self.message_user(request, f'Requeued {requeued} timeframes')
 
 class LaboratoryContentAdmin(admin.ModelAdmin):
     ordering = ['id']
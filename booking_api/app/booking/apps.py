@@ -9,3 +9,6 @@ from django.apps import AppConfig
 
 class BookingConfig(AppConfig):
     name = 'booking'
+
+    def ready(self):
+        from booking import signals  # noqa: F401
@@ -0,0 +1,129 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from asgiref.sync import sync_to_async
+from booking.access import access_queryset, parse_access_key
+from booking.models import Booking
+from booking.pagination import SlotPagination, StartDatePagination
+from booking.serializers import BookingSerializer, serialize_bookings_and_slots
+from booking.views import BookingRangeMixin
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+from users.authentication import CachedTokenAuthentication
+
+
+class AsyncListAPIView(View):
+    """
+    Read-only list endpoint with an async handler, for serving under ASGI.
+
+    DRF views are sync only, so this keeps the query parameters, serializers,
+    token authentication and keyset pagination of the sync views but runs
+    the queries with the async ORM. A request waiting on the database does
+    not hold a worker thread.
+    """
+
+    serializer_class = None
+    pagination_class = None
+    authentication_class = CachedTokenAuthentication
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def unauthorized(self, detail):
+        response = JsonResponse({'detail': detail}, status=401)
+        response['WWW-Authenticate'] = self.authentication_class().authenticate_header(self.request)
+        return response
+
+    async def authenticate(self):
+        """Authenticate the request, return an error response when it is not"""
+        if self.authentication_class is None:
+            return None
+
+        try:
+            result = await self.authentication_class().aauthenticate(self.request)
+        except AuthenticationFailed as error:
+            return self.unauthorized(error.detail)
+
+        if result is None:
+            return self.unauthorized(NotAuthenticated.default_detail)
+
+        self.request.user, self.request.auth = result
+        return None
+
+    async def list(self):
+        queryset = self.get_queryset()
+
+        if self.pagination_class is not None:
+            paginator = self.pagination_class()
+            page = await paginator.apaginate_queryset(queryset, self.request)
+            if page is not None:
+                return paginator.get_paginated_data(self.serializer_class(page, many=True).data)
+
+        return self.serializer_class([item async for item in queryset], many=True).data
+
+    async def get(self, request, *args, **kwargs):
+        self.request = Request(request)
+
+        error = await self.authenticate()
+        if error is not None:
+            return error
+
+        try:
+            return JsonResponse(await self.list(), safe=False)
+        except APIException as error:
+            # Raised by the query parameters and the paginator, e.g. an invalid cursor
+            return JsonResponse({'detail': error.detail}, status=error.status_code)
+
+
+class AsyncBookingList(BookingRangeMixin, AsyncListAPIView):
+    """Async version of BookingList (GET only)"""
+
+    serializer_class = BookingSerializer
+    pagination_class = SlotPagination
+
+    def get_queryset(self):
+        return self.filter_range(Booking.objects.filter(available=True))
+
+    async def list(self):
+        queryset = self.get_queryset()
+        paginator = self.pagination_class()
+
+        page = await paginator.apaginate_slots(queryset, self.get_virtual_slots, self.request)
+        if page is not None:
+            return paginator.get_paginated_data(serialize_bookings_and_slots(page, self.serializer_class))
+
+        slots = await sync_to_async(self.get_virtual_slots)()
+        items = paginator.sort([booking async for booking in queryset] + slots)
+        return serialize_bookings_and_slots(items, self.serializer_class)
+
+
+class AsyncBookingUserList(AsyncListAPIView):
+    """Async version of BookingUserList"""
+
+    serializer_class = BookingSerializer
+    pagination_class = StartDatePagination
+
+    def get_queryset(self):
+        return Booking.objects.filter(reserved_by=self.request.user.id)
+
+
+class AsyncBookingAccess(AsyncListAPIView):
+    """Async version of BookingAccess"""
+
+    serializer_class = BookingSerializer
+    authentication_class = None
+
+    async def list(self):
+        access_key = parse_access_key(self.request.query_params.get('access_key'))
+        password = self.request.query_params.get('pwd')
+
+        if access_key is None:
+            return []
+
+        queryset = access_queryset(access_key, password)
+        return self.serializer_class([booking async for booking in queryset], many=True).data
@@ -0,0 +1,143 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.cache import LABORATORIES_SCOPE, invalidate_on_commit, laboratory_scope
+from booking.models import Booking, Laboratory, LaboratoryAvailability, TimeFrame
+from booking.slots import SlotSchedule, iter_open_virtual_slots
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from datetime import timedelta
+from itertools import islice
+
+
+def compute_laboratory_availability(laboratory_id, now=None):
+    """
+    Return (next_free_slot, open_slots) for the future slots of a laboratory.
+
+    Stored slots are counted with one aggregate query. Slots of virtual
+    timeframes are counted arithmetically from their rules, minus the slots
+    that already have a Booking row.
+    """
+    now = now or timezone.now()
+
+    stored = Booking.objects.filter(equipment__laboratory_id=laboratory_id, timeframe__enabled=True,
+                                    available=True, start_date__gt=now)\
+        .aggregate(open_slots=Count('id'), next_free_slot=Min('start_date'))
+    open_slots = stored['open_slots']
+
+    timeframes = virtual_laboratory_timeframes(laboratory_id, now)\
+        .annotate(taken=Count('tf_reservations', filter=Q(tf_reservations__start_date__gt=now)))
+
+    for timeframe in timeframes:
+        schedule = SlotSchedule.from_timeframe(timeframe)
+        open_slots += max(schedule.count_between(now + timedelta(microseconds=1), schedule_end(schedule))
+                          - timeframe.taken, 0)
+
+    return first_free_slot(stored['next_free_slot'], timeframes, now), open_slots
+
+
+def virtual_laboratory_timeframes(laboratory_id, now):
+    return TimeFrame.objects.filter(equipment__laboratory_id=laboratory_id, enabled=True, virtual=True,
+                                    end_date__gte=now - timedelta(days=1))
+
+
+def schedule_end(schedule):
+    return schedule.first_day + timedelta(days=schedule.number_of_days + 1)
+
+
+def first_free_slot(next_stored_slot, timeframes, now):
+    """Earliest of next_stored_slot and the first open slot of each virtual timeframe after now"""
+    next_free_slot = next_stored_slot
+
+    for timeframe in timeframes:
+        schedule = SlotSchedule.from_timeframe(timeframe)
+        # Stops at the first slot without a Booking row, the rows are looked up a few at a time
+        for _, slot_start, _ in islice(iter_open_virtual_slots(timeframe, now + timedelta(microseconds=1),
+                                                               schedule_end(schedule), batch_size=50), 1):
+            if next_free_slot is None or slot_start < next_free_slot:
+                next_free_slot = slot_start
+
+    return next_free_slot
+
+
+def find_next_free_slot(laboratory_id, now):
+    """Start of the next free slot of a laboratory, with an indexed lookup instead of an aggregate"""
+    next_stored_slot = Booking.objects.filter(equipment__laboratory_id=laboratory_id, timeframe__enabled=True,
+                                              available=True, start_date__gt=now)\
+        .order_by('start_date').values_list('start_date', flat=True).first()
+    return first_free_slot(next_stored_slot, virtual_laboratory_timeframes(laboratory_id, now), now)
+
+
+def adjust_laboratory_availability(laboratory_id, taken=(), freed=(), now=None):
+    """
+    Apply the slots just reserved (taken) and released (freed), given as
+    Booking rows, to the summary of a laboratory in the current transaction.
+
+    open_slots is moved with an F() expression instead of recounting the
+    laboratory; the next free slot is only looked up again when it was just
+    taken. The summary row is locked, so concurrent reservations of the
+    laboratory apply their changes one after the other. Without a summary
+    yet, it is computed once the transaction commits.
+    """
+    now = now or timezone.now()
+    taken = [booking.start_date for booking in taken if booking.start_date > now and booking.timeframe.enabled]
+    freed = [booking.start_date for booking in freed if booking.start_date > now and booking.timeframe.enabled]
+    if not taken and not freed:
+        return
+
+    summary = LaboratoryAvailability.objects.select_for_update().filter(laboratory_id=laboratory_id).first()
+    if summary is None:
+        schedule_availability_refresh(laboratory_id)
+        return
+
+    next_free_slot = summary.next_free_slot
+    if next_free_slot in taken:
+        next_free_slot = find_next_free_slot(laboratory_id, now)
+    if freed and (next_free_slot is None or min(freed) < next_free_slot):
+        next_free_slot = min(freed)
+
+    LaboratoryAvailability.objects.filter(laboratory_id=laboratory_id)\
+        .update(open_slots=F('open_slots') + len(freed) - len(taken), next_free_slot=next_free_slot,
+                last_modification_date=timezone.now())
+    # update() sends no post_save, the handler of booking.signals is applied here
+    invalidate_on_commit(LABORATORIES_SCOPE, laboratory_scope(laboratory_id))
+
+
+def refresh_laboratory_availability(laboratory_id, now=None):
+    """Recompute and store the availability summary of one laboratory"""
+    next_free_slot, open_slots = compute_laboratory_availability(laboratory_id, now)
+    summary, _ = LaboratoryAvailability.objects.update_or_create(
+        laboratory_id=laboratory_id,
+        defaults={'next_free_slot': next_free_slot, 'open_slots': open_slots}
+    )
+    return summary
+
+
+def schedule_availability_refresh(laboratory_id):
+    """Refresh the summary once the current transaction commits, right away outside of one"""
+    transaction.on_commit(lambda: refresh_laboratory_availability(laboratory_id))
+
+
+def sweep_laboratory_availability(refresh_all=False, now=None):
+    """
+    Refresh the summaries whose next free slot has started, or every one.
+
+    Laboratories without a summary yet are always refreshed. Returns the
+    number of laboratories refreshed.
+    """
+    now = now or timezone.now()
+    laboratories = Laboratory.objects.all()
+
+    if not refresh_all:
+        laboratories = laboratories.filter(Q(availability__isnull=True) | Q(availability__next_free_slot__lte=now))
+
+    refreshed = 0
+    for laboratory_id in laboratories.values_list('id', flat=True).iterator():
+        refresh_laboratory_availability(laboratory_id, now)
+        refreshed += 1
+
+    return refreshed
@@ -0,0 +1,130 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+import hashlib
+import time
+
+CACHE_PREFIX = 'booking:response'
+LABORATORIES_SCOPE = 'laboratories'
+
+
+def laboratory_scope(laboratory_id):
+    return f'laboratory:{laboratory_id}'
+
+
+def contents_scope(laboratory_id):
+    return f'contents:{laboratory_id}'
+
+
+def _version_key(scope):
+    return f'{CACHE_PREFIX}:version:{scope}'
+
+
+def _new_version():
+    # Never reuse a version number if a version key is evicted before its entries
+    return time.time_ns()
+
+
+def get_versions(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [str(versions[key]) for key in keys]
+
+
+def invalidate(*scopes):
+    """
+    Make every cached response of the given scopes unreachable.
+
+    Each scope gets a new version instead of an incremented one, so two
+    invalidations racing on a backend without an atomic incr cannot leave
+    the old version in place.
+    """
+    cache.set_many({_version_key(scope): _new_version() for scope in scopes}, timeout=None)
+
+
+def invalidate_on_commit(*scopes):
+    """
+    Invalidate the scopes once the current transaction is committed.
+
+    Invalidating before the commit would let a concurrent request cache the
+    old rows again under the new version, for RESPONSE_CACHE_TIMEOUT.
+    """
+    transaction.on_commit(lambda: invalidate(*scopes))
+
+
+class CachedResponseMixin:
+    """
+    Cache the serialized GET response of a read-only view.
+
+    Entries are keyed on the version of each scope the view depends on, so
+    invalidating a scope drops all of its entries at once (see
+    booking.signals). The ETag and Last-Modified of the entry are stored with
+    it, a conditional request on a cached entry is answered with a 304 without
+    touching the database.
+    """
+
+    cache_timeout = None
+
+    def get_cache_scopes(self):
+        raise NotImplementedError('Cached views must define their cache scopes')
+
+    def get_last_modified(self, instances):
+        return max((instance.last_modification_date for instance in instances), default=None)
+
+    def get_cache_key(self, request):
+        versions = ':'.join(get_versions(self.get_cache_scopes()))
+        # Responses hold absolute media URLs, so the scheme and host are part of the key
+        variant = hashlib.md5(f'{request.build_absolute_uri()}|{request.accepted_renderer.format}'.encode()).hexdigest()
+        return f'{CACHE_PREFIX}:{self.__class__.__name__}:{versions}:{variant}'
+
+    def get_serializer(self, *args, **kwargs):
+        if args:
+            self.serialized_instances = args[0] if kwargs.get('many') else [args[0]]
+        return super().get_serializer(*args, **kwargs)
+
+    def build_cache_entry(self, data):
+        last_modified = self.get_last_modified(getattr(self, 'serialized_instances', []))
+
+        return {
+            'data': data,
+            'etag': quote_etag(hashlib.md5(JSONRenderer().render(data)).hexdigest()),
+            'last_modified': int(last_modified.timestamp()) if last_modified else None,
+        }
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+            entry = self.build_cache_entry(response.data)
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+            cache.set(key, entry, timeout=timeout)
+
+        response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        if entry['last_modified'] is not None:
+            response['Last-Modified'] = http_date(entry['last_modified'])
+
+        return get_conditional_response(request, etag=entry['etag'], last_modified=entry['last_modified'],
+                                        response=response)
@@ -0,0 +1,52 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.models import Booking
+from booking.slots import virtual_slots
+from datetime import datetime, time
+from django.db.models import Count, Q
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+GROUPS = ('day', 'hour')
+
+
+def period_key(period, group):
+    return period.date().isoformat() if group == 'day' else period.isoformat()
+
+
+def truncate(value, group, tzinfo):
+    local = value.astimezone(tzinfo)
+    if group == 'day':
+        return datetime.combine(local.date(), time(), tzinfo=tzinfo)
+
+    return local.replace(minute=0, second=0, microsecond=0)
+
+
+def booking_calendar(equipment_id, start_date, end_date, tzinfo, group='day', now=None):
+    """
+    Free and taken slot counts of an equipment per day or hour of tzinfo.
+
+    Stored bookings are grouped in SQL (date_trunc in the given time zone),
+    the open slots of virtual timeframes are added from their rules. A slot is
+    free while it is available and has not ended.
+    """
+    now = now or timezone.now()
+
+    rows = Booking.objects.filter(equipment_id=equipment_id, start_date__gte=start_date, start_date__lt=end_date)\
+        .annotate(period=Trunc('start_date', group, tzinfo=tzinfo))\
+        .values('period')\
+        .annotate(free=Count('id', filter=Q(available=True, end_date__gt=now)), taken=Count('id', filter=Q(available=False)))\
+        .order_by('period')
+
+    counts = {period_key(row['period'], group): {'free': row['free'], 'taken': row['taken']} for row in rows}
+
+    for slot in virtual_slots(start_date, end_date, equipment_id):
+        if slot['end_date'] > now:
+            key = period_key(truncate(slot['start_date'], group, tzinfo), group)
+            counts.setdefault(key, {'free': 0, 'taken': 0})['free'] += 1
+
+    return [{'period': key, **counts[key]} for key in sorted(counts)]
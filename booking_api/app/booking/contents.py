@@ -0,0 +1,156 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.cache import LABORATORIES_SCOPE, contents_scope, invalidate_on_commit, laboratory_scope
+from booking.images import refresh_variants
+from booking.models import CONTENT_FIELDS, ChunkedUpload, Laboratory, LaboratoryContent
+from booking.uploads import delete_upload, partial_path
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+from urllib.parse import urlparse
+import uuid
+
+FILE_FIELDS = ('image', 'video')
+
+
+class ContentFileError(Exception):
+    """A file of a content block does not name a part, a complete upload or a file of the laboratory"""
+
+    def __init__(self, index, field, message):
+        super().__init__(message)
+        self.index = index
+        self.field = field
+        self.message = message
+
+
+class ContentFiles:
+    """
+    Resolve the image and video values of the content blocks of a laboratory.
+
+    A value is the name of a file part of the request, the id of a complete
+    chunked upload of the user, or the name or URL of a file already used by
+    a content of the laboratory, which is kept without sending it again.
+    """
+
+    def __init__(self, existing, files, user):
+        self.files = files
+        self.user = user
+        self.stored = {field: {getattr(content, field).name for content in existing if getattr(content, field)}
+                       for field in FILE_FIELDS}
+        self.uploads = []
+
+    def stored_name(self, field, value):
+        path = urlparse(value).path
+        for name in self.stored[field]:
+            if path == name or path.endswith('/' + name):
+                return name
+        return None
+
+    def chunked_upload(self, value):
+        try:
+            upload_id = uuid.UUID(value)
+        except ValueError:
+            return None
+        return ChunkedUpload.objects.filter(id=upload_id, owner=self.user).first()
+
+    def resolve(self, index, content, field, value):
+        """Store the file of a block if it is new and return its name"""
+        if value in self.files:
+            getattr(content, field).save(self.files[value].name, self.files[value], save=False)
+            return getattr(content, field).name
+
+        name = self.stored_name(field, value)
+        if name is not None:
+            return name
+
+        upload = self.chunked_upload(value)
+        if upload is None:
+            raise ContentFileError(index, field, 'Not a file of the request, an upload or a file of the laboratory.')
+        if upload.offset != upload.size:
+            raise ContentFileError(index, field, f'{upload.offset} of {upload.size} bytes were uploaded.')
+
+        with open(partial_path(upload), 'rb') as partial:
+            getattr(content, field).save(upload.filename, File(partial), save=False)
+        self.uploads.append(upload)
+        return getattr(content, field).name
+
+
+def delete_contents_after(laboratory, order):
+    """
+    Delete the contents of a laboratory past an order in one query.
+
+    Plain SQL rather than QuerySet.delete(), which would fetch the rows and
+    send post_delete for each one; the cache invalidation of those handlers
+    is done once by the caller, and no other table references a content.
+    """
+    meta, quote_name = LaboratoryContent._meta, connection.ops.quote_name
+    table, laboratory_column, order_column = (quote_name(name) for name in (
+        meta.db_table, meta.get_field('laboratory').column, meta.get_field('order').column))
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {laboratory_column} = %s AND {order_column} > %s',
+                       [laboratory.pk, order])
+
+
+def save_laboratory_contents(laboratory, blocks, files=None, user=None):
+    """
+    Replace the contents of a laboratory with an ordered list of blocks.
+
+    Each block is a dict with one of CONTENT_FIELDS and becomes the content
+    at order index + 1. The blocks are compared with the existing rows: new
+    orders are inserted with bulk_create, changed ones updated with a single
+    bulk_update and the orders past the end deleted, all in one transaction.
+    The number of queries does not depend on the number of blocks.
+
+    The laboratory row is locked before the existing contents are read, so
+    concurrent saves of the same laboratory are applied one after the other
+    instead of both inserting the same orders. New files are stored in the
+    transaction; a file left behind by a failed save is content-addressed
+    and reused by the next attempt.
+    """
+    fields = CONTENT_FIELDS + ('is_last',)
+    contents, created, updated, new_images = [], [], [], []
+
+    with transaction.atomic():
+        Laboratory.objects.select_for_update().filter(pk=laboratory.pk).first()
+        existing = {content.order: content for content in LaboratoryContent.objects.filter(laboratory=laboratory)}
+        content_files = ContentFiles(existing.values(), files or {}, user)
+
+        for index, block in enumerate(blocks):
+            order = index + 1
+            content = existing.get(order) or LaboratoryContent(laboratory=laboratory, order=order)
+            current = {field: getattr(content, field) for field in fields}
+            current.update({field: current[field].name or None for field in FILE_FIELDS})
+
+            values = {field: block.get(field) for field in CONTENT_FIELDS}
+            values['is_last'] = order == len(blocks)
+            for field in FILE_FIELDS:
+                if values[field]:
+                    values[field] = content_files.resolve(index, content, field, values[field])
+
+            contents.append(content)
+            if content.pk is not None and values == current:
+                continue
+
+            for field, value in values.items():
+                setattr(content, field, value)
+            (updated if content.pk is not None else created).append(content)
+            if values['image'] != current['image']:
+                new_images.append(content)
+
+        delete_contents_after(laboratory, len(blocks))
+        LaboratoryContent.objects.bulk_create(created)
+        LaboratoryContent.objects.bulk_update(updated, fields)
+        Laboratory.objects.filter(pk=laboratory.pk).update(last_modification_date=timezone.now())
+
+    for upload in content_files.uploads:
+        delete_upload(upload)
+    for content in new_images:
+        refresh_variants(content)
+    invalidate_on_commit(LABORATORIES_SCOPE, laboratory_scope(laboratory.pk), contents_scope(laboratory.pk))
+
+    return contents
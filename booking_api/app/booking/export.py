@@ -0,0 +1,113 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+import csv
+import datetime
+
+EXPORT_FIELDS = ('id', 'start_date', 'end_date', 'equipment__name', 'equipment__laboratory__name',
+                 'reserved_by__email', 'public', 'available')
+CSV_HEADER = ('id', 'start_date', 'end_date', 'equipment', 'laboratory', 'reserved_by', 'public', 'available')
+ICAL_DATE_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def iter_export_rows(queryset):
+    """
+    Rows of the export, fetched in chunks of EXPORT_CHUNK_SIZE.
+
+    A server-side cursor is used when available. Behind a transaction pooler
+    they are disabled, and the rows are read with one keyset query per chunk
+    instead so memory stays bounded either way.
+    """
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    queryset = queryset.order_by('start_date', 'id').values_list(*EXPORT_FIELDS)
+
+    if not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return queryset.iterator(chunk_size=chunk_size)
+
+    return iter_keyset_chunks(queryset, chunk_size)
+
+
+def iter_keyset_chunks(queryset, chunk_size):
+    last = None
+
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(Q(start_date__gt=last[1]) | Q(start_date=last[1], id__gt=last[0]))
+
+        rows = list(chunk[:chunk_size])
+        yield from rows
+
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+class Echo:
+    """File-like object that returns what is written, so csv.writer yields lines"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for booking_id, start_date, end_date, equipment, laboratory, reserved_by, public, available in rows:
+        yield writer.writerow((booking_id, start_date.isoformat(), end_date.isoformat(), equipment, laboratory,
+                               reserved_by or '', public, available))
+
+
+def escape_ical(value):
+    return value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def fold_ical(line):
+    """Fold a content line at 75 octets as required by RFC 5545"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_ical(rows, domain, name='Bookings'):
+    stamp = timezone.now().strftime(ICAL_DATE_FORMAT)
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//UPB EUBBC-Digital//Booking//EN\r\nCALSCALE:GREGORIAN\r\n'
+    yield fold_ical(f'X-WR-CALNAME:{escape_ical(name)}')
+
+    for booking_id, start_date, end_date, equipment, laboratory, reserved_by, public, available in rows:
+        summary = f'{equipment} - {laboratory}'
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:booking-{booking_id}@{domain}',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{start_date.astimezone(datetime.timezone.utc).strftime(ICAL_DATE_FORMAT)}',
+            f'DTEND:{end_date.astimezone(datetime.timezone.utc).strftime(ICAL_DATE_FORMAT)}',
+            f'SUMMARY:{escape_ical(summary)}',
+            'STATUS:CONFIRMED' if reserved_by else 'STATUS:TENTATIVE',
+        ]
+        if reserved_by:
+            lines.append(f'DESCRIPTION:{escape_ical(f"Reserved by {reserved_by}")}')
+        lines.append('END:VEVENT')
+        yield ''.join(fold_ical(line) for line in lines)
+
+    yield 'END:VCALENDAR\r\n'
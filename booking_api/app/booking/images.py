@@ -0,0 +1,132 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+import hashlib
+import io
+import os
+import tempfile
+
+DERIVATIVES_DIRECTORY = 'image_derivatives'
+
+# name: (longest side in pixels, format, save options)
+VARIANTS = {
+    'thumbnail': (480, 'WEBP', {'quality': 75, 'method': 4}),
+    'medium': (1280, 'WEBP', {'quality': 80, 'method': 4}),
+}
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+
+
+def content_hash(field_file):
+    """MD5 of a stored file, read in chunks"""
+    md5_hash = hashlib.md5()
+    with field_file.open('rb') as source:
+        for chunk in source.chunks():
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+def variant_name(digest, variant):
+    _, image_format, _ = VARIANTS[variant]
+    return os.path.join(DERIVATIVES_DIRECTORY, digest, f'{variant}.{EXTENSIONS[image_format]}')
+
+
+def render_variant(image, variant):
+    size, image_format, options = VARIANTS[variant]
+    resized = image.copy()
+    resized.thumbnail((size, size), Image.LANCZOS)
+
+    output = io.BytesIO()
+    resized.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def write_variant(name, data):
+    """
+    Write a variant to a temporary file next to it and rename it into place.
+
+    The name is derived from the content of the original, so unlike
+    default_storage.save() it is never changed: a concurrent upload writing
+    the same variant just replaces it with identical bytes.
+    """
+    path = default_storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix='.variant-', suffix=os.path.splitext(name)[1],
+                                     dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(data)
+        if default_storage.file_permissions_mode is not None:
+            os.chmod(temp_path, default_storage.file_permissions_mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def generate_variants(field_file):
+    """
+    Write the variants of an image and return {'source': name, variant: path}.
+
+    Variants are stored under the MD5 of the original, so an image uploaded
+    twice is only resized once. Images smaller than a variant are not
+    upscaled. Returns an empty dict when the file is not a readable image.
+    """
+    if not field_file:
+        return {}
+
+    try:
+        digest = content_hash(field_file)
+        names = {variant: variant_name(digest, variant) for variant in VARIANTS}
+        missing = [variant for variant, name in names.items() if not default_storage.exists(name)]
+        for variant in names.keys() - missing:
+            # Shared with another image, restart the grace period of booking.media_gc
+            os.utime(default_storage.path(names[variant]))
+
+        if missing:
+            with field_file.open('rb') as source:
+                image = ImageOps.exif_transpose(Image.open(source))
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+            for variant in missing:
+                write_variant(names[variant], render_variant(image, variant))
+    except (OSError, ValueError, Image.DecompressionBombError) as error:
+        print(f'Could not generate the variants of {field_file.name}: {error}')
+        return {}
+
+    return dict(names, source=field_file.name)
+
+
+def refresh_variants(instance, refresh_all=False):
+    """
+    Regenerate the variants of instance.image when the image changed, and
+    store them without touching the other fields. Returns True if updated.
+    """
+    source = instance.image.name if instance.image else None
+
+    if not refresh_all and instance.image_variants.get('source') == source:
+        return False
+
+    instance.image_variants = generate_variants(instance.image) if source else {}
+    type(instance).objects.filter(pk=instance.pk).update(image_variants=instance.image_variants)
+    return True
+
+
+def variant_urls(instance, request=None):
+    """Absolute URLs of the variants of instance.image, empty until they are generated"""
+    urls = {}
+
+    for variant in VARIANTS:
+        name = instance.image_variants.get(variant)
+        if name:
+            url = default_storage.url(name)
+            urls[variant] = request.build_absolute_uri(url) if request is not None else url
+
+    return urls
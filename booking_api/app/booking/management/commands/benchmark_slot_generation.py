@@ -0,0 +1,113 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+import tracemalloc
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from booking.slots import materialize_slots
+from core.models import User
+from datetime import datetime, date, time as dt_time, timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+
+def legacy_create_slots(timeframe, public, owner):
+    """Slot loop used by TimeFrameSerializer.create before the slot engine"""
+    start_date = timeframe.start_date
+    start_hour = timeframe.start_hour
+    end_hour = timeframe.end_hour
+    slot_duration = timeframe.slot_duration
+    number_of_days = (timeframe.end_date - start_date).days
+
+    if start_hour > end_hour:
+        yesterday = datetime.now() - timedelta(1)
+        number_of_slots = int(((datetime.combine(date.today(), end_hour) - datetime.combine(yesterday, start_hour)).total_seconds() / 60) / slot_duration)
+    else:
+        number_of_slots = int(((datetime.combine(date.today(), end_hour) - datetime.combine(date.today(), start_hour)).total_seconds() / 60) / slot_duration)
+
+    bookings = []
+
+    for _ in range(number_of_days + 1):
+        start_date = datetime.combine(start_date, start_hour).replace(tzinfo=datetime.now().astimezone().tzinfo)
+        accumulated_date = start_date
+
+        for _ in range(number_of_slots):
+            end_date = accumulated_date + timedelta(minutes=slot_duration)
+
+            bookings.append(Booking(
+                start_date=accumulated_date,
+                end_date=end_date,
+                available=True,
+                public=public,
+                password=get_random_string(15),
+                owner=owner,
+                timeframe=timeframe,
+                equipment=timeframe.equipment
+            ))
+
+            accumulated_date = end_date
+
+        start_date = start_date + timedelta(days=1)
+
+    Booking.objects.bulk_create(bookings)
+    return len(bookings)
+
+
+class Command(BaseCommand):
+    """Django command to compare the legacy slot loop with the slot engine"""
+
+    help = 'Benchmark timeframe slot generation. All rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=120)
+        parser.add_argument('--slot-duration', type=int, default=5)
+        parser.add_argument('--start-hour', type=int, default=8)
+        parser.add_argument('--end-hour', type=int, default=20)
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        strategies = [
+            ('legacy loop', lambda tf, owner: legacy_create_slots(tf, False, owner)),
+            ('engine (bulk_create)', lambda tf, owner: materialize_slots(tf, chunk_size=options['chunk_size'], use_copy=False)),
+        ]
+
+        if connection.vendor == 'postgresql':
+            strategies.append(
+                ('engine (COPY)', lambda tf, owner: materialize_slots(tf, chunk_size=options['chunk_size'], use_copy=True))
+            )
+
+        for name, strategy in strategies:
+            with transaction.atomic():
+                owner = User.objects.create(email=f'benchmark-{get_random_string(8)}@upb.edu')
+                laboratory = Laboratory.objects.create(name='Benchmark', owner=owner)
+                equipment = Equipment.objects.create(name='Benchmark', laboratory=laboratory, owner=owner)
+                start_date = timezone.now()
+                timeframe = TimeFrame.objects.create(
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=options['days'] - 1),
+                    start_hour=dt_time(options['start_hour']),
+                    end_hour=dt_time(options['end_hour']),
+                    slot_duration=options['slot_duration'],
+                    equipment=equipment,
+                    owner=owner
+                )
+
+                tracemalloc.start()
+                started = time.perf_counter()
+                slots = strategy(timeframe, owner)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f'{name:<22} {slots:>8} slots  {elapsed:8.3f} s  '
+                f'{slots / elapsed if elapsed else 0:>10.0f} slots/s  peak {peak / 1024 / 1024:7.1f} MiB'
+            )
@@ -0,0 +1,44 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+
+from booking.media_gc import collect_media_garbage
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to delete the media files no laboratory or content references"""
+
+    help = 'Delete unreferenced files of the laboratory and content media directories older than the grace ' \
+           'period, and report the bytes reclaimed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the orphan files without deleting them')
+        parser.add_argument('--grace-period', type=int, default=None,
+                            help='Keep unreferenced files younger than this number of seconds '
+                                 '(MEDIA_GC_GRACE_PERIOD by default)')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running and collect every given number of seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            report = collect_media_garbage(options['grace_period'], dry_run=options['dry_run'])
+            self.write_report(report, options['dry_run'])
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
+
+    def write_report(self, report, dry_run):
+        self.stdout.write(f'{"directory":<22} {"files":>7} {"MiB":>10} {"orphans":>8} {"reclaimed MiB":>14}')
+        for directory, stats in report.items():
+            self.stdout.write(f'{directory:<22} {stats["files"]:>7} {stats["bytes"] / 1024 ** 2:>10.1f} '
+                              f'{stats["orphans"]:>8} {stats["reclaimed"] / 1024 ** 2:>14.1f}')
+
+        reclaimed = sum(stats['reclaimed'] for stats in report.values())
+        action = 'Would reclaim' if dry_run else 'Reclaimed'
+        self.stdout.write(f'{action} {reclaimed} bytes from {sum(stats["orphans"] for stats in report.values())} files')
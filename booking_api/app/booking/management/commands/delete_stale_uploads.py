@@ -0,0 +1,29 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+
+from booking.uploads import delete_stale_uploads
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to delete abandoned resumable uploads"""
+
+    help = 'Delete chunked uploads without a new chunk for CHUNKED_UPLOAD_EXPIRATION seconds.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running and delete stale uploads every given number of seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = delete_stale_uploads()
+            self.stdout.write(f'Deleted {deleted} stale uploads')
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
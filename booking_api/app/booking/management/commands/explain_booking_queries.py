@@ -0,0 +1,105 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking import views
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from booking.slots import materialize_slots
+from core.models import User
+from datetime import time, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+class Command(BaseCommand):
+    """Django command to print the query plans of the booking list endpoints"""
+
+    help = 'Seed a throwaway dataset and run EXPLAIN ANALYZE on the booking list queries. All rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--equipments', type=int, default=20)
+        parser.add_argument('--days', type=int, default=60)
+        parser.add_argument('--slot-duration', type=int, default=15)
+        parser.add_argument('--check', action='store_true',
+                            help='Fail when a list query falls back to a sequential scan of the booking table')
+
+    def seed(self, options):
+        owner = User.objects.create(email=f'explain-{get_random_string(8)}@upb.edu')
+        student = User.objects.create(email=f'explain-{get_random_string(8)}@upb.edu')
+        laboratory = Laboratory.objects.create(name='Explain', owner=owner)
+        start_date = timezone.now() - timedelta(days=options['days'] // 2)
+        equipments = []
+
+        for number in range(options['equipments']):
+            equipment = Equipment.objects.create(name=f'Explain {number}', laboratory=laboratory, owner=owner)
+            timeframe = TimeFrame.objects.create(
+                start_date=start_date,
+                end_date=start_date + timedelta(days=options['days'] - 1),
+                start_hour=time(0),
+                end_hour=time(23, 59),
+                slot_duration=options['slot_duration'],
+                equipment=equipment,
+                owner=owner,
+                public=True
+            )
+            materialize_slots(timeframe, public=True)
+            equipments.append(equipment)
+
+        reserved = Booking.objects.filter(equipment__in=equipments, id__in=Booking.objects.filter(
+            equipment__in=equipments).order_by('?').values('id')[:Booking.objects.filter(equipment__in=equipments).count() // 10])
+        reserved.update(available=False, reserved_by=student)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Booking._meta.db_table}')
+            cursor.execute(f'ANALYZE {TimeFrame._meta.db_table}')
+
+        return student, equipments[0], start_date
+
+    def get_queryset(self, view_class, user, params):
+        view = view_class()
+        view.request = Request(APIRequestFactory().get('/', params))
+        view.request.user = user
+        view.kwargs = {}
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN ANALYZE plans are only meaningful on PostgreSQL')
+
+        failures = []
+
+        with transaction.atomic():
+            student, equipment, start_date = self.seed(options)
+            week = {
+                'start_date': (start_date + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'end_date': (start_date + timedelta(days=14)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            }
+
+            queries = [
+                ('BookingList (equipment + range)', views.BookingList, dict(week, equipment=equipment.id)),
+                ('BookingList (range)', views.BookingList, week),
+                ('BookingPublicList (equipment + range)', views.BookingPublicList, dict(week, equipment=equipment.id)),
+                ('BookingUserList', views.BookingUserList, {}),
+            ]
+
+            self.stdout.write(f'Seeded {Booking.objects.filter(equipment__laboratory=equipment.laboratory).count()} bookings\n')
+
+            for name, view_class, params in queries:
+                plan = self.get_queryset(view_class, student, params).explain(analyze=True)
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(plan + '\n')
+
+                if f'Seq Scan on {Booking._meta.db_table}' in plan:
+                    failures.append(name)
+
+            transaction.set_rollback(True)
+
+        if options['check'] and failures:
+            raise CommandError(f'Sequential scan on the booking table in: {", ".join(failures)}')
@@ -0,0 +1,37 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.images import VARIANTS, refresh_variants
+from booking.models import Laboratory, LaboratoryContent
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to generate the resized variants of the laboratory images"""
+
+    help = 'Generate the thumbnail and WebP variants of laboratory and content images that do not have them yet, ' \
+           'and report the bytes of the originals and of each variant.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate the variants of every image')
+
+    def handle(self, *args, **options):
+        generated = 0
+        sizes = dict.fromkeys(['original', *VARIANTS], 0)
+
+        for model in (Laboratory, LaboratoryContent):
+            for instance in model.objects.exclude(image='').exclude(image__isnull=True).iterator():
+                generated += refresh_variants(instance, refresh_all=options['all'])
+
+                if instance.image_variants:
+                    sizes['original'] += instance.image.size
+                    for variant in VARIANTS:
+                        sizes[variant] += default_storage.size(instance.image_variants[variant])
+
+        self.stdout.write(f'Generated the variants of {generated} images')
+        for name, size in sizes.items():
+            self.stdout.write(f'{name:<10} {size / 1024:12.1f} KiB')
@@ -0,0 +1,48 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+
+from booking.materialization import materialize_next_chunk, requeue_failed_timeframes
+from booking.models import TimeFrame
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to create the slots of timeframes queued for background materialization"""
+
+    help = 'Fill in the bookings of materializing timeframes, chunk by chunk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--requeue', type=int, nargs='*', metavar='ID',
+                            help='Queue the failed timeframes again (all of them without ids) and exit')
+
+    def handle(self, *args, **options):
+        if options['requeue'] is not None:
+            requeued = requeue_failed_timeframes(options['requeue'])
+            self.stdout.write(self.style.SUCCESS(f'Requeued {requeued} timeframes'))
+            return
+
+        self.stdout.write('Waiting for timeframes to materialize...')
+
+        while True:
+            timeframe = materialize_next_chunk(chunk_size=options['chunk_size'])
+
+            if timeframe is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            if timeframe.status == TimeFrame.READY:
+                self.stdout.write(self.style.SUCCESS(f'Timeframe {timeframe.id} ready ({timeframe.total_slots} slots)'))
+            elif timeframe.status == TimeFrame.FAILED:
+                self.stdout.write(self.style.ERROR(f'Timeframe {timeframe.id} failed after {timeframe.materialization_attempts} attempts'))
+            elif timeframe.next_attempt_date is not None:
+                self.stdout.write(f'Timeframe {timeframe.id} will be retried at {timeframe.next_attempt_date}')
@@ -0,0 +1,30 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+
+from booking.availability import sweep_laboratory_availability
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to roll expired slots off the laboratory availability summaries"""
+
+    help = 'Refresh the availability summary of laboratories whose next free slot has started.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Refresh every laboratory')
+        parser.add_argument('--interval', type=float, default=None,
+                            help='Keep running and sweep every given number of seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            refreshed = sweep_laboratory_availability(refresh_all=options['all'])
+            self.stdout.write(f'Refreshed {refreshed} laboratories')
+
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,89 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.availability import schedule_availability_refresh
+from booking.models import TimeFrame
+from booking.slots import SlotSchedule, write_slots
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+def should_materialize_in_background(total_slots, requested=None):
+    """Large timeframes, or those explicitly requested, are filled by the worker"""
+    if requested is not None:
+        return str(requested).lower() in ('true', '1')
+
+    return total_slots > getattr(settings, 'BOOKING_SLOT_BACKGROUND_THRESHOLD', 5000)
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: base delay doubled after each failed chunk, capped at one hour"""
+    base = getattr(settings, 'BOOKING_SLOT_RETRY_DELAY', 10)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 60 * 60))
+
+
+def materialize_next_chunk(chunk_size=None, max_attempts=None):
+    """
+    Write the next chunk of slots of a pending timeframe.
+
+    The timeframe row is locked for the duration of the chunk and its progress
+    is saved in the same transaction as the slots, so a crashed worker leaves
+    the job exactly where the last committed chunk ended. A chunk that fails
+    is rolled back and retried with exponential backoff; after max_attempts
+    the timeframe is marked as failed until requeue_failed_timeframes.
+    Returns the timeframe that was processed, or None when the queue is
+    empty.
+    """
+    chunk_size = chunk_size or getattr(settings, 'BOOKING_SLOT_CHUNK_SIZE', 2000)
+    max_attempts = max_attempts or getattr(settings, 'BOOKING_SLOT_MAX_ATTEMPTS', 5)
+
+    with transaction.atomic():
+        now = timezone.now()
+        timeframe = TimeFrame.objects.select_for_update(skip_locked=True)\
+            .filter(Q(next_attempt_date__isnull=True) | Q(next_attempt_date__lte=now), status=TimeFrame.MATERIALIZING)\
+            .order_by('id').first()
+
+        if timeframe is None:
+            return None
+
+        schedule = SlotSchedule.from_timeframe(timeframe)
+        start = timeframe.materialized_slots
+        slots = list(schedule.iter_slots(start, start + chunk_size))
+
+        try:
+            with transaction.atomic():
+                write_slots(timeframe, slots, timeframe.public)
+        except Exception as e:
+            print(f'Failed to materialize timeframe {timeframe.id}: {e}')
+            timeframe.materialization_attempts += 1
+            timeframe.next_attempt_date = now + get_retry_delay(timeframe.materialization_attempts)
+            if timeframe.materialization_attempts >= max_attempts:
+                timeframe.status = TimeFrame.FAILED
+            timeframe.save(update_fields=['materialization_attempts', 'next_attempt_date', 'status',
+                                          'last_modification_date'])
+            return timeframe
+
+        timeframe.materialized_slots = start + len(slots)
+        timeframe.next_attempt_date = None
+        if timeframe.materialized_slots >= len(schedule):
+            timeframe.status = TimeFrame.READY
+        timeframe.save(update_fields=['materialized_slots', 'next_attempt_date', 'status', 'last_modification_date'])
+        schedule_availability_refresh(timeframe.equipment.laboratory_id)
+
+    return timeframe
+
+
+def requeue_failed_timeframes(ids=None):
+    """Queue failed timeframes again, all of them or those in ids, and return how many"""
+    timeframes = TimeFrame.objects.filter(status=TimeFrame.FAILED)
+    if ids:
+        timeframes = timeframes.filter(id__in=ids)
+
+    return timeframes.update(status=TimeFrame.MATERIALIZING, materialization_attempts=0, next_attempt_date=None,
+                             last_modification_date=timezone.now())
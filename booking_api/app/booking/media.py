@@ -0,0 +1,193 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views import View
+from urllib.parse import quote
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+
+# Files in these directories are stored under the hash of their content and
+# never change, the others (laboratory images) can be replaced in place
+IMMUTABLE_DIRECTORIES = ('labs_content_photos/', 'labs_content_videos/', 'image_derivatives/')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 60 * 60
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) bytes, both included, of a Range header.
+
+    Only single ranges are served partially, a missing, malformed or multiple
+    range returns None and the whole file is sent. Raises UnsatisfiableRange
+    when the range starts after the end of the file.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range, the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise UnsatisfiableRange
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def file_etag(stat_result):
+    """ETag from the modification time and size, in the format nginx uses"""
+    return quote_etag('%x-%x' % (int(stat_result.st_mtime), stat_result.st_size))
+
+
+def range_applies(request, etag, last_modified):
+    """An If-Range that does not match the current file asks for the whole file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+class FileRange:
+    """
+    Read-only view of bytes [start, start + length) of an open file.
+
+    fileno() is kept so the WSGI server can send the range with os.sendfile
+    (gunicorn does when the response has a Content-Length), other servers
+    read it in blocks and never past the end of the range.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class MediaFileResponse(FileResponse):
+    block_size = 64 * 1024
+
+
+class MediaView(View):
+    """
+    Serve uploaded media with byte ranges and conditional requests.
+
+    Videos can be seeked: a single Range is answered with 206 Partial Content.
+    ETag and Last-Modified come from the file, so browsers revalidate with a
+    304 instead of downloading it again, and the content-addressed
+    directories are cached as immutable. Files are streamed with os.sendfile
+    when the server supports it. With MEDIA_ACCEL_REDIRECT set, only the path
+    is checked and nginx sends the file from its internal location.
+    """
+
+    http_method_names = ['get', 'head']
+
+    def get_path(self, path):
+        path = posixpath.normpath(path).lstrip('/')
+        try:
+            return path, safe_join(settings.MEDIA_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404
+
+    def get_cache_control(self, path):
+        if path.startswith(IMMUTABLE_DIRECTORIES):
+            return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        return f'public, max-age={MUTABLE_MAX_AGE}'
+
+    def get(self, request, path):
+        path, full_path = self.get_path(path)
+
+        try:
+            stat_result = os.stat(full_path)
+        except (OSError, ValueError):
+            raise Http404
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise Http404
+
+        if settings.MEDIA_ACCEL_REDIRECT:
+            return self.accel_redirect(path)
+
+        etag = file_etag(stat_result)
+        last_modified = int(stat_result.st_mtime)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.file_response(request, full_path, stat_result.st_size, etag, last_modified)
+
+        response['Accept-Ranges'] = 'bytes'
+        if response.status_code != 416:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = self.get_cache_control(path)
+        return response
+
+    def file_response(self, request, full_path, size, etag, last_modified):
+        byte_range = None
+        if range_applies(request, etag, last_modified):
+            try:
+                byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+            except UnsatisfiableRange:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+        else:
+            response = MediaFileResponse(FileRange(open(full_path, 'rb'), start, length))
+
+        if byte_range is not None:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+        return response
+
+    def accel_redirect(self, path):
+        response = HttpResponse(content_type=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response['X-Accel-Redirect'] = quote(settings.MEDIA_ACCEL_REDIRECT.rstrip('/') + '/' + path)
+        response['Cache-Control'] = self.get_cache_control(path)
+        return response
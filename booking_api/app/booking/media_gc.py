@@ -0,0 +1,115 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.images import DERIVATIVES_DIRECTORY
+from booking.models import Laboratory, LaboratoryContent
+from collections import Counter
+from django.conf import settings
+import os
+import time
+
+# Directories of MEDIA_ROOT holding uploaded files and their derivatives
+SWEPT_DIRECTORIES = ('labs', 'labs_content_photos', 'labs_content_videos', DERIVATIVES_DIRECTORY)
+
+# Model, file fields and JSON fields listing more files
+REFERENCES = (
+    (Laboratory, ('image',), ('image_variants',)),
+    (LaboratoryContent, ('image', 'video'), ('image_variants',)),
+)
+
+
+def reference_counts():
+    """Number of rows referencing each stored file name"""
+    counts = Counter()
+
+    for model, file_fields, json_fields in REFERENCES:
+        for row in model.objects.values_list(*file_fields, *json_fields).iterator():
+            names = list(row[:len(file_fields)])
+            for variants in row[len(file_fields):]:
+                names.extend(name for key, name in (variants or {}).items() if key != 'source')
+            counts.update(name for name in names if name)
+
+    return counts
+
+
+def iter_media_files(directory):
+    """(name relative to MEDIA_ROOT, stat) of the files under directory"""
+    root = os.path.join(settings.MEDIA_ROOT, directory)
+    if not os.path.isdir(root):
+        return
+
+    for path, _, files in os.walk(root):
+        for filename in files:
+            full_path = os.path.join(path, filename)
+            name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            yield name, os.stat(full_path)
+
+
+def collect_media_garbage(grace_period=None, dry_run=False, now=None):
+    """
+    Delete media files no row references and unchanged for grace_period seconds.
+
+    References are counted from the database after the files are listed, so
+    a file saved meanwhile is either counted or too recent to be deleted.
+    UniqueFilenameStorage and the image variants touch a file they reuse,
+    which restarts its grace period until the row referencing it is saved;
+    each file is stat'ed again right before it is removed, so a file touched
+    after the listing is kept. Returns per
+    directory {'files', 'bytes', 'orphans', 'reclaimed'}; with dry_run
+    nothing is deleted and reclaimed is what would be.
+    """
+    grace_period = settings.MEDIA_GC_GRACE_PERIOD if grace_period is None else grace_period
+    limit = (now or time.time()) - grace_period
+    files = {directory: list(iter_media_files(directory)) for directory in SWEPT_DIRECTORIES}
+    counts = reference_counts()
+    report = {}
+
+    for directory, entries in files.items():
+        stats = report[directory] = {'files': 0, 'bytes': 0, 'orphans': 0, 'reclaimed': 0}
+        emptied = set()
+
+        for name, stat_result in entries:
+            stats['files'] += 1
+            stats['bytes'] += stat_result.st_size
+            if counts[name] or stat_result.st_mtime >= limit:
+                continue
+
+            if not dry_run:
+                full_path = os.path.join(settings.MEDIA_ROOT, name)
+                try:
+                    # Reused since the listing
+                    if os.stat(full_path).st_mtime >= limit:
+                        continue
+                    os.remove(full_path)
+                except FileNotFoundError:
+                    pass
+                emptied.add(os.path.dirname(full_path))
+
+            stats['orphans'] += 1
+            stats['reclaimed'] += stat_result.st_size
+
+        if not dry_run:
+            remove_empty_directories(os.path.join(settings.MEDIA_ROOT, directory), limit, emptied)
+
+    return report
+
+
+def remove_empty_directories(root, limit, emptied=()):
+    """
+    Remove the empty directories below root, like the derivative directory of
+    a deleted image, if files were just deleted from them or they are older
+    than limit.
+    """
+    if not os.path.isdir(root):
+        return
+
+    for path, _, _ in os.walk(root, topdown=False):
+        try:
+            if path != root and (path in emptied or os.stat(path).st_mtime < limit):
+                os.rmdir(path)
+        except OSError:
+            # Not empty, or removed meanwhile
+            pass
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.5 on 2026-10-17 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0022_equipment_bookings_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeframe',
+            name='materialization_attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='timeframe',
+            name='materialized_slots',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='timeframe',
+            name='public',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='timeframe',
+            name='status',
+            field=models.CharField(choices=[('materializing', 'Materializing'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='timeframe',
+            name='total_slots',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-17 21:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0023_timeframe_materialization_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeframe',
+            name='virtual',
+            field=models.BooleanField(default=False),
+        ),
+    ]
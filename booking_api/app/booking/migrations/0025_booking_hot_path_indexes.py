@@ -0,0 +1,44 @@
+# Generated by Django 4.1.5 on 2026-10-17 21:39
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without blocking writes to the booking table
+    atomic = False
+
+    dependencies = [
+        ('booking', '0024_timeframe_virtual'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('available', True)), fields=['equipment', 'start_date'], name='booking_open_equip_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('available', True)), fields=['start_date'], name='booking_open_start_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(condition=models.Q(('available', False), ('public', True), ('reserved_by__isnull', False)), fields=['equipment', 'start_date'], name='booking_public_equip_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['reserved_by', 'start_date'], name='booking_reserved_by_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['timeframe', 'start_date'], name='booking_timeframe_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='timeframe',
+            index=models.Index(condition=models.Q(('enabled', True)), fields=['equipment', 'end_date'], name='timeframe_enabled_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='timeframe',
+            index=models.Index(condition=models.Q(('status', 'materializing')), fields=['id'], name='timeframe_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2026-10-17 21:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0025_booking_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LaboratoryAvailability',
+            fields=[
+                ('laboratory', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='availability', serialize=False, to='booking.laboratory')),
+                ('next_free_slot', models.DateTimeField(blank=True, default=None, null=True)),
+                ('open_slots', models.IntegerField(default=0)),
+                ('last_modification_date', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
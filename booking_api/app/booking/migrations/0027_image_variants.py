@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2026-10-17 22:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0026_laboratoryavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='laboratory',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='laboratorycontent',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-17 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0028_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeframe',
+            name='next_attempt_date',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+    ]
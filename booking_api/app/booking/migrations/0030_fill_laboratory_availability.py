@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+
+def fill_laboratory_availability(apps, schema_editor):
+    """
+    Build the summary of the laboratories that have none, like
+    booking.availability.compute_laboratory_availability but with the
+    models of this migration. Stored slots are counted with one grouped
+    query, slots of virtual timeframes from their rules.
+    """
+    from booking.slots import SlotSchedule
+
+    Booking = apps.get_model('booking', 'Booking')
+    Laboratory = apps.get_model('booking', 'Laboratory')
+    LaboratoryAvailability = apps.get_model('booking', 'LaboratoryAvailability')
+    TimeFrame = apps.get_model('booking', 'TimeFrame')
+
+    now = timezone.now()
+    summaries = {laboratory_id: [None, 0] for laboratory_id
+                 in Laboratory.objects.filter(availability__isnull=True).values_list('id', flat=True)}
+    if not summaries:
+        return
+
+    stored = Booking.objects.filter(equipment__laboratory_id__in=summaries, timeframe__enabled=True,
+                                    available=True, start_date__gt=now)\
+        .values('equipment__laboratory_id').annotate(open_slots=Count('id'), next_free_slot=Min('start_date'))
+    for row in stored:
+        summaries[row['equipment__laboratory_id']] = [row['next_free_slot'], row['open_slots']]
+
+    timeframes = TimeFrame.objects.filter(equipment__laboratory_id__in=summaries, enabled=True, virtual=True,
+                                          end_date__gte=now - timedelta(days=1))\
+        .annotate(taken=Count('tf_reservations', filter=Q(tf_reservations__start_date__gt=now)))\
+        .values('id', 'equipment__laboratory_id', 'start_date', 'end_date', 'start_hour', 'end_hour',
+                'slot_duration', 'taken')
+    for timeframe in timeframes:
+        summary = summaries[timeframe['equipment__laboratory_id']]
+        schedule = SlotSchedule(timeframe['start_date'], timeframe['end_date'], timeframe['start_hour'],
+                                timeframe['end_hour'], timeframe['slot_duration'])
+        start_date = now + timedelta(microseconds=1)
+        end_date = schedule.first_day + timedelta(days=schedule.number_of_days + 1)
+        summary[1] += max(schedule.count_between(start_date, end_date) - timeframe['taken'], 0)
+
+        taken = set(Booking.objects.filter(timeframe_id=timeframe['id'], start_date__gt=now)
+                    .values_list('start_date', flat=True))
+        for _, slot_start, _ in schedule.iter_slots_between(start_date, end_date):
+            if slot_start not in taken:
+                if summary[0] is None or slot_start < summary[0]:
+                    summary[0] = slot_start
+                break
+
+    LaboratoryAvailability.objects.bulk_create([
+        LaboratoryAvailability(laboratory_id=laboratory_id, next_free_slot=next_free_slot, open_slots=open_slots)
+        for laboratory_id, (next_free_slot, open_slots) in summaries.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0029_timeframe_next_attempt_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_laboratory_availability, migrations.RunPython.noop),
+    ]
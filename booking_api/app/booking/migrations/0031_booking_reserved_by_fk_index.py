@@ -0,0 +1,35 @@
+# Generated by Django 4.1.5 on 2026-10-17 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # booking_reserved_by_idx (reserved_by, start_date) makes the index of the
+    # foreign key redundant, it is dropped without blocking writes
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('booking', '0030_fill_laboratory_availability'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS booking_booking_reserved_by_id_acc11990',
+                    reverse_sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS booking_booking_reserved_by_id_acc11990 '
+                                'ON booking_booking (reserved_by_id)',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='booking',
+                    name='reserved_by',
+                    field=models.ForeignKey(blank=True, db_index=False, default=None, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reserved_by', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
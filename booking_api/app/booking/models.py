@@ -8,9 +8,10 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
-from django.db.models import Q
+from django.db.models import Exists, ExpressionWrapper, OuterRef, Q
 import hashlib
 import os
+import tempfile
 import uuid
 
 class Booking(models.Model):
@@ -22,7 +23,8 @@ class Booking(models.Model):
     access_key = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     password = models.CharField(max_length=15, blank=True, null=True, default=None)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='owner', on_delete=models.CASCADE)
-    reserved_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='reserved_by', on_delete=models.CASCADE, blank=True, null=True, default=None)
+    # Indexed by booking_reserved_by_idx, whose first column it is
+    reserved_by = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='reserved_by', on_delete=models.CASCADE, blank=True, null=True, default=None, db_index=False)
     equipment = models.ForeignKey('Equipment', related_name='equipment_reservations', on_delete=models.CASCADE)
     timeframe = models.ForeignKey('TimeFrame', related_name='tf_reservations', on_delete=models.CASCADE)
     registration_date = models.DateTimeField(auto_now_add=True)
@@ -30,6 +32,14 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['equipment', 'start_date'], condition=Q(available=True), name='booking_open_equip_idx'),
+            models.Index(fields=['start_date'], condition=Q(available=True), name='booking_open_start_idx'),
+            models.Index(fields=['equipment', 'start_date'], condition=Q(public=True, available=False, reserved_by__isnull=False),
+                         name='booking_public_equip_idx'),
+            models.Index(fields=['reserved_by', 'start_date'], name='booking_reserved_by_idx'),
+            models.Index(fields=['timeframe', 'start_date'], name='booking_timeframe_idx'),
+        ]
 
 class Equipment(models.Model):
 
@@ -44,6 +54,15 @@ class Equipment(models.Model):
 
 class TimeFrame(models.Model):
 
+    MATERIALIZING = 'materializing'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (MATERIALIZING, 'Materializing'),
+        (READY, 'Ready'),
+        (FAILED, 'Failed'),
+    ]
+
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     start_hour = models.TimeField()
@@ -54,6 +73,40 @@ class TimeFrame(models.Model):
     registration_date = models.DateTimeField(auto_now_add=True)
     last_modification_date = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='timeframe_owner', on_delete=models.CASCADE)
+    public = models.BooleanField(default=False)
+    virtual = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=READY)
+    total_slots = models.IntegerField(default=0)
+    materialized_slots = models.IntegerField(default=0)
+    materialization_attempts = models.IntegerField(default=0)
+    next_attempt_date = models.DateTimeField(blank=True, null=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['equipment', 'end_date'], condition=Q(enabled=True), name='timeframe_enabled_idx'),
+            models.Index(fields=['id'], condition=Q(status='materializing'), name='timeframe_pending_idx'),
+        ]
+
+
+class LaboratoryQuerySet(models.QuerySet):
+
+    def with_availability(self):
+        """Annotate available_now: the laboratory has an open slot in an enabled, unfinished timeframe"""
+        current_datetime = timezone.now()
+
+        def unfinished(prefix=''):
+            return Q(**{f'{prefix}end_date__date__gt': current_datetime.date()}) \
+                | Q(**{f'{prefix}end_date__date': current_datetime.date(), f'{prefix}end_hour__gt': current_datetime.time()})
+
+        open_bookings = Booking.objects.filter(unfinished('timeframe__'), available=True, timeframe__enabled=True,
+                                               equipment__laboratory=OuterRef('pk'))
+        virtual_timeframes = TimeFrame.objects.filter(unfinished(), enabled=True, virtual=True,
+                                                      equipment__laboratory=OuterRef('pk'))
+
+        return self.annotate(available_now=ExpressionWrapper(
+            Q(Exists(open_bookings)) | Q(Exists(virtual_timeframes)),
+            output_field=models.BooleanField()
+        ))
 
 
 class Laboratory(models.Model):
@@ -63,6 +116,7 @@ class Laboratory(models.Model):
     university = models.CharField(max_length=255, blank=False, default='')
     course = models.CharField(max_length=255, blank=False, default='')
     image = models.ImageField(upload_to='labs/', blank=True, null=True, default=None)
+    image_variants = models.JSONField(blank=True, default=dict, editable=False)
     description = models.CharField(max_length=1000, default='')
     url = models.CharField(max_length=255, blank=True, null=True, default='')
     registration_date = models.DateTimeField(auto_now_add=True)
@@ -73,53 +127,86 @@ class Laboratory(models.Model):
     notify_owner = models.BooleanField(default=False)
     allowed_emails = models.TextField(blank=True, default='')
 
+    objects = LaboratoryQuerySet.as_manager()
+
     def has_bookings_available(self):
-      current_datetime = timezone.now()
+      return Laboratory.objects.filter(pk=self.pk).with_availability()\
+        .values_list('available_now', flat=True).first() or False
 
-      future_timeframes = TimeFrame.objects.filter(
-          Q(enabled=True)
-          & Q(equipment__in=self.reservations.all())
-          & (Q(end_date__date__gt=current_datetime.date()))
-          | (Q(end_date__date=current_datetime.date()) & Q(end_hour__gt=current_datetime.time()))
-      )
+    @property
+    def is_available_now(self):
+        if hasattr(self, 'available_now'):
+            return self.available_now
 
-      if future_timeframes.exists():
-        available_bookings = Booking.objects.filter(
-          Q(timeframe__in = future_timeframes)
-          & Q(available = True)
-        )
-        return available_bookings.exists()
+        try:
+            return self.availability.open_slots > 0
+        except LaboratoryAvailability.DoesNotExist:
+            return self.has_bookings_available()
 
-      return False
+class LaboratoryAvailability(models.Model):
+    """Precomputed open slot summary of a laboratory, served by the public laboratory grid"""
 
-    @property
-    def is_available_now(self):
-        return self.has_bookings_available()
+    laboratory = models.OneToOneField(Laboratory, on_delete=models.CASCADE, primary_key=True, related_name='availability')
+    next_free_slot = models.DateTimeField(blank=True, null=True, default=None)
+    open_slots = models.IntegerField(default=0)
+    last_modification_date = models.DateTimeField(auto_now=True)
 
 def generate_unique_filename_image(instance, filename):
-    image_content = instance.image.read()
-    md5_hash = hashlib.md5(image_content).hexdigest()
+    # UniqueFilenameStorage replaces the name with the MD5 of the content
     _, ext = os.path.splitext(filename)
-    new_filename = f"{md5_hash}{ext}"
-    return os.path.join('labs_content_photos', new_filename)
+    return os.path.join('labs_content_photos', f"upload{ext}")
 
 def generate_unique_filename_video(instance, filename):
-    video_content= instance.video.read()
-    md5_hash = hashlib.md5(video_content).hexdigest()
     _, ext = os.path.splitext(filename)
-    new_filename = f"{md5_hash}{ext}"
-    return os.path.join('labs_content_videos', new_filename)
+    return os.path.join('labs_content_videos', f"upload{ext}")
 
 class UniqueFilenameStorage(FileSystemStorage):
+    """
+    Content-addressed storage: files are saved as <md5><ext> in the directory
+    of the name given, and a file with the same content is stored only once.
+
+    The upload is hashed chunk by chunk while it is written to a temporary
+    file next to its destination, then renamed into place, so memory use
+    does not depend on the size of the file.
+    """
+
     def get_available_name(self, name, max_length=None):
         if max_length and len(name) > max_length:
             raise(Exception("name's length is greater than max_length"))
         return name
 
     def _save(self, name, content):
-        if self.exists(name):
-            return name
-        return super(UniqueFilenameStorage, self)._save(name, content)
+        directory, basename = os.path.split(name)
+        _, ext = os.path.splitext(basename)
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+
+        md5_hash = hashlib.md5()
+        fd, temp_path = tempfile.mkstemp(prefix='.upload-', suffix=ext, dir=full_directory)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    md5_hash.update(chunk)
+                    temp_file.write(chunk)
+
+            name = os.path.join(directory, f"{md5_hash.hexdigest()}{ext}")
+            if self.exists(name):
+                os.remove(temp_path)
+                # Restart the grace period of booking.media_gc, the file may be unreferenced
+                os.utime(self.path(name))
+            else:
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return name.replace('\\', '/')
+
+# A content holds exactly one of these fields
+CONTENT_FIELDS = ('text', 'image', 'video', 'video_link', 'link', 'title', 'subtitle')
 
 class LaboratoryContent(models.Model):
     laboratory = models.ForeignKey(Laboratory, on_delete=models.CASCADE, related_name='contents')
@@ -132,6 +219,7 @@ class LaboratoryContent(models.Model):
         blank=True,
         null=True
     )
+    image_variants = models.JSONField(blank=True, default=dict, editable=False)
     video = models.FileField(
         upload_to=generate_unique_filename_video,
         storage=UniqueFilenameStorage(),
@@ -147,3 +235,14 @@ class LaboratoryContent(models.Model):
     class Meta:
         ordering = ['order']
         unique_together = ['laboratory', 'order']
+
+class ChunkedUpload(models.Model):
+    """Resumable upload of a laboratory content video, see booking.uploads"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='chunked_uploads', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    registration_date = models.DateTimeField(auto_now_add=True)
+    last_modification_date = models.DateTimeField(auto_now=True)
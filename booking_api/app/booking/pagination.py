@@ -0,0 +1,249 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from asgiref.sync import sync_to_async
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+import json
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a unique tuple of ordering fields.
+
+    Each page is fetched with a WHERE clause on the last seen key instead of
+    an OFFSET, so the cost of a page does not grow with its position. Passing
+    paginate=false returns the whole, unpaginated list as before.
+    """
+
+    ordering = ('id',)
+    page_size = getattr(settings, 'API_PAGE_SIZE', 100)
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    paginate_query_param = 'paginate'
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+
+        if page_size is not None and page_size.isdigit() and int(page_size) > 0:
+            return min(int(page_size), self.max_page_size)
+
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            key, reverse = cursor['k'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound('Invalid cursor')
+
+        if not isinstance(key, list) or len(key) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+
+        return key, reverse
+
+    def encode_cursor(self, key, reverse):
+        cursor = json.dumps({'k': key, 'r': int(reverse)}, default=str)
+        return urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+
+    def get_key(self, item):
+        return [getattr(item, field) for field in self.ordering]
+
+    def after(self, key, reverse):
+        """Rows strictly after (or before, when reverse) the given key"""
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+
+        for position, field in enumerate(self.ordering):
+            step = Q(**{f'{field}__{lookup}': key[position]})
+            for previous_field, value in zip(self.ordering[:position], key[:position]):
+                step &= Q(**{previous_field: value})
+            condition |= step
+
+        return condition
+
+    def get_page_queryset(self, queryset, request):
+        """Queryset of the requested page plus one row, None when pagination is turned off"""
+        if request.query_params.get(self.paginate_query_param) == 'false':
+            return None
+
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        key, self.reverse = self.decode_cursor(request)
+        self.has_cursor = key is not None
+
+        ordering = [f'-{field}' if self.reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self.after(key, self.reverse))
+
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, rows):
+        self.has_more = len(rows) > self.page_size_value
+        page = rows[:self.page_size_value]
+
+        if self.reverse:
+            page.reverse()
+
+        self.page = page
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request)
+        return None if queryset is None else self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset() for async views, the page is fetched with the async ORM"""
+        queryset = self.get_page_queryset(queryset, request)
+        return None if queryset is None else self.set_page([item async for item in queryset])
+
+    def get_next_link(self):
+        if not self.page or (not self.has_more and not self.reverse):
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.get_key(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.page or not self.has_cursor or (self.reverse and not self.has_more):
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.get_key(self.page[0]), True))
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class StartDatePagination(KeysetPagination):
+    ordering = ('start_date', 'id')
+
+
+class IdPagination(KeysetPagination):
+    ordering = ('id',)
+
+
+class SlotPagination(StartDatePagination):
+    """
+    Keyset pagination of stored bookings merged with the computed open slots
+    of virtual timeframes (dicts from booking.slots.virtual_slots).
+
+    Items are ordered by (start_date, kind, id): stored rows (kind 0) by id
+    and slots (kind 1) by timeframe id, which is unique for a start date.
+    Rows are fetched with a WHERE clause on the key like the other lists.
+    The slots are built from the start date of the cursor on, at most
+    page_size + 2 per timeframe (one may share the date of the cursor and be
+    filtered out), so a page has the same shape and cost whether it contains
+    slots or not.
+    """
+
+    ordering = ('start_date', 'kind', 'id')
+    slots = ()
+
+    def get_key(self, item):
+        if isinstance(item, dict):
+            return [item['start_date'], 1, item['timeframe']]
+        return [item.start_date, 0, item.id]
+
+    def sort(self, items):
+        return sorted(items, key=self.get_key, reverse=bool(getattr(self, 'reverse', False)))
+
+    def decode_cursor(self, request):
+        key, reverse = super().decode_cursor(request)
+        if key is None:
+            return key, reverse
+
+        start_date = parse_datetime(key[0]) if isinstance(key[0], str) else None
+        if start_date is None or key[1] not in (0, 1) or not isinstance(key[2], int):
+            raise NotFound('Invalid cursor')
+
+        return [start_date, key[1], key[2]], reverse
+
+    def after(self, key, reverse):
+        """Stored rows strictly after (or before, when reverse) the given key"""
+        start_date, kind, id = key
+
+        if reverse:
+            same_date = Q(start_date=start_date) if kind == 1 else Q(start_date=start_date, id__lt=id)
+            return Q(start_date__lt=start_date) | same_date
+
+        if kind == 1:
+            return Q(start_date__gt=start_date)
+        return Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=id)
+
+    def get_page_queryset(self, queryset, request):
+        if request.query_params.get(self.paginate_query_param) == 'false':
+            return None
+
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        key, self.reverse = self.decode_cursor(request)
+        self.has_cursor = key is not None
+
+        queryset = queryset.order_by(*(['-start_date', '-id'] if self.reverse else ['start_date', 'id']))
+        if key is not None:
+            queryset = queryset.filter(self.after(key, self.reverse))
+            self.slots = [slot for slot in self.slots
+                          if (self.get_key(slot) < key if self.reverse else self.get_key(slot) > key)]
+
+        return queryset[:self.page_size_value + 1]
+
+    def set_page(self, rows):
+        return super().set_page(self.sort(rows + list(self.slots))[:self.page_size_value + 1])
+
+    def get_slot_arguments(self, request):
+        """(cursor date, reverse, limit) for the get_slots callable of paginate_slots"""
+        key, reverse = self.decode_cursor(request)
+        return (key[0] if key is not None else None), reverse, self.get_page_size(request) + 2
+
+    def paginate_slots(self, queryset, get_slots, request):
+        """
+        Page of the rows of queryset and of the slots returned by
+        get_slots(cursor_date, reverse, limit), None when pagination is
+        turned off.
+        """
+        if request.query_params.get(self.paginate_query_param) == 'false':
+            return None
+
+        self.slots = get_slots(*self.get_slot_arguments(request))
+        return self.paginate_queryset(queryset, request)
+
+    async def apaginate_slots(self, queryset, get_slots, request):
+        if request.query_params.get(self.paginate_query_param) == 'false':
+            return None
+
+        self.slots = await sync_to_async(get_slots)(*self.get_slot_arguments(request))
+        return await self.apaginate_queryset(queryset, request)
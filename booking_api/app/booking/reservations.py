@@ -0,0 +1,95 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.availability import adjust_laboratory_availability
+from booking.models import Booking
+from booking.slots import create_slot_bookings
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+SLOT_TAKEN = 'slot_taken'
+QUOTA_EXCEEDED = 'quota_exceeded'
+INVALID_REQUEST = 'invalid_request'
+
+
+class ReservationError(Exception):
+    """The slots could not be reserved, code is SLOT_TAKEN, QUOTA_EXCEEDED or INVALID_REQUEST"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def reserve_bookings(booking_ids, user, public=None):
+    """
+    Reserve several bookings of one equipment for a user, all or nothing.
+
+    The user row is locked so that concurrent reservations of the same user
+    are counted one after the other against Equipment.bookings_per_user, once
+    for the whole set. The slots are claimed with a single conditional UPDATE
+    on reserved_by IS NULL; if any of them was taken the transaction is rolled
+    back. Bookings the user already holds are returned unchanged.
+    """
+    booking_ids = set(booking_ids)
+
+    with transaction.atomic():
+        get_user_model().objects.select_for_update().only('id').get(pk=user.pk)
+        bookings = list(Booking.objects.select_related('equipment', 'timeframe').filter(id__in=booking_ids))
+
+        if len(bookings) != len(booking_ids):
+            raise Booking.DoesNotExist('Booking does not exist.')
+
+        if len({booking.equipment_id for booking in bookings}) > 1:
+            raise ReservationError(INVALID_REQUEST, 'All bookings must belong to the same equipment')
+
+        equipment = bookings[0].equipment
+        new_bookings = [booking for booking in bookings if booking.reserved_by_id != user.pk]
+        if not new_bookings:
+            return bookings
+
+        requested = Counter(booking.timeframe_id for booking in new_bookings)
+        reserved = dict(Booking.objects.filter(timeframe_id__in=requested, reserved_by=user)
+                        .values('timeframe_id').annotate(count=Count('id')).values_list('timeframe_id', 'count'))
+        for timeframe_id, count in requested.items():
+            if reserved.get(timeframe_id, 0) + count > equipment.bookings_per_user:
+                raise ReservationError(QUOTA_EXCEEDED, f'You can reserve up to {equipment.bookings_per_user} '
+                                                       f'bookings in this timeframe')
+
+        changes = {'reserved_by': user, 'available': False, 'last_modification_date': timezone.now()}
+        if public is not None:
+            changes['public'] = Booking._meta.get_field('public').to_python(public)
+
+        claimed = Booking.objects.filter(id__in=[booking.id for booking in new_bookings], reserved_by__isnull=True,
+                                         available=True).update(**changes)
+        if claimed != len(new_bookings):
+            raise ReservationError(SLOT_TAKEN, 'This booking is not available' if len(booking_ids) == 1
+                                   else 'Some of these bookings are not available')
+
+        adjust_laboratory_availability(equipment.laboratory_id, taken=new_bookings)
+
+    return list(Booking.objects.select_related('equipment', 'timeframe').filter(id__in=booking_ids).order_by('start_date'))
+
+
+def reserve_booking(booking_id, user, public=None):
+    """Reserve a single booking for a user and return it, see reserve_bookings"""
+    return reserve_bookings([booking_id], user, public)[0]
+
+
+def bookings_in_range(equipment_id, start_date, end_date):
+    """
+    Ids of the bookings of an equipment starting in [start_date, end_date).
+
+    The open slots of virtual timeframes in the range get their Booking rows
+    first, in the caller's transaction, so they are rolled back with it if
+    the reservation fails.
+    """
+    create_slot_bookings(start_date, end_date, equipment_id)
+    return list(Booking.objects.filter(equipment_id=equipment_id, start_date__gte=start_date, start_date__lt=end_date)
+                .values_list('id', flat=True))
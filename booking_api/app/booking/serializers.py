@@ -5,9 +5,13 @@ Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 """
 
 from rest_framework import serializers
-from booking.models import Booking, Equipment, Laboratory, TimeFrame, LaboratoryContent
+from booking.models import CONTENT_FIELDS, Booking, ChunkedUpload, Equipment, Laboratory, LaboratoryAvailability, TimeFrame, LaboratoryContent
+from booking.availability import schedule_availability_refresh
+from booking.images import variant_urls
+from booking.materialization import should_materialize_in_background
+from booking.slots import SlotSchedule, materialize_slots
+from django.db import transaction
 from django.utils.crypto import get_random_string
-from datetime import datetime, date, timedelta
 
 from users.serializers import UserSerializer
 
@@ -42,6 +46,30 @@ class PublicBookingSerializer(serializers.ModelSerializer):
         fields = ['id', 'start_date', 'end_date', 'available', 'public', 'access_key', 'password', 'owner', 'reserved_by', 'equipment']
 
 
+class VirtualSlotSerializer(serializers.Serializer):
+    """Open slot of a virtual timeframe, shaped like a serialized Booking"""
+
+    id = serializers.IntegerField(allow_null=True)
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    available = serializers.BooleanField()
+    public = serializers.BooleanField()
+    access_key = serializers.UUIDField(allow_null=True)
+    password = serializers.CharField(allow_null=True)
+    owner = serializers.IntegerField()
+    reserved_by = serializers.IntegerField(allow_null=True)
+    equipment = serializers.IntegerField()
+    timeframe = serializers.IntegerField()
+    slot = serializers.IntegerField()
+
+
+def serialize_bookings_and_slots(items, serializer_class=BookingSerializer, context=None):
+    """Serialize a list of Booking rows and virtual slots, keeping its order"""
+    rows = iter(serializer_class([item for item in items if not isinstance(item, dict)], many=True, context=context).data)
+    slots = iter(VirtualSlotSerializer([item for item in items if isinstance(item, dict)], many=True).data)
+    return [next(slots) if isinstance(item, dict) else next(rows) for item in items]
+
+
 class EquipmentSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -62,7 +90,9 @@ class TimeFrameSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TimeFrame
-        fields = ['id', 'start_date', 'end_date', 'start_hour', 'end_hour', 'slot_duration', 'equipment', 'enabled', 'owner']
+        fields = ['id', 'start_date', 'end_date', 'start_hour', 'end_hour', 'slot_duration', 'equipment', 'enabled', 'owner',
+                  'virtual', 'status', 'total_slots', 'materialized_slots']
+        read_only_fields = ['status', 'total_slots', 'materialized_slots']
         extra_kwargs = {
             'start_date': {'required': True},
             'end_date': {'required': True},
@@ -70,64 +100,48 @@ class TimeFrameSerializer(serializers.ModelSerializer):
             'end_hour': {'required': True},
             'slot_duration': {'required': True},
             'equipment': {'required': True},
-            'owner': {'required': False}
+            'owner': {'required': False},
+            'virtual': {'required': False}
         }
 
     def create(self, validated_data):
         public = self.context['request'].data.get('public', False)
+        background = self.context['request'].data.get('background')
 
         start_date = validated_data['start_date']
         end_date = validated_data['end_date']
-        start_hour = validated_data['start_hour']
-        end_hour = validated_data['end_hour']
-
-        equipment = validated_data['equipment']
-        slot_duration = validated_data['slot_duration']
 
         if start_date > end_date:
             raise serializers.ValidationError("Start date must be before end date")
 
-        time_delta = end_date - start_date
-        number_of_days = time_delta.days
-
-        if start_hour > end_hour:
-            yesterday = datetime.now() - timedelta(1)
-            number_of_slots = int(((datetime.combine(date.today(), end_hour) - datetime.combine(yesterday, start_hour)).total_seconds() / 60) / slot_duration)
-        else:
-            number_of_slots = int(((datetime.combine(date.today(), end_hour) - datetime.combine(date.today(), start_hour)).total_seconds() / 60) / slot_duration)
+        total_slots = len(SlotSchedule(start_date, end_date, validated_data['start_hour'],
+                                       validated_data['end_hour'], validated_data['slot_duration']))
 
         validated_data['owner'] = self.context['request'].user
-        timeframe = TimeFrame.objects.create(**validated_data)
-
-        bookings = []
+        validated_data['public'] = TimeFrame._meta.get_field('public').to_python(public)
+        validated_data['total_slots'] = total_slots
 
-        for _ in range(number_of_days + 1):
-            start_date = datetime.combine(start_date, start_hour).replace(tzinfo=datetime.now().astimezone().tzinfo)
-            accumulated_date =  start_date
+        schedule_availability_refresh(validated_data['equipment'].laboratory_id)
 
-            for _ in range(number_of_slots):
-                end_date = accumulated_date + timedelta(minutes=slot_duration)
+        if validated_data.get('virtual'):
+            return TimeFrame.objects.create(**validated_data)
 
-                booking = Booking(
-                    start_date=accumulated_date,
-                    end_date=end_date,
-                    available=True,
-                    public=public,
-                    password=get_random_string(15),
-                    owner=self.context['request'].user,
-                    timeframe=timeframe,
-                    equipment=equipment
-                )
-                bookings.append(booking)
+        if should_materialize_in_background(total_slots, background):
+            validated_data['status'] = TimeFrame.MATERIALIZING
+            return TimeFrame.objects.create(**validated_data)
 
-                accumulated_date = end_date
-
-            start_date = start_date + timedelta(days=1)
-
-        Booking.objects.bulk_create(bookings)
+        with transaction.atomic():
+            timeframe = TimeFrame.objects.create(**validated_data)
+            timeframe.materialized_slots = materialize_slots(timeframe, public=timeframe.public)
+            timeframe.save(update_fields=['materialized_slots'])
 
         return timeframe
 
+    def update(self, instance, validated_data):
+        validated_data.pop('virtual', None)
+        schedule_availability_refresh(instance.equipment.laboratory_id)
+        return super().update(instance, validated_data)
+
 class LaboratorySerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -141,16 +155,48 @@ class LaboratorySerializer(serializers.ModelSerializer):
         }
 
     is_available_now = serializers.ReadOnlyField()
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, laboratory):
+        return variant_urls(laboratory, self.context.get('request'))
 
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
-        return Laboratory.objects.create(**validated_data)
+        laboratory = Laboratory.objects.create(**validated_data)
+        LaboratoryAvailability.objects.create(laboratory=laboratory)
+        return laboratory
+
+class PublicLaboratorySerializer(LaboratorySerializer):
+    """Laboratory grid entry, with the open slot summary of the laboratory"""
+
+    next_free_slot = serializers.SerializerMethodField()
+    open_slots = serializers.SerializerMethodField()
+
+    def get_summary(self, laboratory):
+        try:
+            return laboratory.availability
+        except LaboratoryAvailability.DoesNotExist:
+            return None
+
+    def get_next_free_slot(self, laboratory):
+        summary = self.get_summary(laboratory)
+        return serializers.DateTimeField().to_representation(summary.next_free_slot) \
+            if summary and summary.next_free_slot else None
+
+    def get_open_slots(self, laboratory):
+        summary = self.get_summary(laboratory)
+        return summary.open_slots if summary else None
 
 class LaboratoryContentSerializer(serializers.ModelSerializer):
     class Meta:
         model = LaboratoryContent
         fields = '__all__'
 
+    image_variants = serializers.SerializerMethodField()
+
+    def get_image_variants(self, content):
+        return variant_urls(content, self.context.get('request'))
+
     def validate(self, data):
         non_null_fields = ['text', 'image', 'video', 'video_link', 'link', 'title', 'subtitle']
         filled_fields = [field for field in non_null_fields if data.get(field) is not None]
@@ -160,9 +206,60 @@ class LaboratoryContentSerializer(serializers.ModelSerializer):
 
         return data
 
+class LaboratoryContentBlockSerializer(serializers.Serializer):
+    """A content of LaboratoryContentBatchSerializer, image and video are resolved by booking.contents"""
+
+    text = serializers.CharField(max_length=1500, required=False, allow_null=True)
+    image = serializers.CharField(required=False, allow_null=True)
+    video = serializers.CharField(required=False, allow_null=True)
+    video_link = serializers.URLField(required=False, allow_null=True)
+    link = serializers.URLField(required=False, allow_null=True)
+    title = serializers.CharField(max_length=100, required=False, allow_null=True)
+    subtitle = serializers.CharField(max_length=100, required=False, allow_null=True)
+
+    def validate(self, data):
+        filled_fields = [field for field in CONTENT_FIELDS if data.get(field) is not None]
+
+        if len(filled_fields) != 1:
+            raise serializers.ValidationError("Exactly one field among text, image, video, video_link, link, title, subtitle should have a non-null value.")
+
+        files = self.context.get('files', {})
+        if data.get('image') in files:
+            serializers.ImageField().run_validation(files[data['image']])
+
+        return data
+
+class LaboratoryContentBatchSerializer(serializers.Serializer):
+    contents = LaboratoryContentBlockSerializer(many=True, allow_empty=True)
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ('id', 'filename', 'size', 'offset')
+        read_only_fields = ('id', 'offset')
+        extra_kwargs = {'size': {'min_value': 1}}
+
+class ChunkedUploadFinalizeSerializer(serializers.Serializer):
+    laboratory = serializers.PrimaryKeyRelatedField(queryset=Laboratory.objects.all())
+    order = serializers.IntegerField(min_value=0)
+    is_last = serializers.BooleanField(default=False)
+
 class UserLaboratoryAccessSerializer(serializers.Serializer):
     laboratory_id = serializers.IntegerField()
 
+class BulkReservationSerializer(serializers.Serializer):
+    bookings = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    equipment = serializers.IntegerField(required=False)
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+    public = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        if 'bookings' not in data and not all(field in data for field in ('equipment', 'start_date', 'end_date')):
+            raise serializers.ValidationError("Provide a list of bookings, or an equipment with a start_date and end_date.")
+
+        return data
+
 class UserBookingAvailabilitySerializer(serializers.Serializer):
     equipment_id = serializers.IntegerField()
     timeframe_id = serializers.IntegerField()
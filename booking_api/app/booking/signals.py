@@ -0,0 +1,37 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.cache import LABORATORIES_SCOPE, contents_scope, invalidate_on_commit, laboratory_scope
+from booking.images import refresh_variants
+from booking.models import Laboratory, LaboratoryAvailability, LaboratoryContent
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+
+# Connected before the cache handlers, so that invalidated entries are rebuilt with the variants
+@receiver(post_save, sender=Laboratory)
+@receiver(post_save, sender=LaboratoryContent)
+def refresh_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_variants(instance)
+
+
+@receiver([post_save, post_delete], sender=Laboratory)
+def invalidate_laboratory(sender, instance, **kwargs):
+    invalidate_on_commit(LABORATORIES_SCOPE, laboratory_scope(instance.pk), contents_scope(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=LaboratoryContent)
+def invalidate_laboratory_content(sender, instance, **kwargs):
+    # A content change is a change of its laboratory for Last-Modified
+    Laboratory.objects.filter(pk=instance.laboratory_id).update(last_modification_date=timezone.now())
+    invalidate_on_commit(LABORATORIES_SCOPE, laboratory_scope(instance.laboratory_id), contents_scope(instance.laboratory_id))
+
+
+@receiver([post_save, post_delete], sender=LaboratoryAvailability)
+def invalidate_laboratory_availability(sender, instance, **kwargs):
+    invalidate_on_commit(LABORATORIES_SCOPE, laboratory_scope(instance.laboratory_id))
@@ -0,0 +1,346 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.models import Booking, TimeFrame
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+import csv
+import io
+import secrets
+import uuid
+
+PASSWORD_LENGTH = 15
+PASSWORD_ALPHABET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+# Random bytes are mapped onto the alphabet with a translation table. Bytes
+# above the largest multiple of the alphabet size are dropped so that every
+# character keeps the same probability as with get_random_string.
+_PASSWORD_LIMIT = 256 - 256 % len(PASSWORD_ALPHABET)
+_PASSWORD_TABLE = bytes(ord(PASSWORD_ALPHABET[b % len(PASSWORD_ALPHABET)]) for b in range(256))
+_PASSWORD_REJECTED = bytes(range(_PASSWORD_LIMIT, 256))
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def count_slots_per_day(start_hour, end_hour, slot_duration):
+    """Number of slots between start_hour and end_hour, wrapping past midnight"""
+    start_minutes = start_hour.hour * 60 + start_hour.minute + start_hour.second / 60
+    end_minutes = end_hour.hour * 60 + end_hour.minute + end_hour.second / 60
+
+    if start_hour > end_hour:
+        end_minutes += 24 * 60
+
+    return int((end_minutes - start_minutes) / slot_duration)
+
+
+def generate_passwords(count, length=PASSWORD_LENGTH):
+    """Draw count random passwords from a single block of OS randomness"""
+    needed = count * length
+    pool = b''
+
+    while len(pool) < needed:
+        missing = needed - len(pool)
+        pool += secrets.token_bytes(missing + missing // 16 + 16).translate(_PASSWORD_TABLE, _PASSWORD_REJECTED)
+
+    pool = pool[:needed].decode('ascii')
+    return [pool[i:i + length] for i in range(0, needed, length)]
+
+
+class SlotSchedule:
+    """
+    Slot boundaries of a timeframe, computed arithmetically from its rules.
+
+    Each day starts at start_hour on the wall clock of tzinfo, the default
+    time zone (settings.TIME_ZONE) unless another one is given, and its
+    slots follow each other in real time. A slot index therefore maps to the
+    same instant whatever the UTC offset of the server, or of the day the
+    code runs, which is how virtual slots are found again by start_date.
+    """
+
+    def __init__(self, start_date, end_date, start_hour, end_hour, slot_duration, tzinfo=None):
+        self.tzinfo = tzinfo or timezone.get_default_timezone()
+        self.first_local_day = datetime.combine(start_date, start_hour)
+        self.number_of_days = max((end_date - start_date).days + 1, 0)
+        self.slot_duration = timedelta(minutes=slot_duration)
+        self.slots_per_day = max(count_slots_per_day(start_hour, end_hour, slot_duration), 0)
+        self.first_day = self.day_start(0)
+
+    @classmethod
+    def from_timeframe(cls, timeframe):
+        return cls(timeframe.start_date, timeframe.end_date, timeframe.start_hour,
+                   timeframe.end_hour, timeframe.slot_duration)
+
+    def __len__(self):
+        return self.number_of_days * self.slots_per_day
+
+    def day_start(self, day):
+        """Start of the first slot of a day, in UTC so that adding durations counts real time"""
+        local = timezone.make_aware(self.first_local_day + timedelta(days=day), self.tzinfo)
+        return local.astimezone(dt_timezone.utc)
+
+    def local_day(self, value):
+        """Day of the schedule whose wall clock start_hour is the last one at or before value"""
+        return (timezone.make_naive(value, self.tzinfo) - self.first_local_day) // timedelta(days=1)
+
+    def slot(self, index):
+        """Return the (start, end) pair of the slot at the given index"""
+        day, position = divmod(index, self.slots_per_day)
+        start = self.day_start(day) + position * self.slot_duration
+        return start, start + self.slot_duration
+
+    def iter_slots(self, start=0, stop=None):
+        """Yield (index, start, end) for slots in [start, stop)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+
+        offsets = [position * self.slot_duration for position in range(self.slots_per_day)]
+        first_day, position = divmod(start, self.slots_per_day)
+        index = start
+
+        for day in range(first_day, self.number_of_days):
+            day_start = self.day_start(day)
+
+            for offset in offsets[position:]:
+                if index >= stop:
+                    return
+
+                slot_start = day_start + offset
+                yield index, slot_start, slot_start + self.slot_duration
+                index += 1
+
+            position = 0
+
+    def day_positions_between(self, start_date, end_date):
+        """Yield (day, first, last) so that positions [first, last) of day start in [start_date, end_date)"""
+        if not len(self):
+            return
+
+        # One day of margin on each side for the UTC offset changing in between
+        first_day = max(self.local_day(start_date) - 1, 0)
+        last_day = min(self.local_day(end_date) + 2, self.number_of_days)
+
+        for day in range(first_day, last_day):
+            day_start = self.day_start(day)
+            first_position = min(max(-((day_start - start_date) // self.slot_duration), 0), self.slots_per_day)
+            last_position = min(max(-((day_start - end_date) // self.slot_duration), 0), self.slots_per_day)
+
+            if first_position < last_position:
+                yield day, first_position, last_position
+
+    def iter_slots_between(self, start_date, end_date, reverse=False):
+        """Yield (index, start, end) for slots starting in [start_date, end_date), latest first with reverse"""
+        days = self.day_positions_between(start_date, end_date)
+        if reverse:
+            # At most one tuple per day of the range
+            days = reversed(list(days))
+
+        for day, first_position, last_position in days:
+            day_start = self.day_start(day)
+            positions = range(first_position, last_position)
+
+            for position in (reversed(positions) if reverse else positions):
+                slot_start = day_start + position * self.slot_duration
+                yield day * self.slots_per_day + position, slot_start, slot_start + self.slot_duration
+
+    def count_between(self, start_date, end_date):
+        """Number of slots starting in [start_date, end_date), without building them"""
+        return sum(last - first for _, first, last in self.day_positions_between(start_date, end_date))
+
+    def iter_chunks(self, start=0, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield lists of at most chunk_size (index, start, end) tuples"""
+        for chunk_start in range(start, len(self), chunk_size):
+            yield list(self.iter_slots(chunk_start, chunk_start + chunk_size))
+
+
+def _bulk_write(timeframe, slots, public):
+    passwords = generate_passwords(len(slots))
+    bookings = [
+        Booking(
+            start_date=slot_start,
+            end_date=slot_end,
+            available=True,
+            public=public,
+            password=password,
+            owner_id=timeframe.owner_id,
+            timeframe_id=timeframe.id,
+            equipment_id=timeframe.equipment_id
+        )
+        for (_, slot_start, slot_end), password in zip(slots, passwords)
+    ]
+    Booking.objects.bulk_create(bookings)
+
+
+def _copy_write(timeframe, slots, public):
+    columns = ['start_date', 'end_date', 'available', 'public', 'access_key', 'password', 'owner',
+               'reserved_by', 'equipment', 'timeframe', 'registration_date', 'last_modification_date']
+    db_columns = ', '.join(Booking._meta.get_field(name).column for name in columns)
+
+    now = timezone.now().isoformat()
+    passwords = generate_passwords(len(slots))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for (_, slot_start, slot_end), password in zip(slots, passwords):
+        writer.writerow([
+            slot_start.isoformat(), slot_end.isoformat(), 't', 't' if public else 'f', uuid.uuid4(), password,
+            timeframe.owner_id, '', timeframe.equipment_id, timeframe.id, now, now
+        ])
+
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {Booking._meta.db_table} ({db_columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def get_slot_writer(use_copy=None):
+    """Pick the chunk writer, COPY is only available on PostgreSQL"""
+    if use_copy is None:
+        use_copy = getattr(settings, 'BOOKING_SLOT_WRITER', 'copy') == 'copy'
+
+    if use_copy and connection.vendor == 'postgresql':
+        return _copy_write
+
+    return _bulk_write
+
+
+def write_slots(timeframe, slots, public=False, use_copy=None):
+    """Insert one chunk of (index, start, end) slots as Booking rows"""
+    if slots:
+        public = Booking._meta.get_field('public').to_python(public)
+        get_slot_writer(use_copy)(timeframe, slots, public)
+
+
+def materialize_slots(timeframe, public=False, start=0, chunk_size=None, use_copy=None):
+    """Create the Booking rows of a timeframe in bounded chunks, return the number written"""
+    schedule = SlotSchedule.from_timeframe(timeframe)
+    chunk_size = chunk_size or getattr(settings, 'BOOKING_SLOT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    written = 0
+
+    for slots in schedule.iter_chunks(start, chunk_size):
+        write_slots(timeframe, slots, public, use_copy)
+        written += len(slots)
+
+    return written
+
+
+def virtual_slot(timeframe, index, slot_start, slot_end):
+    """Serialized form of a slot that has no Booking row yet"""
+    return {
+        'id': None,
+        'start_date': slot_start,
+        'end_date': slot_end,
+        'available': True,
+        'public': timeframe.public,
+        'access_key': None,
+        'password': None,
+        'owner': timeframe.owner_id,
+        'reserved_by': None,
+        'equipment': timeframe.equipment_id,
+        'timeframe': timeframe.id,
+        'slot': index
+    }
+
+
+def virtual_slots(start_date, end_date, equipment_id=None, reverse=False, limit=None):
+    """
+    Open slots of virtual timeframes starting in [start_date, end_date).
+
+    Slots are computed from the timeframe rules. Any slot that already has a
+    Booking row, reserved or not, is left out: the row itself is listed.
+    With limit, at most that many slots of each timeframe are built, the
+    earliest ones (latest with reverse), so a page of the range costs the
+    same whatever its width.
+    """
+    slots = []
+    for timeframe in virtual_timeframes(start_date, end_date, equipment_id):
+        for index, slot_start, slot_end in islice(iter_open_virtual_slots(timeframe, start_date, end_date, reverse,
+                                                                          limit or DEFAULT_CHUNK_SIZE), limit):
+            slots.append(virtual_slot(timeframe, index, slot_start, slot_end))
+
+    return slots
+
+
+def virtual_timeframes(start_date, end_date, equipment_id=None):
+    """Enabled virtual timeframes that may have slots starting in [start_date, end_date)"""
+    timeframes = TimeFrame.objects.filter(virtual=True, enabled=True, start_date__lt=end_date + timedelta(days=1),
+                                          end_date__gt=start_date - timedelta(days=2))
+    if equipment_id is not None:
+        timeframes = timeframes.filter(equipment_id=equipment_id)
+
+    return timeframes
+
+
+def iter_open_virtual_slots(timeframe, start_date, end_date, reverse=False, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (index, start, end) of the slots of a virtual timeframe in
+    [start_date, end_date) without a Booking row, in order (latest first
+    with reverse). The rows are looked up for batch_size slots at a time.
+    """
+    schedule = SlotSchedule.from_timeframe(timeframe)
+    slots = schedule.iter_slots_between(start_date, end_date, reverse)
+
+    while True:
+        batch = list(islice(slots, batch_size))
+        if not batch:
+            return
+
+        starts = [slot_start for _, slot_start, _ in batch]
+        taken = set(Booking.objects.filter(timeframe=timeframe, start_date__gte=min(starts),
+                                           start_date__lte=max(starts)).values_list('start_date', flat=True))
+        yield from (slot for slot in batch if slot[1] not in taken)
+
+
+def open_virtual_slots(timeframe, start_date, end_date):
+    """(index, start, end) of the slots of a virtual timeframe in [start_date, end_date) without a Booking row"""
+    return list(iter_open_virtual_slots(timeframe, start_date, end_date))
+
+
+def create_slot_bookings(start_date, end_date, equipment_id):
+    """
+    Write the Booking rows of the open virtual slots of an equipment starting
+    in [start_date, end_date), so they can be reserved like stored slots.
+
+    The timeframes are locked like in get_or_create_slot_booking, and the
+    missing rows of each one are inserted with a single bulk_create. Must be
+    called inside a transaction.
+    """
+    timeframes = virtual_timeframes(start_date, end_date, equipment_id).select_for_update().order_by('id')
+
+    for timeframe in timeframes:
+        slots = open_virtual_slots(timeframe, start_date, end_date)
+        if slots:
+            _bulk_write(timeframe, slots, timeframe.public)
+
+
+def get_or_create_slot_booking(timeframe, index):
+    """
+    Return the Booking row of a virtual slot, creating it on first use.
+
+    The caller must hold a lock on the timeframe row so that two requests
+    cannot create the same slot twice.
+    """
+    schedule = SlotSchedule.from_timeframe(timeframe)
+    if index >= len(schedule):
+        raise IndexError(f'Timeframe {timeframe.id} has no slot {index}')
+
+    slot_start, slot_end = schedule.slot(index)
+    booking = Booking.objects.filter(timeframe=timeframe, start_date=slot_start).first()
+    if booking is not None:
+        return booking
+
+    return Booking.objects.create(
+        start_date=slot_start,
+        end_date=slot_end,
+        available=True,
+        public=timeframe.public,
+        password=generate_passwords(1)[0],
+        owner_id=timeframe.owner_id,
+        timeframe=timeframe,
+        equipment_id=timeframe.equipment_id
+    )
@@ -0,0 +1,136 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from users.authentication import token_cache
+
+import datetime
+import json
+
+import pytz
+
+
+class AsyncBookingViewsApiTests(TestCase):
+    """Test the async booking endpoints return the same data as the sync ones"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.user.is_active = True
+        self.user.save()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+        start_date = datetime.datetime(2024, 3, 1, 8, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(8),
+                                             end_hour=datetime.time(9), slot_duration=60, equipment=self.equipment,
+                                             owner=self.user)
+
+        for number in range(12):
+            Booking.objects.create(start_date=start_date + datetime.timedelta(hours=number),
+                                   end_date=start_date + datetime.timedelta(hours=number + 1),
+                                   owner=self.user, equipment=self.equipment, timeframe=timeframe,
+                                   reserved_by=self.user if number % 2 else None)
+
+        now = timezone.now()
+        self.current = Booking.objects.create(start_date=now - datetime.timedelta(minutes=5),
+                                              end_date=now + datetime.timedelta(minutes=55), public=False,
+                                              password='secret', owner=self.user, equipment=self.equipment,
+                                              timeframe=timeframe)
+
+    def assertSameResponse(self, sync_url, async_url):
+        sync_res = self.client.get(sync_url)
+        async_res = self.client.get(async_url)
+
+        self.assertEqual(async_res.status_code, sync_res.status_code)
+        self.assertEqual(json.loads(async_res.content.replace(b'/async/', b'/')), json.loads(sync_res.content))
+        return async_res
+
+    def test_booking_list(self):
+        """Test the async booking list matches the sync one, range and pages included"""
+        params = '?equipment={}&start_date=2024-03-01T00:00:00Z&end_date=2024-03-02T00:00:00Z&page_size=5'.format(
+            self.equipment.id)
+
+        res = self.assertSameResponse(reverse('bookinglist') + params, reverse('asyncbookinglist') + params)
+        next_page = json.loads(res.content)['next']
+        self.assertIsNotNone(next_page)
+        cursor = next_page.split('cursor=')[1].split('&')[0]
+        self.assertSameResponse(reverse('bookinglist') + params + '&cursor=' + cursor,
+                                reverse('asyncbookinglist') + params + '&cursor=' + cursor)
+
+    def test_booking_list_with_virtual_slots(self):
+        """Test the async list pages virtual slots like the sync one"""
+        TimeFrame.objects.create(start_date=datetime.datetime(2024, 3, 1, tzinfo=pytz.UTC),
+                                 end_date=datetime.datetime(2024, 3, 1, tzinfo=pytz.UTC), start_hour=datetime.time(9),
+                                 end_hour=datetime.time(11), slot_duration=30, equipment=self.equipment,
+                                 owner=self.user, virtual=True, total_slots=4)
+        params = '?equipment={}&start_date=2024-03-01T00:00:00Z&end_date=2024-03-02T00:00:00Z&page_size=3'.format(
+            self.equipment.id)
+
+        res = self.assertSameResponse(reverse('bookinglist') + params, reverse('asyncbookinglist') + params)
+        cursor = json.loads(res.content)['next'].split('cursor=')[1].split('&')[0]
+        res = self.assertSameResponse(reverse('bookinglist') + params + '&cursor=' + cursor,
+                                      reverse('asyncbookinglist') + params + '&cursor=' + cursor)
+
+        self.assertEqual([booking['slot'] for booking in json.loads(res.content)['results'] if booking['id'] is None],
+                         [1, 2])
+
+    def test_booking_user_list(self):
+        """Test the async list of the user's reservations matches the sync one"""
+        res = self.assertSameResponse(reverse('bookinguser'), reverse('asyncbookinguser'))
+
+        self.assertEqual(len(json.loads(res.content)['results']), 6)
+
+    def test_invalid_cursor(self):
+        """Test an invalid cursor is a 404 like in the sync list, not a server error"""
+        res = self.assertSameResponse(reverse('bookinguser') + '?cursor=garbage',
+                                      reverse('asyncbookinguser') + '?cursor=garbage')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_booking_access(self):
+        """Test the async access check matches the sync one"""
+        params = f'?access_key={self.current.access_key}&pwd=secret'
+
+        res = self.assertSameResponse(reverse('bookingreserve') + params, reverse('asyncbookingreserve') + params)
+        self.assertEqual(len(json.loads(res.content)), 1)
+
+        res = self.client.get(reverse('asyncbookingreserve') + f'?access_key={self.current.access_key}&pwd=wrong')
+        self.assertEqual(json.loads(res.content), [])
+
+    def test_authentication_required(self):
+        """Test the async lists reject missing and invalid tokens"""
+        client = APIClient()
+        res = client.get(reverse('asyncbookinguser'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+        client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        res = client.get(reverse('asyncbookinguser'))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_token_skips_queries(self):
+        """Test a cached token authenticates without a query"""
+        self.client.get(reverse('asyncbookinguser'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse('asyncbookinguser'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
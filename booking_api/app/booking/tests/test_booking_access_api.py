@@ -0,0 +1,98 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+
+import datetime
+
+ACCESS_URL = reverse('bookingreserve')
+VERDICT_URL = reverse('bookingaccessverdict')
+
+
+class BookingAccessApiTests(TestCase):
+    """Test the access key checks used by the remote labs"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+        now = timezone.now()
+        self.timeframe = TimeFrame.objects.create(start_date=now, end_date=now, start_hour=datetime.time(8),
+                                                  end_hour=datetime.time(9), slot_duration=60, equipment=equipment,
+                                                  owner=self.user)
+        self.booking = self.create_booking(now - datetime.timedelta(minutes=10), now + datetime.timedelta(minutes=50))
+
+    def create_booking(self, start_date, end_date, public=False):
+        return Booking.objects.create(start_date=start_date, end_date=end_date, public=public, password='secret',
+                                      owner=self.user, equipment=self.timeframe.equipment, timeframe=self.timeframe)
+
+    def get_verdict(self, booking, password='secret'):
+        return self.client.get(VERDICT_URL, {'access_key': str(booking.access_key), 'pwd': password})
+
+    def test_verdict_granted(self):
+        """Test a current booking is granted with its expiry, in one query"""
+        with self.assertNumQueries(1):
+            res = self.get_verdict(self.booking)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['granted'])
+        self.assertEqual(res.data['end_date'], self.booking.end_date)
+        self.assertTrue(0 < res.data['expires_in'] <= 50 * 60)
+        self.assertIn(f'max-age={res.data["expires_in"]}', res['Cache-Control'])
+        self.assertIn('private', res['Cache-Control'])
+
+    def test_verdict_wrong_password(self):
+        """Test a wrong password is denied without details"""
+        res = self.get_verdict(self.booking, 'wrong')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res.data, {'granted': False, 'reason': 'invalid'})
+        self.assertIn('no-cache', res['Cache-Control'])
+
+    def test_verdict_public_booking(self):
+        """Test a public booking is granted without password"""
+        self.booking.public = True
+        self.booking.save()
+
+        res = self.get_verdict(self.booking, '')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['granted'])
+
+    def test_verdict_outside_of_slot(self):
+        """Test bookings that have not started or have ended are denied with the reason"""
+        now = timezone.now()
+        upcoming = self.create_booking(now + datetime.timedelta(hours=1), now + datetime.timedelta(hours=2))
+        past = self.create_booking(now - datetime.timedelta(hours=2), now - datetime.timedelta(hours=1))
+
+        self.assertEqual(self.get_verdict(upcoming).data['reason'], 'not_started')
+        self.assertEqual(self.get_verdict(past).data['reason'], 'ended')
+
+    def test_verdict_malformed_key(self):
+        """Test a malformed access key is denied without a query"""
+        with self.assertNumQueries(0):
+            res = self.client.get(VERDICT_URL, {'access_key': 'abc', 'pwd': 'secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_access_list_single_query(self):
+        """Test the access list checks the key, password and time in one query"""
+        with self.assertNumQueries(1):
+            res = self.client.get(ACCESS_URL, {'access_key': str(self.booking.access_key), 'pwd': 'secret'})
+
+        self.assertEqual([booking['id'] for booking in res.data], [self.booking.id])
+
+        res = self.client.get(ACCESS_URL, {'access_key': str(self.booking.access_key), 'pwd': 'wrong'})
+        self.assertEqual(res.data, [])
@@ -0,0 +1,81 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from core.models import OutboundEmail
+from utils import get_correct_datetime, get_time_zone, localize_datetimes
+
+import datetime
+
+import pytz
+
+
+class BookingEmailTimeZoneTests(TestCase):
+    """Test the booking emails are written in the time zone of each recipient"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = get_user_model().objects.create_user('owner@upb.edu', 'Password123', time_zone='Europe/Madrid')
+        self.student = get_user_model().objects.create_user('student@upb.edu', 'Password123',
+                                                            time_zone='America/La_Paz', name='Test', last_name='User')
+        self.client.force_authenticate(self.student)
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.owner, notify_owner=True)
+        equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.owner)
+        start_date = datetime.datetime(2024, 3, 1, 14, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(14),
+                                             end_hour=datetime.time(15), slot_duration=60, equipment=equipment,
+                                             owner=self.owner)
+        self.booking = Booking.objects.create(start_date=start_date, end_date=start_date + datetime.timedelta(hours=1),
+                                              owner=self.owner, equipment=equipment, timeframe=timeframe,
+                                              available=False, reserved_by=self.student)
+
+    def patch_without_user_queries(self, params):
+        url = reverse('bookingdetail', args=[self.booking.id]) + params
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(url, {'public': False, 'available': False}, format='json')
+
+        user_table = get_user_model()._meta.db_table
+        self.assertFalse([query['sql'] for query in queries if f'FROM "{user_table}"' in query['sql']])
+        return res
+
+    def test_confirmation_in_recipient_time_zones(self):
+        """Test the student and owner confirmations use their own time zones, without user queries"""
+        res = self.patch_without_user_queries('?confirmed=true')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        student_email = OutboundEmail.objects.get(recipients__contains='student@upb.edu')
+        owner_email = OutboundEmail.objects.get(recipients__contains='owner@upb.edu')
+        self.assertIn('01/03/2024 10:00 AM', student_email.body)
+        self.assertIn('01/03/2024 03:00 PM', owner_email.body)
+
+    def test_cancellation_in_student_time_zone(self):
+        """Test the cancellation uses the time zone of the student, without user queries"""
+        res = self.patch_without_user_queries('?cancelled=true')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('01/03/2024 10:00 AM', OutboundEmail.objects.get().body)
+
+    def test_localize_datetimes(self):
+        """Test a batch is converted like one datetime at a time, unknown zones fall back to UTC"""
+        dates = [self.booking.start_date + datetime.timedelta(days=days) for days in range(0, 300, 30)]
+
+        self.assertEqual(localize_datetimes(dates, 'Europe/Madrid'),
+                         [get_correct_datetime(date, 'Europe/Madrid') for date in dates])
+        self.assertEqual([date.utcoffset() for date in localize_datetimes(dates, 'Europe/Madrid')][:2],
+                         [datetime.timedelta(hours=1), datetime.timedelta(hours=2)])
+        self.assertEqual(str(get_time_zone('Not/AZone')), 'UTC')
+        self.assertIs(get_time_zone('Europe/Madrid'), get_time_zone('Europe/Madrid'))
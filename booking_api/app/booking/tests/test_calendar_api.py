@@ -0,0 +1,89 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+
+import datetime
+
+import pytz
+
+CALENDAR_URL = reverse('bookingcalendar')
+
+
+class BookingCalendarApiTests(TestCase):
+    """Test the per-day and per-hour slot counts"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123', time_zone='America/La_Paz')
+        self.client.force_authenticate(self.user)
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+        start_date = datetime.datetime(2030, 3, 1, 2, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(2),
+                                             end_hour=datetime.time(6), slot_duration=30, equipment=self.equipment,
+                                             owner=self.user)
+
+        # 02:00-06:00 UTC is 22:00-02:00 in La Paz (UTC-4): the slots span two local days
+        for number in range(8):
+            Booking.objects.create(start_date=start_date + datetime.timedelta(minutes=30 * number),
+                                   end_date=start_date + datetime.timedelta(minutes=30 * (number + 1)),
+                                   available=number % 4 != 0, owner=self.user, equipment=self.equipment,
+                                   timeframe=timeframe)
+
+    def get_calendar(self, **params):
+        return self.client.get(CALENDAR_URL, dict({
+            'equipment': self.equipment.id,
+            'start_date': '2030-02-28T00:00:00Z',
+            'end_date': '2030-03-03T00:00:00Z'
+        }, **params))
+
+    def test_counts_per_local_day(self):
+        """Test slots are grouped by day in the user's time zone"""
+        res = self.get_calendar()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['time_zone'], 'America/La_Paz')
+        self.assertEqual(res.data['periods'], [
+            {'period': '2030-02-28', 'free': 3, 'taken': 1},
+            {'period': '2030-03-01', 'free': 3, 'taken': 1},
+        ])
+
+    def test_counts_per_local_hour(self):
+        """Test slots are grouped by hour in the user's time zone"""
+        res = self.get_calendar(group='hour')
+
+        self.assertEqual(len(res.data['periods']), 4)
+        self.assertEqual(res.data['periods'][0], {'period': '2030-02-28T22:00:00-04:00', 'free': 1, 'taken': 1})
+
+    def test_virtual_slots_are_counted(self):
+        """Test the open slots of virtual timeframes are added to the counts"""
+        TimeFrame.objects.create(start_date=datetime.datetime(2030, 3, 2, tzinfo=pytz.UTC),
+                                 end_date=datetime.datetime(2030, 3, 2, tzinfo=pytz.UTC), start_hour=datetime.time(14),
+                                 end_hour=datetime.time(16), slot_duration=60, equipment=self.equipment,
+                                 owner=self.user, virtual=True)
+
+        res = self.get_calendar()
+
+        self.assertEqual(res.data['periods'][-1], {'period': '2030-03-02', 'free': 2, 'taken': 0})
+
+    def test_missing_parameters(self):
+        """Test equipment and range are required"""
+        res = self.client.get(CALENDAR_URL, {'equipment': self.equipment.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_group(self):
+        """Test an unknown grouping is rejected"""
+        self.assertEqual(self.get_calendar(group='week').status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,183 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import UnreadablePostError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import ChunkedUpload, Laboratory, LaboratoryContent
+from booking.uploads import append_chunk, partial_path
+
+import datetime
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+UPLOADS_URL = reverse('chunkeduploadlist')
+
+
+def detail_url(upload_id):
+    return reverse('chunkeduploaddetail', args=[upload_id])
+
+
+def finalize_url(upload_id):
+    return reverse('chunkeduploadfinalize', args=[upload_id])
+
+
+class DroppedStream(io.BytesIO):
+    """Request body whose connection is lost after the data it holds"""
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data:
+            raise UnreadablePostError('Connection lost')
+        return data
+
+
+class ChunkedUploadApiTests(TestCase):
+    """Test the resumable upload of laboratory content videos"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root,
+                                     CHUNKED_UPLOAD_ROOT=os.path.join(self.media_root, 'partial'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        self.data = os.urandom(300 * 1024 + 5)
+
+    def start(self, size=None):
+        res = self.client.post(UPLOADS_URL, {'filename': 'lecture.mp4', 'size': size or len(self.data)}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data['id']
+
+    def send(self, upload_id, offset, chunk):
+        return self.client.generic('PATCH', detail_url(upload_id), chunk, content_type='application/offset+octet-stream',
+                                   HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_upload_in_chunks(self):
+        """Test a video sent in chunks is stored under its hash as a laboratory content"""
+        upload_id = self.start()
+
+        for offset in range(0, len(self.data), 100 * 1024):
+            res = self.send(upload_id, offset, self.data[offset:offset + 100 * 1024])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res['Upload-Offset'], str(min(offset + 100 * 1024, len(self.data))))
+
+        res = self.client.post(finalize_url(upload_id), {'laboratory': self.laboratory.id, 'order': 1, 'is_last': True},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        content = LaboratoryContent.objects.get(laboratory=self.laboratory, order=1)
+        self.assertEqual(content.video.name, f'labs_content_videos/{hashlib.md5(self.data).hexdigest()}.mp4')
+        with content.video.open('rb') as video:
+            self.assertEqual(video.read(), self.data)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial')), [])
+
+    def test_resume_after_interruption(self):
+        """Test a client can ask for the offset and resume, and stale offsets are rejected"""
+        upload_id = self.start()
+        self.send(upload_id, 0, self.data[:1000])
+
+        res = self.send(upload_id, 0, self.data[:1000])
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['offset'], 1000)
+
+        res = self.client.get(detail_url(upload_id))
+        self.assertEqual(res.data['offset'], 1000)
+
+        self.send(upload_id, 1000, self.data[1000:])
+        self.assertEqual(ChunkedUpload.objects.get(id=upload_id).offset, len(self.data))
+
+    def test_dropped_connection_keeps_received_bytes(self):
+        """Test the bytes received before a disconnection are kept for the next chunk"""
+        upload = ChunkedUpload.objects.get(id=self.start())
+
+        self.assertEqual(append_chunk(upload, 0, DroppedStream(self.data[:5000])), 5000)
+
+        self.assertEqual(ChunkedUpload.objects.get(id=upload.id).offset, 5000)
+        self.assertEqual(os.path.getsize(partial_path(upload)), 5000)
+
+    def test_finalize_incomplete_upload(self):
+        """Test an upload cannot be stored before every byte is received"""
+        upload_id = self.start()
+        self.send(upload_id, 0, self.data[:1000])
+
+        res = self.client.post(finalize_url(upload_id), {'laboratory': self.laboratory.id, 'order': 1}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['code'], 'incomplete')
+
+    def test_chunk_past_size(self):
+        """Test a chunk longer than the declared size is rejected and not written"""
+        upload_id = self.start(size=10)
+
+        res = self.send(upload_id, 0, b'x' * 11)
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        upload = ChunkedUpload.objects.get(id=upload_id)
+        self.assertEqual(upload.offset, 0)
+        self.assertEqual(os.path.getsize(partial_path(upload)), 0)
+
+    @override_settings(CHUNKED_UPLOAD_MAX_SIZE=100)
+    def test_declared_size_limit(self):
+        """Test uploads larger than the limit are refused up front"""
+        res = self.client.post(UPLOADS_URL, {'filename': 'lecture.mp4', 'size': 101}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_uploads_of_other_users(self):
+        """Test uploads are private and contents can only be added to own laboratories"""
+        upload_id = self.start()
+        other = get_user_model().objects.create_user('other@upb.edu', 'Password123')
+        other_laboratory = Laboratory.objects.create(name='Laboratory 2', owner=other)
+
+        self.send(upload_id, 0, self.data)
+        res = self.client.post(finalize_url(upload_id), {'laboratory': other_laboratory.id, 'order': 1}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(other)
+        res = self.client.get(detail_url(upload_id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_abort_upload(self):
+        """Test deleting an upload removes its partial file"""
+        upload_id = self.start()
+        path = partial_path(ChunkedUpload.objects.get(id=upload_id))
+
+        res = self.client.delete(detail_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(os.path.exists(path))
+
+    def test_delete_stale_uploads(self):
+        """Test abandoned uploads and orphan partial files are deleted, active ones are kept"""
+        stale_id = self.start()
+        active_id = self.start()
+        ChunkedUpload.objects.filter(id=stale_id).update(
+            last_modification_date=timezone.now() - datetime.timedelta(days=2))
+        orphan = os.path.join(self.media_root, 'partial', 'orphan.part')
+        open(orphan, 'wb').close()
+        os.utime(orphan, (0, 0))
+
+        call_command('delete_stale_uploads', stdout=io.StringIO())
+
+        self.assertEqual([str(upload_id) for upload_id in ChunkedUpload.objects.values_list('id', flat=True)], [active_id])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial')), [f'{active_id}.part'])
@@ -0,0 +1,203 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.contents import save_laboratory_contents
+from booking.models import ChunkedUpload, Laboratory, LaboratoryContent
+from booking.uploads import start_upload
+from PIL import Image
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+
+def batch_url(laboratory_id):
+    return reverse('contents-batch', args=[laboratory_id])
+
+
+def create_image():
+    output = io.BytesIO()
+    Image.new('RGB', (64, 48), 'red').save(output, 'PNG')
+    return output.getvalue()
+
+
+class LaboratoryContentBatchApiTests(TestCase):
+    """Test saving the contents of a laboratory in a single request"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root,
+                                     CHUNKED_UPLOAD_ROOT=os.path.join(self.media_root, 'partial'))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+
+    def save(self, contents, files=None):
+        if files is None:
+            return self.client.put(batch_url(self.laboratory.id), {'contents': contents}, format='json')
+        return self.client.put(batch_url(self.laboratory.id), dict(files, contents=json.dumps(contents)),
+                               format='multipart')
+
+    def stored_contents(self):
+        return list(LaboratoryContent.objects.filter(laboratory=self.laboratory)
+                    .values_list('order', 'title', 'text', 'is_last'))
+
+    def count_queries(self, contents):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.save(contents)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_blocks(self):
+        """Test creating and then updating 3 or 30 blocks takes the same number of queries"""
+        small = self.count_queries([{'text': f'Text {i}'} for i in range(3)])
+        Laboratory.objects.create(name='Laboratory 2', owner=self.user)
+        self.laboratory = Laboratory.objects.get(name='Laboratory 2')
+        large = self.count_queries([{'text': f'Text {i}'} for i in range(30)])
+        self.assertEqual(small, large)
+
+        updated = self.count_queries([{'title': f'Title {i}'} for i in range(30)])
+        self.assertEqual(updated, large)
+        self.assertEqual(LaboratoryContent.objects.filter(laboratory=self.laboratory, title__isnull=False).count(), 30)
+
+    def test_diff_against_existing_contents(self):
+        """Test changed blocks are updated in place, unchanged kept and the ones past the end deleted"""
+        self.save([{'title': 'Title'}, {'text': 'Text 1'}, {'text': 'Text 2'}, {'text': 'Text 3'}])
+        ids = list(LaboratoryContent.objects.filter(laboratory=self.laboratory).values_list('id', flat=True))
+
+        res = self.save([{'title': 'Title'}, {'text': 'Changed'}])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stored_contents(), [(1, 'Title', None, False), (2, None, 'Changed', True)])
+        self.assertEqual(list(LaboratoryContent.objects.filter(laboratory=self.laboratory).values_list('id', flat=True)),
+                         ids[:2])
+        self.assertEqual([content['order'] for content in res.data], [1, 2])
+
+    def test_empty_list_deletes_contents(self):
+        """Test saving no blocks removes every content"""
+        self.save([{'text': 'Text'}])
+
+        self.save([])
+
+        self.assertEqual(self.stored_contents(), [])
+
+    def test_images_sent_once(self):
+        """Test a new image is stored from its file part and kept by URL afterwards"""
+        res = self.save([{'image': 'file0'}], {'file0': SimpleUploadedFile('photo.png', create_image())})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        content = LaboratoryContent.objects.get(laboratory=self.laboratory)
+        self.assertTrue(content.image.name.startswith('labs_content_photos/'))
+        self.assertIn('thumbnail', content.image_variants)
+
+        res = self.save([{'image': res.data[0]['image']}, {'text': 'Text'}])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(LaboratoryContent.objects.get(laboratory=self.laboratory, order=1).image.name, content.image.name)
+
+    def test_video_from_chunked_upload(self):
+        """Test a complete chunked upload can be used as a video block"""
+        data = os.urandom(1000)
+        upload = start_upload(self.user, 'lecture.mp4', len(data))
+        self.client.generic('PATCH', reverse('chunkeduploaddetail', args=[upload.id]), data,
+                            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0')
+
+        res = self.save([{'video': str(upload.id)}])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with LaboratoryContent.objects.get(laboratory=self.laboratory).video.open('rb') as video:
+            self.assertEqual(video.read(), data)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_invalid_blocks(self):
+        """Test blocks with several fields or unknown files are rejected without changes"""
+        self.save([{'text': 'Text'}])
+
+        res = self.save([{'text': 'Text', 'title': 'Title'}])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.save([{'text': 'Text'}, {'image': '/media/labs/other.png'}])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('image', res.data['contents'][1])
+
+        res = self.save([{'image': 'file0'}], {'file0': SimpleUploadedFile('photo.png', b'not an image')})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.stored_contents(), [(1, None, 'Text', True)])
+
+    def test_only_owner_edits_contents(self):
+        """Test the contents of another user's laboratory cannot be replaced"""
+        other = get_user_model().objects.create_user('other@upb.edu', 'Password123')
+        self.client.force_authenticate(other)
+
+        res = self.save([{'text': 'Text'}])
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_contents_invalidated(self):
+        """Test the cached content list shows the saved blocks"""
+        contents_url = reverse('contents-for-laboratory', args=[self.laboratory.id])
+        self.save([{'text': 'Before'}])
+        self.client.get(contents_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.save([{'text': 'After'}])
+
+        self.assertEqual(self.client.get(contents_url).data[0]['text'], 'After')
+
+
+class LaboratoryContentBatchConcurrencyTests(TransactionTestCase):
+    """Save the contents of one laboratory from several threads, each with its own connection"""
+
+    serialized_rollback = True
+    threads = 6
+
+    def test_concurrent_saves(self):
+        """Test concurrent saves are applied one after the other instead of failing on the same orders"""
+        user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=user)
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def run(number):
+            try:
+                barrier.wait()
+                save_laboratory_contents(laboratory, [{'text': f'Text {number}'}] * (number + 1), user=user)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=(number,)) for number in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        texts = list(LaboratoryContent.objects.filter(laboratory=laboratory).values_list('text', flat=True))
+        self.assertEqual(len(set(texts)), 1)
+        self.assertEqual(len(texts), int(texts[0].split()[1]) + 1)
@@ -0,0 +1,83 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from booking.models import Laboratory, LaboratoryContent, UniqueFilenameStorage
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+
+class StreamingFile(File):
+    """File that fails when read whole, to check uploads are only read in chunks"""
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            raise AssertionError('The whole file was read into memory')
+        return super().read(size)
+
+
+class FailingFile(File):
+    def chunks(self, chunk_size=None):
+        yield b'partial'
+        raise IOError('Connection lost')
+
+
+class ContentStorageTests(TestCase):
+    """Test the content-addressed storage of laboratory content media"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+
+    def list_files(self, directory):
+        return sorted(os.listdir(os.path.join(self.media_root, directory)))
+
+    def test_video_is_stored_under_its_hash(self):
+        """Test a video is streamed in chunks and stored once per content"""
+        data = os.urandom(3 * File.DEFAULT_CHUNK_SIZE + 123)
+        expected = f'labs_content_videos/{hashlib.md5(data).hexdigest()}.mp4'
+
+        first = LaboratoryContent(laboratory=self.laboratory, order=1)
+        first.video.save('lecture.mp4', StreamingFile(io.BytesIO(data), name='lecture.mp4'))
+        second = LaboratoryContent(laboratory=self.laboratory, order=2)
+        second.video.save('copy.mp4', StreamingFile(io.BytesIO(data), name='copy.mp4'))
+
+        self.assertEqual(first.video.name, expected)
+        self.assertEqual(second.video.name, expected)
+        self.assertEqual(self.list_files('labs_content_videos'), [os.path.basename(expected)])
+        with first.video.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+
+    def test_image_keeps_extension(self):
+        """Test images are stored as <md5><ext> in their directory"""
+        data = b'not really an image'
+        content = LaboratoryContent(laboratory=self.laboratory, order=1)
+        content.image.save('photo.png', SimpleUploadedFile('photo.png', data), save=False)
+
+        self.assertEqual(content.image.name, f'labs_content_photos/{hashlib.md5(data).hexdigest()}.png')
+
+    def test_failed_upload_leaves_no_file(self):
+        """Test an interrupted upload removes its temporary file"""
+        storage = UniqueFilenameStorage()
+
+        with self.assertRaises(IOError):
+            storage.save('labs_content_videos/upload.mp4', FailingFile(io.BytesIO(), name='upload.mp4'))
+
+        self.assertEqual(self.list_files('labs_content_videos'), [])
@@ -0,0 +1,122 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.export import fold_ical, iter_keyset_chunks, EXPORT_FIELDS
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+
+import csv
+import datetime
+import io
+
+import pytz
+
+
+def export_url(export_format):
+    return reverse('bookingexport', args=[export_format])
+
+
+class BookingExportApiTests(TestCase):
+    """Test the streaming CSV and iCalendar exports"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.owner = get_user_model().objects.create_user('owner@upb.edu', 'Password123')
+        self.student = get_user_model().objects.create_user('student@upb.edu', 'Password123')
+
+        self.laboratory = Laboratory.objects.create(name='Optics, Lasers; and more', owner=self.owner)
+        self.equipment = Equipment.objects.create(name='Spectrometer', laboratory=self.laboratory, owner=self.owner)
+        start_date = datetime.datetime(2024, 3, 1, 8, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(8),
+                                             end_hour=datetime.time(12), slot_duration=60, equipment=self.equipment,
+                                             owner=self.owner)
+        for hours in range(4):
+            Booking.objects.create(start_date=start_date + datetime.timedelta(hours=hours),
+                                   end_date=start_date + datetime.timedelta(hours=hours + 1), owner=self.owner,
+                                   equipment=self.equipment, timeframe=timeframe,
+                                   reserved_by=self.student if hours < 2 else None, available=hours >= 2)
+
+    def read(self, res):
+        self.assertTrue(res.streaming)
+        return b''.join(res.streaming_content).decode('utf-8')
+
+    def test_user_csv(self):
+        """Test a student exports their own reservations"""
+        self.client.force_authenticate(self.student)
+
+        res = self.client.get(export_url('csv'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = list(csv.reader(io.StringIO(self.read(res))))
+        self.assertEqual(rows[0][:3], ['id', 'start_date', 'end_date'])
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][5], 'student@upb.edu')
+        self.assertEqual(rows[1][4], 'Optics, Lasers; and more')
+
+    def test_laboratory_ical(self):
+        """Test the owner exports the calendar of a laboratory"""
+        self.client.force_authenticate(self.owner)
+
+        res = self.client.get(export_url('ics'), {'laboratory': self.laboratory.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/calendar'))
+        content = self.read(res)
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 4)
+        self.assertIn('DTSTART:20240301T080000Z', content)
+        self.assertIn('Optics\\, Lasers\\; and more', content)
+
+    def test_equipment_range_filter(self):
+        """Test the equipment export honours the date range and reserved filter"""
+        self.client.force_authenticate(self.owner)
+
+        res = self.client.get(export_url('csv'), {
+            'equipment': self.equipment.id,
+            'start_date': '2024-03-01T09:00:00Z',
+            'end_date': '2024-03-01T12:00:00Z',
+            'reserved': 'false'
+        })
+
+        rows = list(csv.reader(io.StringIO(self.read(res))))
+        self.assertEqual(len(rows), 3)
+
+    def test_only_owner_exports_laboratory(self):
+        """Test another user cannot export the bookings of a laboratory"""
+        self.client.force_authenticate(self.student)
+
+        res = self.client.get(export_url('csv'), {'laboratory': self.laboratory.id})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_unknown_format(self):
+        """Test an unknown export format is not found"""
+        self.client.force_authenticate(self.student)
+
+        self.assertEqual(self.client.get(export_url('xml')).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_fold_long_lines(self):
+        """Test content lines are folded at 75 octets"""
+        folded = fold_ical('DESCRIPTION:' + 'ñ' * 100)
+
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', ''), 'DESCRIPTION:' + 'ñ' * 100 + '\r\n')
+
+    def test_keyset_chunks_without_server_side_cursors(self):
+        """Test the pooled mode fallback reads every row once, in order"""
+        queryset = Booking.objects.order_by('start_date', 'id').values_list(*EXPORT_FIELDS)
+
+        with self.assertNumQueries(3):
+            rows = list(iter_keyset_chunks(queryset, 2))
+
+        self.assertEqual(rows, list(queryset))
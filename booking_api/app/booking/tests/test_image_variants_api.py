@@ -0,0 +1,140 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking import images
+from booking.models import Laboratory, LaboratoryContent
+from PIL import Image
+from unittest import mock
+
+import io
+import os
+import shutil
+import tempfile
+
+LABORATORY_URL = reverse('laboratorylist')
+
+
+def create_photo(width=2400, height=1600):
+    """JPEG with enough detail to be close to a real photo in size"""
+    image = Image.frombytes('RGB', (width, height), os.urandom(width * height * 3))
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=90)
+    return output.getvalue()
+
+
+class ImageVariantsApiTests(TestCase):
+    """Test the resized WebP variants of the laboratory images"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+        self.photo = create_photo()
+
+    def create_laboratory(self, name='Laboratory 1'):
+        res = self.client.post(LABORATORY_URL, {
+            'name': name,
+            'image': SimpleUploadedFile('photo.jpg', self.photo, content_type='image/jpeg'),
+        }, format='multipart')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res
+
+    def test_variants_generated_on_upload(self):
+        """Test uploading a laboratory image exposes smaller WebP variants"""
+        res = self.create_laboratory()
+
+        variants = res.data['image_variants']
+        self.assertEqual(set(variants), {'thumbnail', 'medium'})
+        self.assertTrue(variants['thumbnail'].startswith('http://testserver/media/image_derivatives/'))
+
+        laboratory = Laboratory.objects.get(id=res.data['id'])
+        with default_storage.open(laboratory.image_variants['thumbnail']) as thumbnail_file:
+            thumbnail = Image.open(thumbnail_file)
+            self.assertEqual(thumbnail.format, 'WEBP')
+            self.assertEqual(thumbnail.size, (480, 320))
+
+        thumbnail_size = default_storage.size(laboratory.image_variants['thumbnail'])
+        self.assertLess(thumbnail_size * 10, len(self.photo))
+
+    def test_variants_shared_by_content_hash(self):
+        """Test the same image uploaded twice reuses its variants"""
+        first = self.create_laboratory('Laboratory 1')
+        second = self.create_laboratory('Laboratory 2')
+
+        self.assertEqual(Laboratory.objects.get(id=first.data['id']).image_variants['thumbnail'],
+                         Laboratory.objects.get(id=second.data['id']).image_variants['thumbnail'])
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'image_derivatives'))), 1)
+
+    def test_concurrent_variant_keeps_its_name(self):
+        """Test a variant written by a concurrent upload is replaced, not saved under another name"""
+        render_variant = images.render_variant
+
+        def render_concurrently(image, variant):
+            # Another upload of the same image writes the variant once it was found missing
+            data = render_variant(image, variant)
+            digest = images.content_hash(laboratory.image)
+            default_storage.save(images.variant_name(digest, variant), io.BytesIO(data))
+            return data
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        with mock.patch('booking.images.render_variant', render_concurrently):
+            laboratory.image.save('photo.jpg', SimpleUploadedFile('photo.jpg', self.photo))
+
+        laboratory.refresh_from_db()
+        directory = os.path.dirname(default_storage.path(laboratory.image_variants['thumbnail']))
+        self.assertEqual(laboratory.image_variants['thumbnail'],
+                         images.variant_name(images.content_hash(laboratory.image), 'thumbnail'))
+        self.assertEqual(sorted(os.listdir(directory)), ['medium.webp', 'thumbnail.webp'])
+
+    def test_public_grid_exposes_variants(self):
+        """Test the laboratory grid lists the thumbnail"""
+        res = self.create_laboratory()
+        Laboratory.objects.filter(id=res.data['id']).update(visible=True, enabled=True)
+
+        res = self.client.get(reverse('publiclaboratorylist'))
+
+        self.assertIn('thumbnail', res.data[0]['image_variants'])
+
+    def test_content_image_variants(self):
+        """Test content images get variants and a content without image has none"""
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        content = LaboratoryContent(laboratory=laboratory, order=1)
+        content.image.save('photo.jpg', SimpleUploadedFile('photo.jpg', self.photo))
+        text = LaboratoryContent.objects.create(laboratory=laboratory, order=2, text='Text')
+
+        content.refresh_from_db()
+        text.refresh_from_db()
+        self.assertEqual(content.image_variants['source'], content.image.name)
+        self.assertEqual(text.image_variants, {})
+
+    def test_backfill_command(self):
+        """Test the command generates the variants of images saved without them"""
+        laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+        laboratory.image.save('photo.jpg', SimpleUploadedFile('photo.jpg', self.photo))
+        Laboratory.objects.filter(id=laboratory.id).update(image_variants={})
+
+        call_command('generate_image_variants', stdout=io.StringIO())
+
+        laboratory.refresh_from_db()
+        self.assertIn('thumbnail', laboratory.image_variants)
@@ -0,0 +1,200 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.availability import compute_laboratory_availability, refresh_laboratory_availability,\
+    sweep_laboratory_availability
+from booking.models import Booking, Equipment, Laboratory, LaboratoryAvailability, TimeFrame
+from booking.slots import SlotSchedule
+
+import datetime
+import importlib
+
+import pytz
+
+PUBLIC_LABORATORY_URL = reverse('publiclaboratorylist')
+
+
+class LaboratoryAvailabilityApiTests(TestCase):
+    """Test the is_available_now flag of the laboratory grid"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+
+    def create_laboratory(self, name, days_from_now, available=True, virtual=False):
+        laboratory = Laboratory.objects.create(name=name, owner=self.user, visible=True)
+        equipment = Equipment.objects.create(name=name, laboratory=laboratory, owner=self.user)
+        end_date = timezone.now() + datetime.timedelta(days=days_from_now)
+        timeframe = TimeFrame.objects.create(start_date=end_date - datetime.timedelta(days=5), end_date=end_date,
+                                             start_hour=datetime.time(8), end_hour=datetime.time(9), slot_duration=60,
+                                             equipment=equipment, owner=self.user, virtual=virtual)
+        if not virtual:
+            Booking.objects.create(start_date=end_date, end_date=end_date, available=available, owner=self.user,
+                                   equipment=equipment, timeframe=timeframe)
+        return laboratory
+
+    def test_availability_flags(self):
+        """Test each laboratory reports its own availability"""
+        open_lab = self.create_laboratory('Open', 3)
+        past_lab = self.create_laboratory('Past', -3)
+        full_lab = self.create_laboratory('Full', 3, available=False)
+        virtual_lab = self.create_laboratory('Virtual', 3, virtual=True)
+
+        res = self.client.get(PUBLIC_LABORATORY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        flags = {laboratory['id']: laboratory['is_available_now'] for laboratory in res.data}
+        self.assertEqual(flags, {open_lab.id: True, past_lab.id: False, full_lab.id: False, virtual_lab.id: True})
+        self.assertTrue(open_lab.has_bookings_available())
+        self.assertFalse(past_lab.has_bookings_available())
+
+    def test_constant_query_count(self):
+        """Test the public grid runs one query regardless of the number of laboratories"""
+        for number in range(10):
+            self.create_laboratory(f'Laboratory {number}', 3)
+        sweep_laboratory_availability()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PUBLIC_LABORATORY_URL)
+
+        self.assertEqual(len(res.data), 10)
+
+
+class LaboratoryAvailabilitySummaryTests(TestCase):
+    """Test the precomputed availability summary of the laboratories"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user, visible=True)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=self.laboratory, owner=self.user)
+        self.start_date = timezone.now() + datetime.timedelta(days=1)
+        self.timeframe = TimeFrame.objects.create(start_date=self.start_date, end_date=self.start_date,
+                                                  start_hour=datetime.time(8), end_hour=datetime.time(9),
+                                                  slot_duration=60, equipment=self.equipment, owner=self.user)
+        self.bookings = [
+            Booking.objects.create(start_date=self.start_date + datetime.timedelta(hours=hours),
+                                   end_date=self.start_date + datetime.timedelta(hours=hours + 1),
+                                   owner=self.user, equipment=self.equipment, timeframe=self.timeframe)
+            for hours in range(3)
+        ]
+
+    def test_summary_counts_future_open_slots(self):
+        """Test the summary holds the next free slot and the number of open slots"""
+        Booking.objects.create(start_date=timezone.now() - datetime.timedelta(hours=1), end_date=timezone.now(),
+                               owner=self.user, equipment=self.equipment, timeframe=self.timeframe)
+
+        summary = refresh_laboratory_availability(self.laboratory.id)
+
+        self.assertEqual(summary.open_slots, 3)
+        self.assertEqual(summary.next_free_slot, self.start_date)
+
+    def test_public_grid_serves_summary(self):
+        """Test the public grid exposes the summary fields"""
+        refresh_laboratory_availability(self.laboratory.id)
+
+        res = self.client.get(PUBLIC_LABORATORY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['open_slots'], 3)
+        self.assertTrue(res.data[0]['is_available_now'])
+        self.assertIsNotNone(res.data[0]['next_free_slot'])
+
+    def test_registering_updates_summary(self):
+        """Test registering a booking adjusts the summary without recounting the laboratory"""
+        refresh_laboratory_availability(self.laboratory.id)
+        url = reverse('bookingdetail', args=[self.bookings[0].id])
+
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            res = self.client.patch(url + '?register=true', {'public': False, 'available': False}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse([query['sql'] for query in queries if 'MIN(' in query['sql']])
+        summary = LaboratoryAvailability.objects.get(laboratory=self.laboratory)
+        self.assertEqual(summary.open_slots, 2)
+        self.assertEqual(summary.next_free_slot, self.bookings[1].start_date)
+
+    def test_cancelling_updates_summary(self):
+        """Test releasing a booking gives its slot back to the summary"""
+        refresh_laboratory_availability(self.laboratory.id)
+        url = reverse('bookingdetail', args=[self.bookings[0].id])
+        self.client.patch(url + '?register=true', {'public': False, 'available': False}, format='json')
+
+        res = self.client.patch(url, {'public': False, 'available': True}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        summary = LaboratoryAvailability.objects.get(laboratory=self.laboratory)
+        self.assertEqual(summary.open_slots, 3)
+        self.assertEqual(summary.next_free_slot, self.bookings[0].start_date)
+        self.assertEqual((summary.next_free_slot, summary.open_slots),
+                         compute_laboratory_availability(self.laboratory.id))
+
+    def test_migration_fills_missing_summaries(self):
+        """Test the data migration builds the summaries of the existing laboratories"""
+        migration = importlib.import_module('booking.migrations.0030_fill_laboratory_availability')
+
+        migration.fill_laboratory_availability(apps, None)
+
+        summary = LaboratoryAvailability.objects.get(laboratory=self.laboratory)
+        self.assertEqual((summary.next_free_slot, summary.open_slots),
+                         compute_laboratory_availability(self.laboratory.id))
+
+    def test_deleting_timeframe_updates_summary(self):
+        """Test deleting a timeframe empties the summary"""
+        refresh_laboratory_availability(self.laboratory.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(reverse('timeframedetail', args=[self.timeframe.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        summary = LaboratoryAvailability.objects.get(laboratory=self.laboratory)
+        self.assertEqual(summary.open_slots, 0)
+        self.assertIsNone(summary.next_free_slot)
+        self.assertFalse(self.laboratory.is_available_now)
+
+    def test_sweep_rolls_off_started_slots(self):
+        """Test the sweep only refreshes summaries whose next free slot has started"""
+        refresh_laboratory_availability(self.laboratory.id)
+
+        self.assertEqual(sweep_laboratory_availability(now=self.start_date - datetime.timedelta(minutes=1)), 0)
+        self.assertEqual(sweep_laboratory_availability(now=self.start_date + datetime.timedelta(minutes=1)), 1)
+
+        summary = LaboratoryAvailability.objects.get(laboratory=self.laboratory)
+        self.assertEqual(summary.open_slots, 2)
+        self.assertEqual(summary.next_free_slot, self.bookings[1].start_date)
+
+    def test_virtual_timeframe_slots_are_counted(self):
+        """Test slots of virtual timeframes are counted without booking rows"""
+        now = datetime.datetime(2024, 3, 1, 8, 30, tzinfo=pytz.UTC)
+        laboratory = Laboratory.objects.create(name='Virtual', owner=self.user)
+        equipment = Equipment.objects.create(name='Virtual', laboratory=laboratory, owner=self.user)
+        timeframe = TimeFrame.objects.create(start_date=now, end_date=now + datetime.timedelta(days=2),
+                                             start_hour=datetime.time(8), end_hour=datetime.time(10),
+                                             slot_duration=30, equipment=equipment, owner=self.user, virtual=True)
+        schedule = SlotSchedule.from_timeframe(timeframe)
+        expected = [slot for slot in schedule.iter_slots() if slot[1] > now]
+        Booking.objects.create(start_date=expected[0][1], end_date=expected[0][2], available=False,
+                               owner=self.user, equipment=equipment, timeframe=timeframe)
+
+        next_free_slot, open_slots = compute_laboratory_availability(laboratory.id, now)
+
+        self.assertEqual(open_slots, len(expected) - 1)
+        self.assertEqual(next_free_slot, expected[1][1])
@@ -0,0 +1,135 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.media import FileRange
+
+import os
+import shutil
+import tempfile
+
+VIDEO_PATH = 'labs_content_videos/0123456789abcdef.mp4'
+
+
+class MediaApiTests(TestCase):
+    """Test serving uploaded media with byte ranges and conditional requests"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT='')
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.client = APIClient()
+        self.data = os.urandom(200 * 1024 + 17)
+        self.write_file(VIDEO_PATH, self.data)
+        self.url = reverse('media', args=[VIDEO_PATH])
+
+    def write_file(self, path, data):
+        full_path = os.path.join(self.media_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as file:
+            file.write(data)
+
+    def test_whole_file(self):
+        """Test a file is served whole with its validators and cache headers"""
+        res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(res.streaming_content), self.data)
+        self.assertEqual(res['Content-Type'], 'video/mp4')
+        self.assertEqual(res['Content-Length'], str(len(self.data)))
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertIn('ETag', res)
+        self.assertIn('immutable', res['Cache-Control'])
+
+    def test_byte_ranges(self):
+        """Test single ranges are answered with 206 and only their bytes"""
+        size = len(self.data)
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=1000-': (1000, size - 1),
+            'bytes=-500': (size - 500, size - 1),
+            'bytes=100-999999999': (100, size - 1),
+        }
+
+        for header, (start, end) in cases.items():
+            res = self.client.get(self.url, HTTP_RANGE=header)
+
+            self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT, header)
+            self.assertEqual(res['Content-Range'], f'bytes {start}-{end}/{size}')
+            self.assertEqual(res['Content-Length'], str(end - start + 1))
+            self.assertEqual(b''.join(res.streaming_content), self.data[start:end + 1])
+
+    def test_invalid_ranges(self):
+        """Test unsatisfiable ranges return 416 and malformed ones the whole file"""
+        res = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.data)}-')
+        self.assertEqual(res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(res['Content-Range'], f'bytes */{len(self.data)}')
+
+        for header in ('bytes=10-5', 'bytes=0-1,5-9', 'items=0-1'):
+            res = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(res.status_code, status.HTTP_200_OK, header)
+
+    def test_conditional_requests(self):
+        """Test matching validators return 304 and a stale If-Range the whole file"""
+        etag = self.client.get(self.url)['ETag']
+
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+        res = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_head(self):
+        """Test HEAD returns the headers without opening the file"""
+        res = self.client.head(self.url, HTTP_RANGE='bytes=0-9')
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(res['Content-Length'], '10')
+        self.assertEqual(res.content, b'')
+
+    def test_mutable_files_revalidate(self):
+        """Test laboratory images, which can be replaced, are not cached as immutable"""
+        self.write_file('labs/photo.png', b'image')
+
+        res = self.client.get(reverse('media', args=['labs/photo.png']))
+
+        self.assertNotIn('immutable', res['Cache-Control'])
+
+    def test_missing_and_outside_files(self):
+        """Test missing files, directories and paths outside of the media root are not found"""
+        for path in ('labs_content_videos/missing.mp4', 'labs_content_videos', '../../etc/passwd'):
+            res = self.client.get(reverse('media', args=[path]))
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, path)
+
+    def test_accel_redirect(self):
+        """Test the file is handed to nginx without being read"""
+        with override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/'):
+            res = self.client.get(self.url, HTTP_RANGE='bytes=0-9')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Accel-Redirect'], f'/protected-media/{VIDEO_PATH}')
+        self.assertEqual(res.content, b'')
+
+    def test_file_range_keeps_fileno(self):
+        """Test the range wrapper stops at its end and exposes the file descriptor for sendfile"""
+        with open(os.path.join(self.media_root, VIDEO_PATH), 'rb') as file:
+            file_range = FileRange(file, 10, 20)
+
+            self.assertEqual(file_range.fileno(), file.fileno())
+            self.assertEqual(os.lseek(file_range.fileno(), 0, os.SEEK_CUR), 10)
+            self.assertEqual(file_range.read(), self.data[10:30])
+            self.assertEqual(file_range.read(), b'')
@@ -0,0 +1,164 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from booking import media_gc
+from booking.media_gc import collect_media_garbage
+from booking.models import Laboratory, LaboratoryContent
+from PIL import Image
+from unittest import mock
+
+import io
+import os
+import shutil
+import tempfile
+import time
+
+HOUR = 60 * 60
+
+
+def create_image():
+    output = io.BytesIO()
+    Image.new('RGB', (64, 48), 'blue').save(output, 'PNG')
+    return output.getvalue()
+
+
+class MediaGarbageCollectionTests(TestCase):
+    """Test deleting the media files no row references"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_GC_GRACE_PERIOD=HOUR)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user)
+
+    def add_content(self, order, field, filename, data):
+        content = LaboratoryContent(laboratory=self.laboratory, order=order)
+        getattr(content, field).save(filename, SimpleUploadedFile(filename, data))
+        content.refresh_from_db()
+        return content
+
+    def age(self, *names, seconds=2 * HOUR):
+        """Move the modification time of files (and their directories) back past the grace period"""
+        past = time.time() - seconds
+        for name in names:
+            path = os.path.join(self.media_root, name)
+            os.utime(path, (past, past))
+            os.utime(os.path.dirname(path), (past, past))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def test_deleted_contents_are_collected(self):
+        """Test the files of deleted contents are removed with their variants, and referenced ones kept"""
+        kept = self.add_content(1, 'video', 'kept.mp4', b'kept video')
+        video = self.add_content(2, 'video', 'lecture.mp4', b'a' * 5000)
+        image = self.add_content(3, 'image', 'photo.png', create_image())
+        orphans = [video.video.name, image.image.name, image.image_variants['thumbnail'], image.image_variants['medium']]
+        self.age(kept.video.name, *orphans)
+
+        # Like the is_last and delete-contents endpoints, the files stay behind
+        LaboratoryContent.objects.filter(order__gt=1).delete()
+        report = collect_media_garbage()
+
+        self.assertTrue(self.exists(kept.video.name))
+        self.assertFalse([name for name in orphans if self.exists(name)])
+        self.assertFalse(os.path.exists(os.path.dirname(os.path.join(self.media_root, orphans[2]))))
+        self.assertEqual(report['labs_content_videos']['orphans'], 1)
+        self.assertEqual(report['labs_content_videos']['reclaimed'], 5000)
+        self.assertEqual(report['image_derivatives']['orphans'], 2)
+
+    def test_grace_period(self):
+        """Test recent unreferenced files, like an upload not saved yet, are kept"""
+        content = self.add_content(1, 'video', 'lecture.mp4', b'video')
+        LaboratoryContent.objects.all().delete()
+
+        report = collect_media_garbage()
+
+        self.assertTrue(self.exists(content.video.name))
+        self.assertEqual(report['labs_content_videos']['orphans'], 0)
+
+    def test_deduplicated_upload_restarts_grace_period(self):
+        """Test uploading an old orphan file again protects it until its row is saved"""
+        content = self.add_content(1, 'video', 'lecture.mp4', b'video')
+        self.age(content.video.name)
+        LaboratoryContent.objects.all().delete()
+
+        LaboratoryContent(laboratory=self.laboratory, order=1).video.save(
+            'again.mp4', SimpleUploadedFile('again.mp4', b'video'), save=False)
+        collect_media_garbage()
+
+        self.assertTrue(self.exists(content.video.name))
+
+    def test_upload_during_collection_is_kept(self):
+        """Test a file deduplicated after the listing and before its deletion is kept"""
+        content = self.add_content(1, 'video', 'lecture.mp4', b'video')
+        self.age(content.video.name)
+        LaboratoryContent.objects.all().delete()
+        reference_counts = media_gc.reference_counts
+
+        def upload_again():
+            # The same video is uploaded again while the references are counted
+            LaboratoryContent(laboratory=self.laboratory, order=1).video.save(
+                'again.mp4', SimpleUploadedFile('again.mp4', b'video'), save=False)
+            return reference_counts()
+
+        with mock.patch('booking.media_gc.reference_counts', upload_again):
+            report = collect_media_garbage()
+
+        self.assertTrue(self.exists(content.video.name))
+        self.assertEqual(report['labs_content_videos']['orphans'], 0)
+
+    def test_dry_run(self):
+        """Test a dry run reports the orphans without deleting them"""
+        content = self.add_content(1, 'video', 'lecture.mp4', b'video')
+        self.age(content.video.name)
+        LaboratoryContent.objects.all().delete()
+
+        report = collect_media_garbage(dry_run=True)
+
+        self.assertEqual(report['labs_content_videos']['reclaimed'], len(b'video'))
+        self.assertTrue(self.exists(content.video.name))
+
+    def test_laboratory_images(self):
+        """Test a replaced laboratory image is collected and the current one kept"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('laboratorydetail-update', args=[self.laboratory.id])
+        Laboratory.objects.filter(id=self.laboratory.id).update(enabled=True)
+
+        client.patch(url, {'image': SimpleUploadedFile('first.png', create_image())}, format='multipart')
+        first = Laboratory.objects.get(id=self.laboratory.id).image.name
+        client.patch(url, {'image': SimpleUploadedFile('second.png', create_image())}, format='multipart')
+        second = Laboratory.objects.get(id=self.laboratory.id).image.name
+        self.age(first, second)
+
+        call_command('collect_media_garbage', stdout=io.StringIO())
+
+        self.assertFalse(self.exists(first))
+        self.assertTrue(self.exists(second))
+
+    def test_command_report(self):
+        """Test the command reports the bytes reclaimed"""
+        content = self.add_content(1, 'video', 'lecture.mp4', b'v' * 2048)
+        self.age(content.video.name)
+        LaboratoryContent.objects.all().delete()
+        out = io.StringIO()
+
+        call_command('collect_media_garbage', '--grace-period', '60', stdout=out)
+
+        self.assertIn('Reclaimed 2048 bytes from 1 files', out.getvalue())
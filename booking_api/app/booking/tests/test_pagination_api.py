@@ -0,0 +1,90 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+
+import datetime
+
+import pytz
+
+BOOKING_URL = reverse('bookinglist')
+EQUIPMENT_URL = reverse('equipmentlist')
+
+
+class KeysetPaginationApiTests(TestCase):
+    """Test the cursor pagination of the list endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', description='Spectrometry', owner=self.user)
+        equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+        start_date = datetime.datetime(2024, 3, 1, 8, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(8),
+                                             end_hour=datetime.time(9), slot_duration=60, equipment=equipment,
+                                             owner=self.user)
+
+        # Several bookings share a start date so that pages split inside ties
+        for number in range(25):
+            Booking.objects.create(start_date=start_date + datetime.timedelta(hours=number // 4),
+                                   end_date=start_date + datetime.timedelta(hours=number // 4 + 1),
+                                   owner=self.user, equipment=equipment, timeframe=timeframe)
+
+    def test_walk_all_pages(self):
+        """Test following next links returns every booking once, in order"""
+        url = BOOKING_URL + '?page_size=10'
+        ids = []
+        pages = 0
+
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [booking['id'] for booking in res.data['results']]
+            url = res.data['next']
+            pages += 1
+
+        expected = list(Booking.objects.order_by('start_date', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link(self):
+        """Test the previous link returns the page before"""
+        first = self.client.get(BOOKING_URL + '?page_size=10')
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(previous.data['results'], first.data['results'])
+
+    def test_unpaginated_flag(self):
+        """Test paginate=false returns the plain list"""
+        res = self.client.get(BOOKING_URL + '?paginate=false')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 25)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        res = self.client.get(BOOKING_URL + '?cursor=abc')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_equipment_list_is_paginated_by_id(self):
+        """Test the equipment list is paginated"""
+        res = self.client.get(EQUIPMENT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
@@ -0,0 +1,241 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase, TransactionTestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from core.outbox import send_queued_emails
+from booking.reservations import QUOTA_EXCEEDED, SLOT_TAKEN, ReservationError, reserve_booking
+
+import datetime
+import threading
+
+import pytz
+
+
+BULK_RESERVE_URL = reverse('bookingbulkreserve')
+
+
+def reserve_url(booking_id):
+    return reverse('bookingreserveslot', args=[booking_id])
+
+
+def create_slots(owner, count, bookings_per_user=3):
+    laboratory = Laboratory.objects.create(name='Laboratory 1', owner=owner)
+    equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=owner,
+                                         bookings_per_user=bookings_per_user)
+    start_date = datetime.datetime(2024, 3, 1, 8, 0, tzinfo=pytz.UTC)
+    timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(8),
+                                         end_hour=datetime.time(18), slot_duration=60, equipment=equipment, owner=owner)
+    return [
+        Booking.objects.create(start_date=start_date + datetime.timedelta(hours=hours),
+                               end_date=start_date + datetime.timedelta(hours=hours + 1),
+                               owner=owner, equipment=equipment, timeframe=timeframe)
+        for hours in range(count)
+    ]
+
+
+class ReservationApiTests(TestCase):
+    """Test the reservation endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.other = get_user_model().objects.create_user('other@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+        self.bookings = create_slots(self.other, 5, bookings_per_user=2)
+
+    def test_reserve_booking(self):
+        """Test reserving an open booking"""
+        res = self.client.post(reserve_url(self.bookings[0].id), {'public': True}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        booking = Booking.objects.get(id=self.bookings[0].id)
+        self.assertEqual(booking.reserved_by, self.user)
+        self.assertFalse(booking.available)
+        self.assertTrue(booking.public)
+        self.assertEqual(res.data['reserved_by'], self.user.id)
+
+    def test_reserve_taken_booking(self):
+        """Test a booking reserved by someone else cannot be taken"""
+        reserve_booking(self.bookings[0].id, self.other)
+
+        res = self.client.post(reserve_url(self.bookings[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['code'], SLOT_TAKEN)
+        self.assertEqual(Booking.objects.get(id=self.bookings[0].id).reserved_by, self.other)
+
+    def test_reserve_twice_is_idempotent(self):
+        """Test reserving a booking the user already holds returns it"""
+        self.client.post(reserve_url(self.bookings[0].id))
+        res = self.client.post(reserve_url(self.bookings[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_quota_exceeded(self):
+        """Test the user cannot reserve more than bookings_per_user slots of a timeframe"""
+        for booking in self.bookings[:2]:
+            self.client.post(reserve_url(booking.id))
+
+        res = self.client.post(reserve_url(self.bookings[2].id))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['code'], QUOTA_EXCEEDED)
+        self.assertEqual(Booking.objects.filter(reserved_by=self.user).count(), 2)
+
+    def test_register_uses_reservation(self):
+        """Test registering through the booking detail refuses a taken slot"""
+        reserve_booking(self.bookings[0].id, self.other)
+        url = reverse('bookingdetail', args=[self.bookings[0].id])
+
+        res = self.client.patch(url + '?register=true', {'public': True, 'available': False}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Booking.objects.get(id=self.bookings[0].id).public)
+
+    def test_reserve_missing_booking(self):
+        """Test reserving an unknown booking is not found"""
+        res = self.client.post(reserve_url(0))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkReservationApiTests(TestCase):
+    """Test reserving a block of bookings at once"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.other = get_user_model().objects.create_user('other@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+        self.bookings = create_slots(self.other, 5, bookings_per_user=3)
+
+    def test_reserve_list(self):
+        """Test reserving a list of bookings with a single confirmation"""
+        ids = [booking.id for booking in self.bookings[:3]]
+
+        res = self.client.post(BULK_RESERVE_URL, {'bookings': ids, 'public': False}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([booking['id'] for booking in res.data], ids)
+        self.assertEqual(Booking.objects.filter(reserved_by=self.user).count(), 3)
+        send_queued_emails()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+
+    def test_reserve_range(self):
+        """Test reserving the bookings of an equipment in a time range"""
+        payload = {
+            'equipment': self.bookings[0].equipment_id,
+            'start_date': '2024-03-01T09:00:00Z',
+            'end_date': '2024-03-01T11:00:00Z'
+        }
+
+        res = self.client.post(BULK_RESERVE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([booking['id'] for booking in res.data], [self.bookings[1].id, self.bookings[2].id])
+
+    def test_all_or_nothing(self):
+        """Test one taken booking leaves the whole block unreserved"""
+        reserve_booking(self.bookings[2].id, self.other)
+        ids = [booking.id for booking in self.bookings[:3]]
+
+        res = self.client.post(BULK_RESERVE_URL, {'bookings': ids}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['code'], SLOT_TAKEN)
+        self.assertFalse(Booking.objects.filter(reserved_by=self.user).exists())
+        send_queued_emails()
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_quota_counts_whole_block(self):
+        """Test the quota is checked against the whole block"""
+        reserve_booking(self.bookings[0].id, self.user)
+        ids = [booking.id for booking in self.bookings[1:4]]
+
+        res = self.client.post(BULK_RESERVE_URL, {'bookings': ids}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['code'], QUOTA_EXCEEDED)
+        self.assertEqual(Booking.objects.filter(reserved_by=self.user).count(), 1)
+
+    def test_mixed_equipments_rejected(self):
+        """Test bookings of different equipments cannot be reserved together"""
+        other_booking = create_slots(self.other, 1)[0]
+
+        res = self.client.post(BULK_RESERVE_URL, {'bookings': [self.bookings[0].id, other_booking.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_payload(self):
+        """Test a payload without bookings or range is rejected"""
+        res = self.client.post(BULK_RESERVE_URL, {'equipment': self.bookings[0].equipment_id}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReservationConcurrencyTests(TransactionTestCase):
+    """Hammer reservations from several threads, each with its own connection"""
+
+    serialized_rollback = True
+    threads = 12
+
+    def run_threads(self, target, arguments):
+        barrier = threading.Barrier(len(arguments))
+        results = []
+
+        def run(*args):
+            try:
+                barrier.wait()
+                target(*args)
+                results.append('reserved')
+            except ReservationError as e:
+                results.append(e.code)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=args) for args in arguments]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return results
+
+    def test_one_slot_many_users(self):
+        """Test exactly one of many users gets the same slot"""
+        owner = get_user_model().objects.create_user('owner@upb.edu', 'Password123')
+        booking = create_slots(owner, 1)[0]
+        users = [get_user_model().objects.create_user(f'student{number}@upb.edu', 'Password123')
+                 for number in range(self.threads)]
+
+        results = self.run_threads(reserve_booking, [(booking.id, user) for user in users])
+
+        self.assertEqual(results.count('reserved'), 1)
+        self.assertEqual(results.count(SLOT_TAKEN), self.threads - 1)
+        booking.refresh_from_db()
+        self.assertIn(booking.reserved_by, users)
+
+    def test_one_user_many_slots(self):
+        """Test concurrent reservations of one user never exceed the quota"""
+        owner = get_user_model().objects.create_user('owner@upb.edu', 'Password123')
+        user = get_user_model().objects.create_user('student@upb.edu', 'Password123')
+        bookings = create_slots(owner, self.threads, bookings_per_user=3)
+
+        results = self.run_threads(reserve_booking, [(booking.id, user) for booking in bookings])
+
+        self.assertEqual(results.count('reserved'), 3)
+        self.assertEqual(results.count(QUOTA_EXCEEDED), self.threads - 3)
+        self.assertEqual(Booking.objects.filter(reserved_by=user).count(), 3)
@@ -0,0 +1,141 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.availability import refresh_laboratory_availability
+from booking.models import Laboratory, LaboratoryContent
+
+PUBLIC_LABORATORY_URL = reverse('publiclaboratorylist')
+
+
+def laboratory_url(laboratory_id):
+    return reverse('laboratorydetail-retrieve', args=[laboratory_id])
+
+
+def contents_url(laboratory_id):
+    return reverse('contents-for-laboratory', args=[laboratory_id])
+
+
+class ResponseCacheApiTests(TestCase):
+    """Test the response cache of the anonymous laboratory endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.laboratory = Laboratory.objects.create(name='Laboratory 1', owner=self.user, visible=True)
+        LaboratoryContent.objects.create(laboratory=self.laboratory, order=0, text='Welcome')
+
+    def test_cached_response_runs_no_query(self):
+        """Test a second request is answered from the cache"""
+        first = self.client.get(PUBLIC_LABORATORY_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(PUBLIC_LABORATORY_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_etag_not_modified(self):
+        """Test a matching If-None-Match is answered with 304"""
+        res = self.client.get(laboratory_url(self.laboratory.id))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(laboratory_url(self.laboratory.id), HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_last_modified_not_modified(self):
+        """Test If-Modified-Since at the last modification date is answered with 304"""
+        res = self.client.get(contents_url(self.laboratory.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(contents_url(self.laboratory.id), HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_laboratory_save_invalidates(self):
+        """Test saving a laboratory drops its cached responses"""
+        self.client.get(PUBLIC_LABORATORY_URL)
+        etag = self.client.get(laboratory_url(self.laboratory.id))['ETag']
+
+        self.laboratory.name = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.laboratory.save()
+
+        res = self.client.get(laboratory_url(self.laboratory.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Renamed')
+        self.assertEqual(self.client.get(PUBLIC_LABORATORY_URL).data[0]['name'], 'Renamed')
+
+    def test_content_change_invalidates(self):
+        """Test changing a content drops the contents and touches the laboratory"""
+        before = Laboratory.objects.get(id=self.laboratory.id).last_modification_date
+        self.client.get(contents_url(self.laboratory.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LaboratoryContent.objects.create(laboratory=self.laboratory, order=1, title='Setup')
+
+        res = self.client.get(contents_url(self.laboratory.id))
+        self.assertEqual(len(res.data), 2)
+        self.assertGreater(Laboratory.objects.get(id=self.laboratory.id).last_modification_date, before)
+
+    def test_other_laboratory_stays_cached(self):
+        """Test invalidation only drops the entries of the changed laboratory"""
+        other = Laboratory.objects.create(name='Laboratory 2', owner=self.user, visible=True)
+        self.client.get(laboratory_url(self.laboratory.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+
+        with self.assertNumQueries(0):
+            self.client.get(laboratory_url(self.laboratory.id))
+
+    def test_availability_refresh_invalidates_grid(self):
+        """Test refreshing the availability summary drops the public grid"""
+        self.client.get(PUBLIC_LABORATORY_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_laboratory_availability(self.laboratory.id)
+
+        res = self.client.get(PUBLIC_LABORATORY_URL)
+        self.assertEqual(res.data[0]['open_slots'], 0)
+
+    def test_invalidated_after_commit(self):
+        """Test entries cached before the commit are dropped once it happens"""
+        self.client.get(laboratory_url(self.laboratory.id))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.laboratory.name = 'Renamed'
+            self.laboratory.save()
+            # A concurrent request before the commit still sees the old rows
+            self.client.get(laboratory_url(self.laboratory.id))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self.client.get(laboratory_url(self.laboratory.id)).data['name'], 'Renamed')
+
+    def test_cache_key_includes_host(self):
+        """Test responses with absolute URLs are cached per scheme and host"""
+        self.client.get(laboratory_url(self.laboratory.id), HTTP_HOST='internal:8000')
+
+        with self.assertNumQueries(0):
+            self.client.get(laboratory_url(self.laboratory.id), HTTP_HOST='internal:8000')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(laboratory_url(self.laboratory.id), HTTP_HOST='booking.example.com', secure=True)
+
+        self.assertGreater(len(queries), 0)
@@ -0,0 +1,218 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking.management.commands.benchmark_slot_generation import legacy_create_slots
+from booking.materialization import materialize_next_chunk
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from booking.slots import PASSWORD_ALPHABET, PASSWORD_LENGTH, SlotSchedule, generate_passwords, materialize_slots
+
+import datetime
+import io
+
+import pytz
+from unittest import mock
+
+TIMEFRAME_URL = reverse('timeframelist')
+
+
+class SlotScheduleTests(TestCase):
+    """Test the arithmetic slot engine"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        laboratory = Laboratory.objects.create(name='Laboratory 1', description='Spectrometry', owner=self.user)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+
+    def create_timeframe(self, start_hour, end_hour, slot_duration, days=3):
+        start_date = datetime.datetime(2024, 3, 1, 10, 0, tzinfo=pytz.UTC)
+        return TimeFrame.objects.create(
+            start_date=start_date,
+            end_date=start_date + datetime.timedelta(days=days - 1),
+            start_hour=start_hour,
+            end_hour=end_hour,
+            slot_duration=slot_duration,
+            equipment=self.equipment,
+            owner=self.user
+        )
+
+    def assert_matches_legacy_loop(self, timeframe):
+        legacy_create_slots(timeframe, False, self.user)
+        expected = list(Booking.objects.filter(timeframe=timeframe).values_list('start_date', 'end_date'))
+        Booking.objects.filter(timeframe=timeframe).delete()
+
+        materialize_slots(timeframe, chunk_size=7)
+        created = list(Booking.objects.filter(timeframe=timeframe).values_list('start_date', 'end_date'))
+
+        self.assertEqual(created, expected)
+
+    def test_slots_match_legacy_loop(self):
+        """Test the engine creates the same slots as the previous loop"""
+        timeframe = self.create_timeframe(datetime.time(8, 0), datetime.time(12, 30), 25)
+        self.assert_matches_legacy_loop(timeframe)
+
+    def test_overnight_slots_match_legacy_loop(self):
+        """Test slots wrapping past midnight match the previous loop"""
+        timeframe = self.create_timeframe(datetime.time(22, 0), datetime.time(2, 0), 45)
+        self.assert_matches_legacy_loop(timeframe)
+
+    def test_iter_slots_resumes_from_index(self):
+        """Test iterating from an offset yields the tail of the schedule"""
+        timeframe = self.create_timeframe(datetime.time(8, 0), datetime.time(10, 0), 30)
+        schedule = SlotSchedule.from_timeframe(timeframe)
+
+        self.assertEqual(len(schedule), 12)
+        self.assertEqual(list(schedule.iter_slots(5)), list(schedule.iter_slots())[5:])
+        self.assertEqual(schedule.slot(5), list(schedule.iter_slots())[5][1:])
+
+    def test_copy_and_bulk_writers_create_same_rows(self):
+        """Test both chunk writers create equivalent bookings"""
+        timeframe = self.create_timeframe(datetime.time(8, 0), datetime.time(9, 0), 15)
+
+        materialize_slots(timeframe, public=True, use_copy=False)
+        bulk_rows = list(Booking.objects.filter(timeframe=timeframe).values_list('start_date', 'public', 'available'))
+        Booking.objects.filter(timeframe=timeframe).delete()
+
+        materialize_slots(timeframe, public=True, use_copy=True)
+        copy_rows = list(Booking.objects.filter(timeframe=timeframe).values_list('start_date', 'public', 'available'))
+
+        self.assertEqual(copy_rows, bulk_rows)
+        self.assertEqual(Booking.objects.filter(timeframe=timeframe).values('access_key').distinct().count(), 12)
+
+    def test_generate_passwords(self):
+        """Test passwords are drawn from the get_random_string alphabet"""
+        passwords = generate_passwords(500)
+
+        self.assertEqual(len(passwords), 500)
+        self.assertEqual(len(set(passwords)), 500)
+        for password in passwords:
+            self.assertEqual(len(password), PASSWORD_LENGTH)
+            self.assertTrue(set(password) <= set(PASSWORD_ALPHABET))
+
+
+class PrivateTimeFrameApiTests(TestCase):
+    """Test the private timeframes API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', description='Spectrometry', owner=self.user)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+
+    def test_create_timeframe_creates_slots(self):
+        """Test creating a timeframe creates one booking per slot"""
+        payload = {
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-05T00:00:00Z',
+            'start_hour': '08:00',
+            'end_hour': '12:00',
+            'slot_duration': 30,
+            'equipment': self.equipment.id,
+            'public': True
+        }
+
+        res = self.client.post(TIMEFRAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        bookings = Booking.objects.filter(timeframe_id=res.data['id'])
+        self.assertEqual(bookings.count(), 5 * 8)
+        self.assertEqual(bookings.filter(public=True, available=True, owner=self.user).count(), 5 * 8)
+
+    def test_create_timeframe_with_invalid_dates(self):
+        """Test a timeframe ending before it starts is rejected"""
+        payload = {
+            'start_date': '2024-03-05T00:00:00Z',
+            'end_date': '2024-03-01T00:00:00Z',
+            'start_hour': '08:00',
+            'end_hour': '12:00',
+            'slot_duration': 30,
+            'equipment': self.equipment.id
+        }
+
+        res = self.client.post(TIMEFRAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TimeFrame.objects.exists())
+
+    def test_create_timeframe_in_background(self):
+        """Test a background timeframe is created right away and filled by the worker"""
+        payload = {
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-05T00:00:00Z',
+            'start_hour': '08:00',
+            'end_hour': '12:00',
+            'slot_duration': 30,
+            'equipment': self.equipment.id,
+            'background': True
+        }
+
+        res = self.client.post(TIMEFRAME_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['status'], TimeFrame.MATERIALIZING)
+        self.assertEqual(res.data['total_slots'], 40)
+        self.assertEqual(res.data['materialized_slots'], 0)
+        self.assertFalse(Booking.objects.exists())
+
+        materialize_next_chunk(chunk_size=15)
+        res = self.client.get(reverse('timeframedetail', args=[res.data['id']]))
+
+        self.assertEqual(res.data['status'], TimeFrame.MATERIALIZING)
+        self.assertEqual(res.data['materialized_slots'], 15)
+
+        while materialize_next_chunk(chunk_size=15) is not None:
+            pass
+        res = self.client.get(reverse('timeframedetail', args=[res.data['id']]))
+
+        self.assertEqual(res.data['status'], TimeFrame.READY)
+        self.assertEqual(res.data['materialized_slots'], 40)
+        self.assertEqual(Booking.objects.filter(timeframe_id=res.data['id']).count(), 40)
+        self.assertEqual(Booking.objects.values('start_date').distinct().count(), 40)
+
+    def test_failed_chunks_back_off_and_requeue(self):
+        """Test a failing chunk is retried after a delay, marked as failed, and can be queued again"""
+        payload = {
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-02T00:00:00Z',
+            'start_hour': '08:00',
+            'end_hour': '10:00',
+            'slot_duration': 30,
+            'equipment': self.equipment.id,
+            'background': True
+        }
+        timeframe_id = self.client.post(TIMEFRAME_URL, payload, format='json').data['id']
+
+        with mock.patch('booking.materialization.write_slots', side_effect=Exception('Connection lost')):
+            with mock.patch('builtins.print'):
+                timeframe = materialize_next_chunk(max_attempts=2)
+
+                self.assertEqual(timeframe.materialization_attempts, 1)
+                self.assertGreater(timeframe.next_attempt_date, timezone.now())
+                self.assertIsNone(materialize_next_chunk(max_attempts=2))
+
+                TimeFrame.objects.filter(id=timeframe_id).update(next_attempt_date=timezone.now())
+                timeframe = materialize_next_chunk(max_attempts=2)
+
+        self.assertEqual(timeframe.status, TimeFrame.FAILED)
+        self.assertIsNone(materialize_next_chunk())
+
+        call_command('materialize_timeframes', '--requeue', str(timeframe_id), stdout=io.StringIO())
+        while materialize_next_chunk() is not None:
+            pass
+
+        timeframe = TimeFrame.objects.get(id=timeframe_id)
+        self.assertEqual(timeframe.status, TimeFrame.READY)
+        self.assertEqual(Booking.objects.filter(timeframe_id=timeframe_id).count(), timeframe.total_slots)
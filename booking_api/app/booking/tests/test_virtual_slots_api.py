@@ -0,0 +1,273 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from booking import slots
+from booking.models import Booking, Equipment, Laboratory, TimeFrame
+from booking.slots import SlotSchedule, get_or_create_slot_booking
+from unittest import mock
+
+import datetime
+import os
+import time
+
+import pytz
+
+BOOKING_URL = reverse('bookinglist')
+TIMEFRAME_URL = reverse('timeframelist')
+
+
+class VirtualSlotsApiTests(TestCase):
+    """Test timeframes whose slots are computed instead of stored"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+        self.client.force_authenticate(self.user)
+
+        laboratory = Laboratory.objects.create(name='Laboratory 1', description='Spectrometry', owner=self.user)
+        self.equipment = Equipment.objects.create(name='Equipment 1', laboratory=laboratory, owner=self.user)
+
+        payload = {
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-03T00:00:00Z',
+            'start_hour': '08:00',
+            'end_hour': '10:00',
+            'slot_duration': 30,
+            'equipment': self.equipment.id,
+            'virtual': True
+        }
+        res = self.client.post(TIMEFRAME_URL, payload, format='json')
+        self.timeframe = TimeFrame.objects.get(id=res.data['id'])
+
+    def list_slots(self, **params):
+        return self.client.get(BOOKING_URL, dict({
+            'equipment': self.equipment.id,
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-02T00:00:00Z'
+        }, **params))
+
+    def test_create_virtual_timeframe_stores_no_bookings(self):
+        """Test a virtual timeframe does not insert a booking per slot"""
+        self.assertTrue(self.timeframe.virtual)
+        self.assertEqual(self.timeframe.total_slots, 12)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_list_computes_open_slots(self):
+        """Test the booking list returns the computed slots of the range"""
+        res = self.list_slots()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 4)
+        self.assertEqual([slot['slot'] for slot in res.data['results']], [0, 1, 2, 3])
+        self.assertTrue(all(slot['id'] is None for slot in res.data['results']))
+
+    def test_slots_and_rows_paginated_together(self):
+        """Test pages of stored rows and virtual slots keep the same shape and order"""
+        start_date = datetime.datetime(2024, 3, 1, 8, 0, tzinfo=pytz.UTC)
+        timeframe = TimeFrame.objects.create(start_date=start_date, end_date=start_date, start_hour=datetime.time(8),
+                                             end_hour=datetime.time(9), slot_duration=60, equipment=self.equipment,
+                                             owner=self.user)
+        Booking.objects.create(start_date=start_date, end_date=start_date + datetime.timedelta(hours=1),
+                               owner=self.user, equipment=self.equipment, timeframe=timeframe)
+        self.client.patch(reverse('virtualbookingdetail', args=[self.timeframe.id, 1]) + '?register=true',
+                          {'public': False, 'available': True}, format='json')
+        expected = self.list_slots(paginate='false').data
+
+        pages, res = [], self.list_slots(page_size=2)
+        while True:
+            pages.append(res.data['results'])
+            if res.data['next'] is None:
+                break
+            res = self.client.get(res.data['next'])
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual([item for page in pages for item in page], expected)
+        self.assertEqual([(item['id'] is None, item['start_date']) for item in expected][:3],
+                         [(False, '2024-03-01T08:00:00Z'), (True, '2024-03-01T08:00:00Z'), (False, '2024-03-01T08:30:00Z')])
+
+        res = self.client.get(res.data['previous'])
+
+        self.assertEqual(res.data['results'], pages[1])
+
+    def test_page_builds_only_its_slots(self):
+        """Test a page of a wide range only builds the slots it can hold"""
+        TimeFrame.objects.create(start_date=datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC),
+                                 end_date=datetime.datetime(2024, 12, 31, tzinfo=pytz.UTC), start_hour=datetime.time(8),
+                                 end_hour=datetime.time(20), slot_duration=5, equipment=self.equipment,
+                                 owner=self.user, virtual=True, total_slots=366 * 144)
+        params = {'start_date': '2024-01-01T00:00:00Z', 'end_date': '2025-01-01T00:00:00Z', 'page_size': 3}
+
+        with mock.patch('booking.slots.virtual_slot', wraps=slots.virtual_slot) as built:
+            first = self.list_slots(**params)
+            second = self.client.get(first.data['next'])
+
+        # Both timeframes build at most page_size + 2 slots per page
+        self.assertLessEqual(built.call_count, 2 * 2 * 5)
+        self.assertEqual([item['start_date'] for item in first.data['results'] + second.data['results']],
+                         ['2024-01-01T08:00:00Z', '2024-01-01T08:05:00Z', '2024-01-01T08:10:00Z',
+                          '2024-01-01T08:15:00Z', '2024-01-01T08:20:00Z', '2024-01-01T08:25:00Z'])
+
+        res = self.client.get(second.data['previous'])
+
+        self.assertEqual(res.data['results'], first.data['results'])
+
+    def test_slot_found_again_under_another_server_time_zone(self):
+        """Test a registered slot is not created twice when the UTC offset of the server changes"""
+        booking = get_or_create_slot_booking(self.timeframe, 1)
+
+        with mock.patch.dict(os.environ, {'TZ': 'America/New_York'}):
+            time.tzset()
+            try:
+                again = get_or_create_slot_booking(self.timeframe, 1)
+            finally:
+                os.environ['TZ'] = 'UTC'
+                time.tzset()
+
+        self.assertEqual(again.id, booking.id)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_register_slot_creates_booking(self):
+        """Test registering a slot writes its booking row once"""
+        url = reverse('virtualbookingdetail', args=[self.timeframe.id, 1])
+
+        res = self.client.patch(url + '?register=true', {'public': False, 'available': False}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        booking = Booking.objects.get()
+        self.assertEqual(res.data['id'], booking.id)
+        self.assertEqual(booking.reserved_by, self.user)
+        self.assertEqual((booking.start_date, booking.end_date), SlotSchedule.from_timeframe(self.timeframe).slot(1))
+
+        res = self.client.patch(url + '?register=true', {'public': False, 'available': False}, format='json')
+
+        self.assertEqual(Booking.objects.count(), 1)
+
+        res = self.list_slots()
+
+        self.assertEqual([slot['slot'] for slot in res.data['results']], [0, 2, 3])
+
+    def test_retrieve_unregistered_slot(self):
+        """Test reading a slot does not write a booking row"""
+        res = self.client.get(reverse('virtualbookingdetail', args=[self.timeframe.id, 5]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['id'])
+        self.assertEqual(res.data['start_date'], '2024-03-02T08:30:00Z')
+        self.assertFalse(Booking.objects.exists())
+
+    def test_slot_out_of_range(self):
+        """Test a slot index past the end of the timeframe is not found"""
+        res = self.client.get(reverse('virtualbookingdetail', args=[self.timeframe.id, 12]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reserve_slot_like_the_ui(self):
+        """Test an open slot from the list can be checked, registered and confirmed"""
+        slot = self.client.get(BOOKING_URL, {
+            'equipment': self.equipment.id,
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-02T00:00:00Z',
+            'paginate': 'false'
+        }).data[2]
+        slot_url = reverse('virtualbookingdetail', args=[slot['timeframe'], slot['slot']])
+
+        res = self.client.get(slot_url)
+        self.assertTrue(res.data['available'])
+
+        payload = {'id': None, 'timeframe': slot['timeframe'], 'slot': slot['slot'], 'available': False, 'public': False}
+        res = self.client.patch(slot_url + '?register=true', payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['reserved_by'], self.user.id)
+        booking_id = res.data['id']
+
+        payload = {'id': booking_id, 'available': False, 'public': False}
+        res = self.client.patch(reverse('bookingdetail', args=[booking_id]) + '?confirmed=true', payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        booking = Booking.objects.get(id=booking_id)
+        self.assertEqual(booking.reserved_by, self.user)
+        self.assertEqual(booking.start_date.isoformat().replace('+00:00', 'Z'), slot['start_date'])
+
+    def test_reserve_slot_endpoint(self):
+        """Test the reserve endpoint of a slot writes and claims its booking"""
+        res = self.client.post(reverse('virtualbookingreserveslot', args=[self.timeframe.id, 3]), {'public': True},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Booking.objects.get(id=res.data['id']).reserved_by, self.user)
+
+        res = self.client.post(reverse('virtualbookingreserveslot', args=[self.timeframe.id, 12]))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_reserve_range_includes_virtual_slots(self):
+        """Test reserving a range claims the open slots of virtual timeframes"""
+        self.equipment.bookings_per_user = 5
+        self.equipment.save()
+        self.client.patch(reverse('virtualbookingdetail', args=[self.timeframe.id, 0]) + '?register=true',
+                          {'public': False, 'available': False}, format='json')
+
+        res = self.client.post(reverse('bookingbulkreserve'), {
+            'equipment': self.equipment.id,
+            'start_date': '2024-03-01T08:00:00Z',
+            'end_date': '2024-03-01T09:30:00Z'
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual(Booking.objects.filter(reserved_by=self.user).count(), 3)
+
+    def test_bulk_reserve_over_quota_writes_no_slots(self):
+        """Test a rejected range reservation does not leave booking rows behind"""
+        res = self.client.post(reverse('bookingbulkreserve'), {
+            'equipment': self.equipment.id,
+            'start_date': '2024-03-01T00:00:00Z',
+            'end_date': '2024-03-02T00:00:00Z'
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Booking.objects.exists())
+
+
+class SlotScheduleRangeTests(TestCase):
+    """Test the range lookup of the slot engine"""
+
+    def test_iter_slots_between_matches_full_iteration(self):
+        """Test slots in a window equal the filtered full schedule"""
+        schedule = SlotSchedule(datetime.datetime(2024, 3, 1, tzinfo=pytz.UTC), datetime.datetime(2024, 3, 6, tzinfo=pytz.UTC),
+                                datetime.time(21, 0), datetime.time(3, 0), 40, tzinfo=pytz.UTC)
+        start = datetime.datetime(2024, 3, 2, 1, 10, tzinfo=pytz.UTC)
+        end = datetime.datetime(2024, 3, 4, 22, 0, tzinfo=pytz.UTC)
+
+        expected = [slot for slot in schedule.iter_slots() if start <= slot[1] < end]
+
+        self.assertEqual(list(schedule.iter_slots_between(start, end)), expected)
+
+    @override_settings(TIME_ZONE='Europe/Madrid')
+    def test_schedule_across_dst_change(self):
+        """Test days keep their wall clock start hour when the UTC offset changes, 2024-03-31 in Madrid"""
+        schedule = SlotSchedule(datetime.datetime(2024, 3, 30, tzinfo=pytz.UTC), datetime.datetime(2024, 4, 1, tzinfo=pytz.UTC),
+                                datetime.time(8, 0), datetime.time(10, 0), 30)
+        full = list(schedule.iter_slots())
+        start = datetime.datetime(2024, 3, 30, 9, 0, tzinfo=pytz.UTC)
+        end = datetime.datetime(2024, 4, 1, 6, 30, tzinfo=pytz.UTC)
+        expected = [slot for slot in full if start <= slot[1] < end]
+
+        self.assertEqual([full[index][1].astimezone(pytz.UTC).hour for index in (0, 4, 8)], [7, 6, 6])
+        self.assertEqual({timezone.localtime(slot[1]).strftime('%H:%M') for slot in full[::4]}, {'08:00'})
+        self.assertEqual([schedule.slot(index) for index in range(len(schedule))], [slot[1:] for slot in full])
+        self.assertEqual(list(schedule.iter_slots_between(start, end)), expected)
+        self.assertEqual(list(schedule.iter_slots_between(start, end, reverse=True)), expected[::-1])
+        self.assertEqual(schedule.count_between(start, end), len(expected))
@@ -0,0 +1,163 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from booking.models import CONTENT_FIELDS, ChunkedUpload, LaboratoryContent
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+import datetime
+import fcntl
+import os
+
+OFFSET_MISMATCH = 'offset_mismatch'
+UPLOAD_TOO_LARGE = 'too_large'
+UPLOAD_INCOMPLETE = 'incomplete'
+UPLOAD_BUSY = 'busy'
+
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """The chunk or upload was rejected, code is one of the constants above"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def partial_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f'{upload.id}.part')
+
+
+def start_upload(user, filename, size):
+    """Register an upload of size bytes and create its empty partial file"""
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(UPLOAD_TOO_LARGE, f'Uploads are limited to {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes')
+
+    upload = ChunkedUpload.objects.create(owner=user, filename=os.path.basename(filename), size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_ROOT, exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload, offset, stream):
+    """
+    Write the request body at offset and return the new offset of the upload.
+
+    The body is copied in READ_SIZE blocks, so memory use does not depend on
+    the size of the chunk. The partial file is locked while it is written;
+    the lock is not held in a database transaction, so a slow client does not
+    keep one open. If the client disconnects, the bytes already received are
+    kept and the upload resumes from there.
+    """
+    with open(partial_path(upload), 'r+b') as partial:
+        try:
+            fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError(UPLOAD_BUSY, 'Another chunk of this upload is being written')
+
+        # Read the offset again under the lock, another chunk may have been appended
+        current = ChunkedUpload.objects.values_list('offset', flat=True).get(id=upload.id)
+        if offset != current:
+            upload.offset = current
+            raise UploadError(OFFSET_MISMATCH, f'The upload is at offset {current}')
+
+        # Bytes past the offset were written by an interrupted process and not recorded
+        partial.truncate(offset)
+        partial.seek(offset)
+        remaining = upload.size - offset
+        written = 0
+
+        try:
+            while stream is not None:
+                data = stream.read(min(READ_SIZE, remaining - written + 1))
+                if not data:
+                    break
+                if written + len(data) > remaining:
+                    partial.truncate(offset)
+                    raise UploadError(UPLOAD_TOO_LARGE, 'The chunk goes past the size of the upload')
+                partial.write(data)
+                written += len(data)
+        except UnreadablePostError:
+            pass
+        finally:
+            partial.flush()
+
+        upload.offset = offset + written
+        ChunkedUpload.objects.filter(id=upload.id).update(offset=upload.offset, last_modification_date=timezone.now())
+
+    return upload.offset
+
+
+def finalize_upload(upload, laboratory, order, is_last=False):
+    """
+    Store a complete upload as the video content at order of a laboratory.
+
+    The partial file is hashed and copied into labs_content_videos/ by
+    UniqueFilenameStorage, which reads it in chunks. The content at order is
+    replaced like in LaboratoryContentList, and the upload is removed.
+    """
+    if upload.offset != upload.size:
+        raise UploadError(UPLOAD_INCOMPLETE, f'{upload.offset} of {upload.size} bytes were uploaded')
+
+    content = LaboratoryContent.objects.filter(laboratory=laboratory, order=order).first()
+    if content is None:
+        content = LaboratoryContent(laboratory=laboratory, order=order)
+
+    with open(partial_path(upload), 'rb') as partial:
+        content.video.save(upload.filename, File(partial), save=False)
+
+    with transaction.atomic():
+        for field in CONTENT_FIELDS:
+            if field != 'video':
+                setattr(content, field, None)
+        content.is_last = is_last
+        content.save()
+
+        if is_last:
+            LaboratoryContent.objects.filter(laboratory=laboratory, order__gt=order).delete()
+
+    delete_upload(upload)
+    return content
+
+
+def delete_upload(upload):
+    path = partial_path(upload)
+    upload.delete()
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def delete_stale_uploads(now=None):
+    """
+    Delete uploads without a new chunk for CHUNKED_UPLOAD_EXPIRATION seconds,
+    and partial files left without an upload. Returns the number of files.
+    """
+    now = now or timezone.now()
+    limit = now - datetime.timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRATION)
+    deleted = 0
+
+    for upload in ChunkedUpload.objects.filter(last_modification_date__lt=limit):
+        delete_upload(upload)
+        deleted += 1
+
+    if not os.path.isdir(settings.CHUNKED_UPLOAD_ROOT):
+        return deleted
+
+    active = {f'{upload_id}.part' for upload_id in ChunkedUpload.objects.values_list('id', flat=True)}
+    for entry in os.scandir(settings.CHUNKED_UPLOAD_ROOT):
+        if entry.name in active or not entry.is_file():
+            continue
+        if entry.stat().st_mtime < limit.timestamp():
+            os.remove(entry.path)
+            deleted += 1
+
+    return deleted
@@ -5,27 +5,41 @@ Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 """
 
 from django.urls import path
-from booking import views
-from django.conf.urls.static import static
+from booking import async_views, media, views
 from django.conf import settings
 
 urlpatterns = [
     path('bookings/', views.BookingList.as_view(), name='bookinglist'),
+    path('bookings/calendar/', views.BookingCalendar.as_view(), name='bookingcalendar'),
+    path('bookings/export/<str:export_format>/', views.BookingExport.as_view(), name='bookingexport'),
+    path('bookings/reserve/', views.BookingBulkReserve.as_view(), name='bookingbulkreserve'),
     path('bookings/<int:pk>/', views.BookingDetail.as_view(), name='bookingdetail'),
+    path('bookings/<int:pk>/reserve/', views.BookingReserve.as_view(), name='bookingreserveslot'),
     path('public/', views.BookingPublicList.as_view(), name='bookingpublic'),
     path('reservation/', views.BookingAccess.as_view(), name='bookingreserve'),
+    path('reservation/verdict/', views.BookingAccessVerdict.as_view(), name='bookingaccessverdict'),
     path('me/', views.BookingUserList.as_view(), name='bookinguser'),
+    path('async/bookings/', async_views.AsyncBookingList.as_view(), name='asyncbookinglist'),
+    path('async/reservation/', async_views.AsyncBookingAccess.as_view(), name='asyncbookingreserve'),
+    path('async/me/', async_views.AsyncBookingUserList.as_view(), name='asyncbookinguser'),
     path('equipments/', views.EquipmentList.as_view(), name='equipmentlist'),
     path('equipments/<int:pk>/', views.EquipmentDetail.as_view(), name='equipmentdetail'),
     path('equipments/user-booking-availability/', views.UserBookingAvailability.as_view(), name='equipment-user-booking-availability'),
     path('timeframes/', views.TimeFrameList.as_view(), name='timeframelist'),
     path('timeframes/<int:pk>/', views.TimeFrameDetail.as_view(), name='timeframedetail'),
+    path('timeframes/<int:timeframe_id>/slots/<int:slot>/', views.VirtualBookingDetail.as_view(), name='virtualbookingdetail'),
+    path('timeframes/<int:timeframe_id>/slots/<int:slot>/reserve/', views.VirtualBookingReserve.as_view(), name='virtualbookingreserveslot'),
     path('laboratories/', views.LaboratoryList.as_view(), name='laboratorylist'),
     path('public-laboratories/', views.PublicLaboratoryList.as_view(), name='publiclaboratorylist'),
     path('laboratories/<int:pk>/', views.LaboratoryRetrieve.as_view(), name='laboratorydetail-retrieve'),
     path('laboratories/<int:pk>/update/', views.LaboratoryUpdate.as_view(), name='laboratorydetail-update'),
     path('laboratories/contents/', views.LaboratoryContentList.as_view(), name='lab-content-list-create'),
+    path('laboratories/contents/uploads/', views.ChunkedUploadList.as_view(), name='chunkeduploadlist'),
+    path('laboratories/contents/uploads/<uuid:pk>/', views.ChunkedUploadDetail.as_view(), name='chunkeduploaddetail'),
+    path('laboratories/contents/uploads/<uuid:pk>/finalize/', views.ChunkedUploadFinalize.as_view(), name='chunkeduploadfinalize'),
     path('laboratories/<int:laboratory_id>/contents/', views.LaboratoryContentRetrieve.as_view(), name='contents-for-laboratory'),
+    path('laboratories/<int:laboratory_id>/contents/batch/', views.LaboratoryContentBatch.as_view(), name='contents-batch'),
     path('laboratories/<int:laboratory_id>/delete-contents/', views.LaboratoryContentDeleteAll.as_view(), name='delete_all_contents'),
     path('laboratories/user-access/', views.UserLaboratoryAccess.as_view(), name='lab-user-access'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', media.MediaView.as_view(), name='media'),
+]
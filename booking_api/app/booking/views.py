@@ -4,52 +4,123 @@ MIT License - See LICENSE file in the root directory
 Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 """
 
-from booking.models import Booking, Equipment, Laboratory, TimeFrame, LaboratoryContent
+from booking.access import access_queryset, check_access, parse_access_key
+from booking.availability import adjust_laboratory_availability, schedule_availability_refresh
+from booking.calendar import GROUPS, booking_calendar
+from booking.contents import ContentFileError, save_laboratory_contents
+from booking.export import iter_csv, iter_export_rows, iter_ical
+from booking.cache import CachedResponseMixin, LABORATORIES_SCOPE, contents_scope, laboratory_scope
+from booking.models import Booking, ChunkedUpload, Equipment, Laboratory, TimeFrame, LaboratoryContent
+from booking.pagination import IdPagination, SlotPagination, StartDatePagination
 from booking.permissions import IsOwnerOrReadOnly
+from booking.reservations import INVALID_REQUEST, ReservationError, bookings_in_range, reserve_booking, reserve_bookings
 from booking.serializers import BookingSerializer, EquipmentSerializer, LaboratorySerializer, PublicBookingSerializer,\
-  TimeFrameSerializer, LaboratoryContentSerializer, UserLaboratoryAccessSerializer, UserBookingAvailabilitySerializer
-from core.models import User
+  TimeFrameSerializer, LaboratoryContentSerializer, UserLaboratoryAccessSerializer, UserBookingAvailabilitySerializer,\
+  PublicLaboratorySerializer, BulkReservationSerializer, ChunkedUploadSerializer,\
+  ChunkedUploadFinalizeSerializer, LaboratoryContentBatchSerializer, serialize_bookings_and_slots
+from booking.slots import SlotSchedule, virtual_slots, get_or_create_slot_booking
+from booking.uploads import OFFSET_MISMATCH, UPLOAD_BUSY, UPLOAD_INCOMPLETE, UPLOAD_TOO_LARGE, UploadError,\
+  append_chunk, delete_upload, finalize_upload, start_upload
 from django.core.exceptions import SuspiciousOperation
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import add_never_cache_headers, patch_cache_control
 from rest_framework import generics, status
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
-from utils import send_custom_email, get_correct_datetime
+from users.authentication import CachedTokenAuthentication
+from utils import send_custom_email, get_user_time_zone, localize_datetimes
 import datetime
+import json
 
-class BookingList(generics.ListCreateAPIView):
+class BookingRangeMixin:
+    """Parse the equipment and start_date/end_date filters shared by the booking lists"""
 
-    serializer_class = BookingSerializer
-    authentication_classes = (TokenAuthentication,)
-    permission_classes = (IsAuthenticated,)
-
-    def get_queryset(self):
-        queryset = Booking.objects.all()
-        equipment = self.request.query_params.get('equipment')
+    def get_date_range(self):
         start_date = self.request.query_params.get('start_date')
         end_date = self.request.query_params.get('end_date')
 
         if start_date is not None and end_date is not None:
-            start_date_datetime = datetime.datetime.strptime(start_date, '%Y-%m-%dT%H:%M:%SZ')
-            end_date_datetime = datetime.datetime.strptime(end_date, '%Y-%m-%dT%H:%M:%SZ')
+            start_date_datetime = datetime.datetime.strptime(start_date, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+            end_date_datetime = datetime.datetime.strptime(end_date, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+            return start_date_datetime, end_date_datetime
 
-            queryset = queryset.filter(start_date__gte=start_date_datetime, start_date__lt=end_date_datetime)
+        return None
+
+    def get_equipment_id(self):
+        equipment = self.request.query_params.get('equipment')
 
         if equipment is not None:
             if not equipment.isdigit():
                 raise SuspiciousOperation('Equipment id must be a number')
 
-            queryset = queryset.filter(equipment_id=int(equipment))
+            return int(equipment)
+
+        return None
+
+    def get_virtual_slots(self, cursor_date=None, reverse=False, limit=None):
+        """
+        Open slots of virtual timeframes in the range, from cursor_date on (up
+        to it with reverse), see booking.slots.virtual_slots.
+        """
+        date_range = self.get_date_range()
+        if date_range is None:
+            return []
 
-        return queryset.filter(available=True)
+        start_date, end_date = date_range
+        if cursor_date is not None and reverse:
+            end_date = min(end_date, cursor_date + datetime.timedelta(microseconds=1))
+        elif cursor_date is not None:
+            start_date = max(start_date, cursor_date)
+
+        return virtual_slots(start_date, end_date, self.get_equipment_id(), reverse, limit)
+
+    def filter_range(self, queryset):
+        date_range = self.get_date_range()
+        equipment_id = self.get_equipment_id()
+
+        if date_range is not None:
+            queryset = queryset.filter(start_date__gte=date_range[0], start_date__lt=date_range[1])
+
+        if equipment_id is not None:
+            queryset = queryset.filter(equipment_id=equipment_id)
+
+        return queryset
+
+
+class BookingList(BookingRangeMixin, generics.ListCreateAPIView):
+
+    serializer_class = BookingSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = SlotPagination
+
+    def get_queryset(self):
+        return self.filter_range(Booking.objects.filter(available=True))
+
+    def list(self, request, *args, **kwargs):
+        """
+        Bookings of the range, plus the open slots of virtual timeframes when a
+        date range is given, paginated together by SlotPagination.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+
+        page = self.paginator.paginate_slots(queryset, self.get_virtual_slots, request)
+        if page is not None:
+            return self.get_paginated_response(serialize_bookings_and_slots(page, self.serializer_class, context))
+
+        items = self.paginator.sort(list(queryset) + self.get_virtual_slots())
+        return Response(serialize_bookings_and_slots(items, self.serializer_class, context))
 
 
 class BookingUserList(generics.ListAPIView):
 
     serializer_class = BookingSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = StartDatePagination
 
     def get_queryset(self):
         queryset = Booking.objects.all()
@@ -61,66 +132,178 @@ class BookingUserList(generics.ListAPIView):
         return None
 
 
-class BookingAccess(generics.ListAPIView):
+class BookingCalendar(BookingRangeMixin, generics.GenericAPIView):
+    """
+    Free and taken slot counts of an equipment per day (or hour with
+    group=hour) in the time zone of the current user, for the month view of
+    the booking stepper.
+    """
 
-    serializer_class = BookingSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    max_days = 366
 
-    def get_queryset(self):
-        queryset = Booking.objects.all()
-        access_key = self.request.query_params.get('access_key')
-        password = self.request.query_params.get('pwd')
+    def get(self, request):
+        equipment_id = self.get_equipment_id()
+        date_range = self.get_date_range()
+        group = request.query_params.get('group', 'day')
 
-        if access_key is not None:
-            queryset = queryset.filter(access_key=access_key)
+        if equipment_id is None or date_range is None:
+            return Response({'error': 'equipment, start_date and end_date are required.'},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-            if queryset.count() == 1:
-                if not queryset[0].public:
-                    queryset = queryset.filter(password=password)
+        if group not in GROUPS:
+            return Response({'error': f'group must be one of {", ".join(GROUPS)}.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            now = datetime.datetime.now()
-            queryset = queryset.filter(start_date__lte=now, end_date__gt=now)
+        if (date_range[1] - date_range[0]).days > self.max_days:
+            return Response({'error': f'The range cannot exceed {self.max_days} days.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            return queryset
+        time_zone = get_user_time_zone(request.user)
+        periods = booking_calendar(equipment_id, date_range[0], date_range[1], time_zone, group)
 
-        return None
+        return Response({'time_zone': str(time_zone), 'group': group, 'periods': periods}, status=status.HTTP_200_OK)
 
 
-class BookingPublicList(generics.ListAPIView):
+class BookingExport(BookingRangeMixin, generics.GenericAPIView):
+    """
+    Stream bookings as CSV or iCalendar.
 
-    serializer_class = PublicBookingSerializer
-    authentication_classes = (TokenAuthentication,)
+    Without filters the bookings reserved by the current user are exported,
+    like BookingUserList. With equipment or laboratory, every booking of the
+    laboratory is exported, for its owner only. Rows are read over a
+    server-side cursor and written as they come, memory does not grow with
+    the number of bookings.
+    """
+
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ics': 'text/calendar; charset=utf-8',
+    }
+
+    def get_laboratory(self):
+        equipment_id = self.get_equipment_id()
+        laboratory_id = self.request.query_params.get('laboratory')
+
+        if equipment_id is not None:
+            equipment = Equipment.objects.select_related('laboratory').filter(id=equipment_id).first()
+            if equipment is None:
+                return None, None
+
+            return equipment.laboratory, equipment.name
+
+        if laboratory_id is not None:
+            if not laboratory_id.isdigit():
+                raise SuspiciousOperation('Laboratory id must be a number')
+
+            laboratory = Laboratory.objects.filter(id=int(laboratory_id)).first()
+            if laboratory is None:
+                return None, None
+
+            return laboratory, laboratory.name
+
+        return None, None
+
+    def get(self, request, export_format):
+        if export_format not in self.content_types:
+            raise Http404('Unknown export format')
+
+        queryset = Booking.objects.all()
+        filtered = 'equipment' in request.query_params or 'laboratory' in request.query_params
+        laboratory, name = self.get_laboratory()
+
+        if filtered:
+            if laboratory is None:
+                return Response({'error': 'Laboratory does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+            if laboratory.owner_id != request.user.id and not request.user.is_staff:
+                return Response({'error': 'Only the laboratory owner can export its bookings.'},
+                                status=status.HTTP_403_FORBIDDEN)
+            queryset = queryset.filter(equipment__laboratory=laboratory)
+        else:
+            queryset = queryset.filter(reserved_by=request.user)
+            name = 'My bookings'
+
+        reserved = request.query_params.get('reserved')
+        if reserved is not None:
+            queryset = queryset.filter(reserved_by__isnull=reserved != 'true')
+
+        rows = iter_export_rows(self.filter_range(queryset))
+        if export_format == 'csv':
+            content = iter_csv(rows)
+        else:
+            content = iter_ical(rows, request.get_host().split(':')[0], name)
+
+        response = StreamingHttpResponse(content, content_type=self.content_types[export_format])
+        response['Content-Disposition'] = f'attachment; filename="bookings.{export_format}"'
+        return response
+
+
+class BookingAccess(generics.ListAPIView):
+
+    serializer_class = BookingSerializer
+
     def get_queryset(self):
-        queryset = Booking.objects.filter(public=True).exclude(reserved_by__isnull=True)
+        access_key = parse_access_key(self.request.query_params.get('access_key'))
+        password = self.request.query_params.get('pwd')
 
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        equipment = self.request.query_params.get('equipment')
+        if access_key is None:
+            return Booking.objects.none()
 
-        if start_date is not None and end_date is not None:
-            start_date_datetime = datetime.datetime.strptime(start_date, '%Y-%m-%dT%H:%M:%SZ')
-            end_date_datetime = datetime.datetime.strptime(end_date, '%Y-%m-%dT%H:%M:%SZ')
+        return access_queryset(access_key, password)
 
-            queryset = queryset.filter(start_date__gte=start_date_datetime, start_date__lt=end_date_datetime)
 
-        if equipment is not None:
-            if not equipment.isdigit():
-                raise SuspiciousOperation('Equipment id must be a number')
+class BookingAccessVerdict(generics.GenericAPIView):
+    """
+    Compact access verdict of an access key and password, checked with one
+    query. A granted verdict may be cached by the remote lab until the
+    booking ends.
+    """
+
+    authentication_classes = ()
+
+    def get(self, request):
+        verdict = check_access(request.query_params.get('access_key'), request.query_params.get('pwd'))
 
-            queryset = queryset.filter(equipment_id=int(equipment))
+        if not verdict['granted']:
+            response = Response(verdict, status=status.HTTP_403_FORBIDDEN)
+            add_never_cache_headers(response)
+            return response
 
-        return queryset.filter(available=False)
+        response = Response(verdict, status=status.HTTP_200_OK)
+        patch_cache_control(response, private=True, max_age=verdict['expires_in'])
+        return response
+
+
+class BookingPublicList(BookingRangeMixin, generics.ListAPIView):
+
+    serializer_class = PublicBookingSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    pagination_class = StartDatePagination
+
+    def get_queryset(self):
+        queryset = Booking.objects.filter(public=True, available=False, reserved_by__isnull=False)
+        return self.filter_range(queryset).select_related('reserved_by')
 
 
 class BookingDetail(generics.RetrieveUpdateAPIView):
 
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('equipment__laboratory__owner', 'reserved_by', 'timeframe')
 
     serializer_class = BookingSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
+    def get_student(self, instance):
+        """User holding the booking, the current user in the usual case"""
+        if instance.reserved_by_id is None or instance.reserved_by_id == self.request.user.id:
+            return self.request.user
+
+        return instance.reserved_by
+
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -129,42 +312,44 @@ class BookingDetail(generics.RetrieveUpdateAPIView):
         confirmed = self.request.query_params.get('confirmed')
         cancelled = self.request.query_params.get('cancelled')
 
-        equipment = Equipment.objects.get(id=instance.equipment_id)
-        laboratory = Laboratory.objects.get(id=equipment.laboratory_id)
+        equipment = instance.equipment
+        laboratory = equipment.laboratory
         base_url= f'{laboratory.url}?access_key={instance.access_key}'
         date_format = '%d/%m/%Y %I:%M %p'
         context = {
-            'equipment_name': instance.equipment.name,
+            'equipment_name': equipment.name,
             'lab_name': laboratory.name,
             'is_public': self.request.data['public']
         }
 
+        def slot_dates(user):
+            start_date, end_date = localize_datetimes((instance.start_date, instance.end_date), get_user_time_zone(user))
+            return {'start_date': start_date.strftime(date_format), 'end_date': end_date.strftime(date_format)}
+
         if register is not None and register == 'true':
-            if instance.reserved_by is None:
-                instance.reserved_by = self.request.user
+            try:
+                instance = reserve_booking(instance.id, self.request.user, self.request.data.get('public'))
+            except ReservationError as e:
+                return Response({'error': e.message, 'code': e.code}, status=status.HTTP_409_CONFLICT)
 
         if confirmed is not None and confirmed == 'true':
             recipient = [self.request.user.email]
             subject = 'Booking confirmation'
-            user_tz = User.objects.get(email=instance.reserved_by).time_zone
             template = 'booking_confirmation_email_template.html'
 
             context['private_url'] = f'{base_url}&pwd={instance.password}'
             context['public_url'] = base_url
-            context['start_date'] = get_correct_datetime(instance.start_date, user_tz).strftime(date_format)
-            context['end_date'] = get_correct_datetime(instance.end_date, user_tz).strftime(date_format)
+            context.update(slot_dates(self.get_student(instance)))
 
             send_custom_email(subject, template, context, recipient)
 
             if laboratory.notify_owner:
                 owner_recipient = [laboratory.owner.email]
                 owner_subject = 'New booking for your laboratory'
-                owner_tz = User.objects.get(email=laboratory.owner.email).time_zone
                 owner_template = 'booking_confirmation_owner_email_template.html'
 
                 owner_context = context
-                owner_context['start_date'] = get_correct_datetime(instance.start_date, owner_tz).strftime(date_format)
-                owner_context['end_date'] = get_correct_datetime(instance.end_date, owner_tz).strftime(date_format)
+                owner_context.update(slot_dates(laboratory.owner))
                 owner_context['student_name'] = f'{self.request.user.name} {self.request.user.last_name}'
                 owner_context['student_email'] = f'{self.request.user.email}'
 
@@ -173,17 +358,20 @@ class BookingDetail(generics.RetrieveUpdateAPIView):
         if cancelled is not None and cancelled== 'true':
             recipient = [self.request.user.email]
             subject = 'Booking cancellation'
-            user_tz = User.objects.get(email=instance.reserved_by).time_zone
             template = 'booking_cancellation_email_template.html'
 
-            context['start_date'] = get_correct_datetime(instance.start_date, user_tz).strftime(date_format)
-            context['end_date'] = get_correct_datetime(instance.end_date, user_tz).strftime(date_format)
+            context.update(slot_dates(self.get_student(instance)))
 
             send_custom_email(subject, template, context, recipient)
 
+        was_available = instance.available
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        if instance.available != was_available:
+            # Cancelling frees the slot, a reservation through reserve_booking was applied already
+            changed = {'freed' if instance.available else 'taken': [instance]}
+            adjust_laboratory_availability(laboratory.id, **changed)
 
         if getattr(instance, '_prefetched_objects_cache', None):
             instance = self.get_object()
@@ -192,12 +380,163 @@ class BookingDetail(generics.RetrieveUpdateAPIView):
         return Response(serializer.data)
 
 
+class BookingReserve(generics.GenericAPIView):
+    """Reserve a booking for the current user in a single, contention-safe operation"""
+
+    queryset = Booking.objects.all()
+    serializer_class = BookingSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, pk):
+        try:
+            booking = reserve_booking(pk, request.user, request.data.get('public'))
+        except Booking.DoesNotExist:
+            return Response({'error': 'Booking does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+        except ReservationError as e:
+            return Response({'error': e.message, 'code': e.code}, status=status.HTTP_409_CONFLICT)
+
+        return Response(self.get_serializer(booking).data, status=status.HTTP_200_OK)
+
+
+class VirtualBookingReserve(BookingReserve):
+    """Reserve a slot of a virtual timeframe, writing its Booking row on first use"""
+
+    @transaction.atomic
+    def post(self, request, timeframe_id, slot):
+        timeframe = TimeFrame.objects.select_for_update().filter(id=timeframe_id, virtual=True).first()
+        if timeframe is None:
+            return Response({'error': 'Timeframe does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            booking = get_or_create_slot_booking(timeframe, slot)
+        except IndexError:
+            return Response({'error': 'Slot does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+
+        return super().post(request, booking.id)
+
+
+class BookingBulkReserve(generics.GenericAPIView):
+    """
+    Reserve a block of bookings of one equipment, all or nothing.
+
+    Takes a list of booking ids, or an equipment with a start_date/end_date
+    range, and sends one confirmation listing every reserved slot.
+    """
+
+    serializer_class = BulkReservationSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def send_confirmation(self, bookings, public):
+        user = self.request.user
+        equipment = bookings[0].equipment
+        laboratory = Laboratory.objects.select_related('owner').get(id=equipment.laboratory_id)
+        date_format = '%d/%m/%Y %I:%M %p'
+
+        def slots(user):
+            time_zone = get_user_time_zone(user)
+            start_dates = localize_datetimes([booking.start_date for booking in bookings], time_zone)
+            end_dates = localize_datetimes([booking.end_date for booking in bookings], time_zone)
+            return [{
+                'start_date': start_date.strftime(date_format),
+                'end_date': end_date.strftime(date_format),
+                'private_url': f'{laboratory.url}?access_key={booking.access_key}&pwd={booking.password}',
+                'public_url': f'{laboratory.url}?access_key={booking.access_key}',
+            } for booking, start_date, end_date in zip(bookings, start_dates, end_dates)]
+
+        context = {
+            'equipment_name': equipment.name,
+            'lab_name': laboratory.name,
+            'is_public': public,
+            'bookings': slots(user)
+        }
+        send_custom_email('Booking confirmation', 'booking_bulk_confirmation_email_template.html', context, [user.email])
+
+        if laboratory.notify_owner:
+            owner_context = dict(context, bookings=slots(laboratory.owner),
+                                 student_name=f'{user.name} {user.last_name}', student_email=user.email)
+            send_custom_email('New bookings for your laboratory', 'booking_bulk_confirmation_owner_email_template.html',
+                              owner_context, [laboratory.owner.email])
+
+    @transaction.atomic
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        booking_ids = data.get('bookings')
+        if booking_ids is None:
+            booking_ids = bookings_in_range(data['equipment'], data['start_date'], data['end_date'])
+            if not booking_ids:
+                return Response({'error': 'No bookings in this range.'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            bookings = reserve_bookings(booking_ids, request.user, data.get('public'))
+        except Booking.DoesNotExist:
+            return Response({'error': 'Booking does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+        except ReservationError as e:
+            # Drop the rows written for the virtual slots of the range
+            transaction.set_rollback(True)
+            code = status.HTTP_400_BAD_REQUEST if e.code == INVALID_REQUEST else status.HTTP_409_CONFLICT
+            return Response({'error': e.message, 'code': e.code}, status=code)
+
+        self.send_confirmation(bookings, data.get('public', bookings[0].public))
+
+        return Response(BookingSerializer(bookings, many=True).data, status=status.HTTP_200_OK)
+
+
+class VirtualBookingDetail(BookingDetail):
+    """
+    Slot of a virtual timeframe, addressed by timeframe and slot index.
+
+    Reading a slot does not touch the booking table. The Booking row is only
+    written when the slot is registered, later requests use its id.
+    """
+
+    def get_timeframe(self, lock=False):
+        queryset = TimeFrame.objects.filter(virtual=True)
+        if lock:
+            queryset = queryset.select_for_update()
+
+        timeframe = queryset.filter(id=self.kwargs['timeframe_id']).first()
+        if timeframe is None:
+            raise Http404('Virtual timeframe not found')
+
+        return timeframe
+
+    def get_object(self):
+        register = self.request.method in ('PUT', 'PATCH') and self.request.query_params.get('register') == 'true'
+        timeframe = self.get_timeframe(lock=register)
+        schedule = SlotSchedule.from_timeframe(timeframe)
+        index = self.kwargs['slot']
+
+        if index >= len(schedule):
+            raise Http404('Slot not found')
+
+        if register:
+            return get_or_create_slot_booking(timeframe, index)
+
+        slot_start, slot_end = schedule.slot(index)
+        booking = Booking.objects.filter(timeframe=timeframe, start_date=slot_start).first()
+        if booking is not None:
+            return booking
+
+        if self.request.method not in SAFE_METHODS:
+            raise Http404('Slot is not registered')
+
+        return Booking(start_date=slot_start, end_date=slot_end, public=timeframe.public, access_key=None,
+                       owner_id=timeframe.owner_id, equipment_id=timeframe.equipment_id, timeframe=timeframe)
+
+
 class EquipmentList(generics.ListCreateAPIView):
 
     queryset = Equipment.objects.filter(enabled=True)
     serializer_class = EquipmentSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
+    pagination_class = IdPagination
 
     def get_queryset(self):
         queryset = Equipment.objects.filter(enabled=True)
@@ -216,7 +555,7 @@ class EquipmentDetail(generics.RetrieveUpdateAPIView):
 
     queryset = Equipment.objects.filter(enabled=True)
     serializer_class = EquipmentSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
 
 
@@ -224,8 +563,9 @@ class TimeFrameList(generics.ListCreateAPIView):
 
     queryset = TimeFrame.objects.all()
     serializer_class = TimeFrameSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
+    pagination_class = IdPagination
 
     def get_queryset(self):
         queryset = TimeFrame.objects.all()
@@ -244,18 +584,22 @@ class TimeFrameDetail(generics.RetrieveUpdateDestroyAPIView):
 
     queryset = TimeFrame.objects.all()
     serializer_class = TimeFrameSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
 
+    def perform_destroy(self, instance):
+        schedule_availability_refresh(instance.equipment.laboratory_id)
+        instance.delete()
+
 
 class LaboratoryList(generics.ListCreateAPIView):
 
     serializer_class = LaboratorySerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, IsOwnerOrReadOnly)
 
     def get_queryset(self):
-        queryset = Laboratory.objects.filter(enabled=True)
+        queryset = Laboratory.objects.filter(enabled=True).with_availability()
         owner = self.request.query_params.get('owner')
         visible = self.request.query_params.get('visible')
 
@@ -274,28 +618,45 @@ class LaboratoryList(generics.ListCreateAPIView):
         return queryset
 
 
-class PublicLaboratoryList(generics.ListAPIView):
+class PublicLaboratoryList(CachedResponseMixin, generics.ListAPIView):
 
-    serializer_class = LaboratorySerializer
+    serializer_class = PublicLaboratorySerializer
+
+    def get_cache_scopes(self):
+        return [LABORATORIES_SCOPE]
+
+    def get_last_modified(self, instances):
+        dates = [laboratory.last_modification_date for laboratory in instances]
+        dates += [laboratory.availability.last_modification_date for laboratory in instances
+                  if hasattr(laboratory, 'availability')]
+        return max(dates, default=None)
 
     def get_queryset(self):
-        queryset = Laboratory.objects.filter(enabled=True).filter(visible=True).order_by('id')
+        # Served from the precomputed summary, see booking.availability
+        queryset = Laboratory.objects.filter(enabled=True).filter(visible=True).select_related('availability').order_by('id')
         return queryset
 
-class LaboratoryRetrieve(generics.RetrieveAPIView):
+class LaboratoryRetrieve(CachedResponseMixin, generics.RetrieveAPIView):
     serializer_class = LaboratorySerializer
-    queryset = Laboratory.objects.filter(enabled=True)
+
+    def get_cache_scopes(self):
+        return [laboratory_scope(self.kwargs['pk'])]
+
+    def get_queryset(self):
+        return Laboratory.objects.filter(enabled=True).with_availability()
 
 class LaboratoryUpdate(generics.UpdateAPIView):
-    queryset = Laboratory.objects.filter(enabled=True)
 
     serializer_class = LaboratorySerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
+    def get_queryset(self):
+        return Laboratory.objects.filter(enabled=True).with_availability()
+
 class LaboratoryContentList(generics.ListCreateAPIView):
     serializer_class = LaboratoryContentSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     queryset = LaboratoryContent.objects.all()
@@ -345,8 +706,54 @@ class LaboratoryContentList(generics.ListCreateAPIView):
 
         return Response(LaboratoryContentSerializer(created_content).data, status=status.HTTP_201_CREATED)
 
+class LaboratoryContentBatch(generics.GenericAPIView):
+    """
+    Replace the contents of a laboratory with an ordered list of blocks.
+
+    The body is {"contents": [...]}, as JSON or as a multipart field next to
+    the new image and video files. Only the blocks that changed are written,
+    in one transaction with a constant number of queries, see
+    booking.contents.save_laboratory_contents.
+    """
+
+    serializer_class = LaboratoryContentBatchSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['files'] = self.request.FILES
+        return context
+
+    def put(self, request, laboratory_id):
+        laboratory = Laboratory.objects.filter(id=laboratory_id).first()
+        if laboratory is None:
+            return Response({'error': 'Laboratory does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+        if laboratory.owner_id != request.user.id:
+            return Response({'error': 'Only the laboratory owner can edit its contents.'}, status=status.HTTP_403_FORBIDDEN)
+
+        contents = request.data.get('contents')
+        if isinstance(contents, str):
+            try:
+                contents = json.loads(contents)
+            except ValueError:
+                return Response({'contents': ['Not valid JSON.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data={'contents': contents})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            saved = save_laboratory_contents(laboratory, serializer.validated_data['contents'], request.FILES, request.user)
+        except ContentFileError as e:
+            errors = [{} for _ in serializer.validated_data['contents']]
+            errors[e.index] = {e.field: [e.message]}
+            return Response({'contents': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(LaboratoryContentSerializer(saved, many=True, context=self.get_serializer_context()).data)
+
 class LaboratoryContentDeleteAll(generics.DestroyAPIView):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def delete(self, request, *args, **kwargs):
@@ -355,17 +762,123 @@ class LaboratoryContentDeleteAll(generics.DestroyAPIView):
         LaboratoryContent.objects.filter(laboratory=laboratory_id).delete()
         return Response("All contents successfully deleted", status=status.HTTP_200_OK)
 
-class LaboratoryContentRetrieve(generics.ListAPIView):
+UPLOAD_ERROR_STATUS = {
+    OFFSET_MISMATCH: status.HTTP_409_CONFLICT,
+    UPLOAD_BUSY: status.HTTP_409_CONFLICT,
+    UPLOAD_INCOMPLETE: status.HTTP_409_CONFLICT,
+    UPLOAD_TOO_LARGE: status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+}
+
+class ChunkedUploadMixin:
+    serializer_class = ChunkedUploadSerializer
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return ChunkedUpload.objects.filter(owner=self.request.user)
+
+    def upload_response(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(ChunkedUploadSerializer(upload).data, status=status_code)
+        response['Upload-Offset'] = upload.offset
+        return response
+
+    def upload_error(self, error, upload=None):
+        data = {'error': error.message, 'code': error.code}
+        if upload is not None:
+            data['offset'] = upload.offset
+        return Response(data, status=UPLOAD_ERROR_STATUS[error.code])
+
+class ChunkedUploadList(ChunkedUploadMixin, generics.GenericAPIView):
+    """
+    Start a resumable upload of a laboratory content video.
+
+    The video is sent in chunks to ChunkedUploadDetail and stored as a
+    content by ChunkedUploadFinalize. A dropped connection only loses the
+    chunk in flight, see booking.uploads.
+    """
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            upload = start_upload(request.user, serializer.validated_data['filename'], serializer.validated_data['size'])
+        except UploadError as e:
+            return self.upload_error(e)
+
+        return self.upload_response(upload, status.HTTP_201_CREATED)
+
+class ChunkedUploadDetail(ChunkedUploadMixin, generics.GenericAPIView):
+    """
+    GET returns the offset to resume from. PATCH appends the raw request body
+    at the offset given in the Upload-Offset header, and DELETE aborts the
+    upload. The body is read as a stream, never loaded into memory.
+    """
+
+    def get(self, request, pk):
+        return self.upload_response(self.get_object())
+
+    def patch(self, request, pk):
+        upload = self.get_object()
+
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({'error': 'The Upload-Offset header is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            append_chunk(upload, offset, request.stream)
+        except UploadError as e:
+            return self.upload_error(e, upload)
+
+        return self.upload_response(upload)
+
+    def delete(self, request, pk):
+        delete_upload(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class ChunkedUploadFinalize(ChunkedUploadMixin, generics.GenericAPIView):
+    """Store a complete upload as the video content at order of a laboratory"""
+
+    serializer_class = ChunkedUploadFinalizeSerializer
+
+    def post(self, request, pk):
+        upload = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if data['laboratory'].owner_id != request.user.id:
+            return Response({'error': 'Only the laboratory owner can add contents.'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            content = finalize_upload(upload, data['laboratory'], data['order'], data['is_last'])
+        except UploadError as e:
+            return self.upload_error(e, upload)
+
+        return Response(LaboratoryContentSerializer(content, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED)
+
+class LaboratoryContentRetrieve(CachedResponseMixin, generics.ListAPIView):
     serializer_class = LaboratoryContentSerializer
 
+    def get_cache_scopes(self):
+        return [contents_scope(self.kwargs.get('laboratory_id'))]
+
+    def get_last_modified(self, instances):
+        return self.laboratory.last_modification_date
+
     def get_queryset(self):
         laboratory_id = self.kwargs.get('laboratory_id')
         laboratory = Laboratory.objects.get(pk=laboratory_id)
+        self.laboratory = laboratory
         contents = LaboratoryContent.objects.filter(laboratory=laboratory)
         return contents
 
 class UserLaboratoryAccess(generics.GenericAPIView):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
@@ -388,7 +901,7 @@ class UserLaboratoryAccess(generics.GenericAPIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UserBookingAvailability(generics.GenericAPIView):
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
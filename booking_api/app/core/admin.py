@@ -33,4 +33,12 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class OutboundEmailAdmin(admin.ModelAdmin):
+    ordering = ['-id']
+    list_display = ['id', 'subject', 'recipients', 'status', 'attempts', 'next_attempt_date', 'sent_date']
+    list_filter = ['status']
+    search_fields = ('recipients', 'subject')
+
+
 admin.site.register(models.User, UserAdmin)
+admin.site.register(models.OutboundEmail, OutboundEmailAdmin)
@@ -0,0 +1,51 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+import time
+
+
+class Command(BaseCommand):
+    """Django command to compare opening a connection per request with a persistent connection"""
+
+    help = 'Run a few small queries per simulated request, reconnecting for every request and then reusing ' \
+           'one connection. Point DB_HOST/DB_PORT at pgbouncer to measure the pooled mode.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--queries', type=int, default=3, help='Queries run by each simulated request')
+
+    def run_request(self, queries):
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+
+    def measure(self, count, queries, reconnect):
+        connection.close()
+        started = time.perf_counter()
+
+        for _ in range(count):
+            self.run_request(queries)
+            if reconnect:
+                connection.close()
+
+        return (time.perf_counter() - started) / count * 1e3
+
+    def handle(self, *args, **options):
+        count, queries = options['requests'], options['queries']
+        settings_dict = connection.settings_dict
+
+        self.stdout.write(f'CONN_MAX_AGE={settings_dict["CONN_MAX_AGE"]} '
+                          f'CONN_HEALTH_CHECKS={settings_dict["CONN_HEALTH_CHECKS"]} '
+                          f'DISABLE_SERVER_SIDE_CURSORS={settings_dict["DISABLE_SERVER_SIDE_CURSORS"]}')
+
+        for name, reconnect in (('connection per request', True), ('persistent connection', False)):
+            per_request = self.measure(count, queries, reconnect)
+            self.stdout.write(f'{name:<24} {per_request:8.3f} ms/request')
+
+        connection.close()
@@ -0,0 +1,129 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from http.client import HTTPConnection
+import os
+import socket
+import subprocess
+import sys
+import time
+
+def gunicorn_command(port):
+    return [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+
+
+SERVERS = {
+    'runserver': lambda port: [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+    'gunicorn': gunicorn_command,
+    'uvicorn': gunicorn_command,
+}
+
+SERVER_ENVIRONMENT = {
+    'uvicorn': {'GUNICORN_ASGI': '1'},
+}
+
+
+class Command(BaseCommand):
+    """Django command to measure the throughput of the API under concurrent requests"""
+
+    help = 'Start each server in turn on a local port and send concurrent GET requests to each path for a ' \
+           'fixed duration. uvicorn is gunicorn serving the ASGI application. Use --url to load an already ' \
+           'running server instead.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', action='append', choices=sorted(SERVERS),
+                            help='Server to start, can be repeated (runserver and gunicorn by default)')
+        parser.add_argument('--url', help='host:port of a running server, instead of starting one')
+        parser.add_argument('--path', action='append',
+                            help='Path to request, can be repeated (/public-laboratories/ by default)')
+        parser.add_argument('--token', help='Token sent in the Authorization header')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def wait_for_port(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'The server exited with status {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+
+        raise CommandError(f'The server did not listen on port {port} within {timeout} seconds')
+
+    def client(self, host, port, path, headers, deadline):
+        """Send requests over one keep-alive connection until the deadline, reconnecting when closed"""
+        latencies, errors = [], 0
+        connection = HTTPConnection(host, port, timeout=30)
+
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+            except (OSError, ConnectionError):
+                errors += 1
+                connection.close()
+
+        connection.close()
+        return latencies, errors
+
+    def run(self, name, host, port, path, options):
+        headers = {'Authorization': f'Token {options["token"]}'} if options['token'] else {}
+        deadline = time.monotonic() + options['duration']
+
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(lambda _: self.client(host, port, path, headers, deadline),
+                                        range(options['concurrency'])))
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+
+        if not latencies:
+            self.stdout.write(f'{name:<40} no successful requests ({errors} errors)')
+            return
+
+        def percentile(value):
+            return latencies[min(int(len(latencies) * value), len(latencies) - 1)] * 1e3
+
+        self.stdout.write(f'{name:<40} {len(latencies) / options["duration"]:8.1f} req/s  '
+                          f'p50 {percentile(0.5):7.1f} ms  p95 {percentile(0.95):7.1f} ms  '
+                          f'p99 {percentile(0.99):7.1f} ms  errors {errors}')
+
+    def handle(self, *args, **options):
+        paths = options['path'] or ['/public-laboratories/']
+
+        if options['url']:
+            host, _, port = options['url'].partition(':')
+            for path in paths:
+                self.run(f'{options["url"]} {path}', host, int(port or 80), path, options)
+            return
+
+        for name in options['server'] or ['runserver', 'gunicorn']:
+            environment = dict(os.environ, **SERVER_ENVIRONMENT.get(name, {}))
+            process = subprocess.Popen(SERVERS[name](options['port']), cwd=settings.BASE_DIR, env=environment,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                self.wait_for_port(options['port'], process)
+                for path in paths:
+                    self.run(f'{name} {path}', '127.0.0.1', options['port'], path, options)
+            finally:
+                process.terminate()
+                process.wait()
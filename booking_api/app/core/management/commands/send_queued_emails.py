@@ -0,0 +1,35 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+import time
+
+from core.outbox import send_queued_emails
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to deliver the emails of the outbox"""
+
+    help = 'Send queued emails in batches over a single connection, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the outbox is empty')
+        parser.add_argument('--sleep', type=float, default=2, help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Waiting for emails to send...')
+
+        while True:
+            sent, failed = send_queued_emails(batch_size=options['batch_size'])
+
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+                continue
+
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
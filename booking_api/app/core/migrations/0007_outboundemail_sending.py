@@ -0,0 +1,26 @@
+# Generated by Django 4.1.5 on 2026-10-17 23:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_outboundemail'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboundemail',
+            name='outbox_pending_idx',
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sending'])), fields=['next_attempt_date', 'id'], name='outbox_pending_idx'),
+        ),
+    ]
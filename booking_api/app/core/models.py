@@ -46,3 +46,40 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
+
+
+class OutboundEmail(models.Model):
+    """Email waiting in the outbox, delivered by the send_queued_emails worker"""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    sender = models.CharField(max_length=255, blank=True, default='')
+    recipients = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    # While sending, the end of the lease of the worker
+    next_attempt_date = models.DateTimeField(auto_now_add=True)
+    registration_date = models.DateTimeField(auto_now_add=True)
+    sent_date = models.DateTimeField(blank=True, null=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_date', 'id'], condition=models.Q(status__in=['pending', 'sending']),
+                         name='outbox_pending_idx'),
+        ]
+
+    def get_recipients(self):
+        return [recipient for recipient in self.recipients.split(',') if recipient]
@@ -0,0 +1,115 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from core.models import OutboundEmail
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+
+def enqueue_email(subject, body, recipients, html_body='', sender=''):
+    """
+    Store an email in the outbox.
+
+    The row is written in the caller's transaction, so the email is only sent
+    if the change that triggered it is committed.
+    """
+    return OutboundEmail.objects.create(subject=subject, body=body, html_body=html_body, sender=sender,
+                                        recipients=','.join(recipients))
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: base delay doubled after each failed attempt, capped at one day"""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 24 * 60 * 60))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(email.subject, email.body, email.sender, email.get_recipients(),
+                                     connection=connection)
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def claim_emails(batch_size, lease):
+    """
+    Mark a batch of due emails as being sent and return it.
+
+    The rows are locked with SKIP LOCKED only for this short transaction, so
+    several workers never claim the same email. They are then held by the
+    lease: an email whose worker died is claimed again once it expires.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        emails = list(OutboundEmail.objects.select_for_update(skip_locked=True)
+                      .filter(status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING], next_attempt_date__lte=now)
+                      .order_by('next_attempt_date', 'id')[:batch_size])
+
+        if emails:
+            OutboundEmail.objects.filter(id__in=[email.id for email in emails])\
+                .update(status=OutboundEmail.SENDING, next_attempt_date=now + timedelta(seconds=lease))
+
+    return emails
+
+
+def send_queued_emails(batch_size=None, max_attempts=None):
+    """
+    Send one batch of due emails over a single connection.
+
+    The batch is claimed in a first transaction, sent outside of any, and
+    the results are stored in a second one, so a slow SMTP server holds
+    neither row locks nor a transaction. A failed email is retried with
+    exponential backoff and marked as dead after max_attempts. Returns the
+    (sent, failed) counts.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    max_attempts = max_attempts or getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 8)
+    sent = failed = 0
+
+    emails = claim_emails(batch_size, getattr(settings, 'EMAIL_OUTBOX_LEASE', 600))
+    if not emails:
+        return sent, failed
+
+    connection = get_connection()
+    connection_error = None
+    try:
+        connection.open()
+    except Exception as e:
+        connection_error = e
+
+    for email in emails:
+        error = connection_error
+        if error is None:
+            try:
+                build_message(email, connection).send()
+            except Exception as e:
+                error = e
+
+        if error is None:
+            email.status = OutboundEmail.SENT
+            email.sent_date = timezone.now()
+            sent += 1
+            continue
+
+        print(f'Failed to send email {email.id} to {email.recipients}: {error}')
+        email.status = OutboundEmail.PENDING
+        email.attempts += 1
+        email.last_error = str(error)
+        email.next_attempt_date = timezone.now() + get_retry_delay(email.attempts)
+        if email.attempts >= max_attempts:
+            email.status = OutboundEmail.DEAD
+        failed += 1
+
+    if connection_error is None:
+        connection.close()
+
+    with transaction.atomic():
+        OutboundEmail.objects.bulk_update(emails, ['status', 'sent_date', 'attempts', 'last_error', 'next_attempt_date'])
+
+    return sent, failed
@@ -0,0 +1,169 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core.models import OutboundEmail
+from core.outbox import enqueue_email, send_queued_emails
+from utils import send_custom_email
+
+import datetime
+import io
+
+
+class CountingBackend(BaseEmailBackend):
+    """Locmem-like backend that records how many connections were opened"""
+
+    opened = 0
+    outbox = []
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, email_messages):
+        CountingBackend.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP server unavailable')
+
+
+class InspectingBackend(BaseEmailBackend):
+    """Backend that records the state of the outbox while sending"""
+
+    seen = []
+
+    def send_messages(self, email_messages):
+        InspectingBackend.seen.append((connection.in_atomic_block,
+                                       list(OutboundEmail.objects.values_list('status', flat=True))))
+        return len(email_messages)
+
+
+class OutboxTests(TestCase):
+    """Test the email outbox and its delivery worker"""
+
+    def test_send_custom_email_queues(self):
+        """Test sending an email only writes it to the outbox"""
+        send_custom_email('Booking confirmation', 'booking_cancellation_email_template.html',
+                          {'lab_name': 'Laboratory 1'}, ['student@upb.edu'])
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(email.get_recipients(), ['student@upb.edu'])
+        self.assertIn('Laboratory 1', email.html_body)
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+
+    def test_rolled_back_email_is_not_queued(self):
+        """Test an email queued in a rolled back transaction is dropped with it"""
+        with transaction.atomic():
+            enqueue_email('Subject', 'Body', ['student@upb.edu'])
+            transaction.set_rollback(True)
+
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_worker_sends_batch(self):
+        """Test the worker sends due emails with the locmem backend"""
+        for number in range(3):
+            enqueue_email(f'Subject {number}', 'Body', ['student@upb.edu'], html_body='<p>Body</p>')
+
+        sent, failed = send_queued_emails()
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.SENT).exists())
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_outbox.CountingBackend')
+    def test_worker_reuses_connection(self):
+        """Test a batch is sent over a single connection"""
+        CountingBackend.opened, CountingBackend.outbox = 0, []
+        for number in range(5):
+            enqueue_email(f'Subject {number}', 'Body', ['student@upb.edu'])
+
+        send_queued_emails(batch_size=5)
+
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(CountingBackend.outbox), 5)
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_outbox.FailingBackend', EMAIL_OUTBOX_RETRY_DELAY=10)
+    def test_failure_backs_off(self):
+        """Test a failed email is retried later, with a growing delay"""
+        email = enqueue_email('Subject', 'Body', ['student@upb.edu'])
+
+        self.assertEqual(send_queued_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('unavailable', email.last_error)
+        self.assertGreater(email.next_attempt_date, timezone.now() + datetime.timedelta(seconds=5))
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_date=timezone.now())
+        send_queued_emails()
+        email.refresh_from_db()
+        self.assertGreater(email.next_attempt_date, timezone.now() + datetime.timedelta(seconds=15))
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_outbox.FailingBackend')
+    def test_dead_letter(self):
+        """Test an email is marked as dead after the last attempt"""
+        email = enqueue_email('Subject', 'Body', ['student@upb.edu'])
+
+        for _ in range(3):
+            OutboundEmail.objects.update(next_attempt_date=timezone.now())
+            send_queued_emails(max_attempts=3)
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.DEAD)
+        self.assertEqual(email.attempts, 3)
+
+    def test_command_once(self):
+        """Test the command drains the outbox and exits"""
+        enqueue_email('Subject', 'Body', ['student@upb.edu'])
+
+        call_command('send_queued_emails', '--once', stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_expired_lease_is_claimed_again(self):
+        """Test an email left sending by a dead worker is sent once its lease expires"""
+        email = enqueue_email('Subject', 'Body', ['student@upb.edu'])
+        OutboundEmail.objects.update(status=OutboundEmail.SENDING,
+                                     next_attempt_date=timezone.now() + datetime.timedelta(minutes=5))
+
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        OutboundEmail.objects.update(next_attempt_date=timezone.now())
+        self.assertEqual(send_queued_emails(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.SENT)
+
+
+class OutboxTransactionTests(TransactionTestCase):
+    """Test the worker does not hold a transaction while talking to the SMTP server"""
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_outbox.InspectingBackend')
+    def test_send_outside_transaction(self):
+        """Test emails are claimed as sending and sent outside of any transaction"""
+        InspectingBackend.seen = []
+        enqueue_email('Subject', 'Body', ['student@upb.edu'])
+        enqueue_email('Subject', 'Body', ['teacher@upb.edu'])
+
+        self.assertEqual(send_queued_emails(), (2, 0))
+
+        self.assertEqual(len(InspectingBackend.seen), 2)
+        for in_atomic_block, statuses in InspectingBackend.seen:
+            self.assertFalse(in_atomic_block)
+            self.assertEqual(statuses, [OutboundEmail.SENDING] * 2)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', flat=True)), {OutboundEmail.SENT})
@@ -0,0 +1,62 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+"""
+Gunicorn configuration, loaded automatically from the working directory.
+
+Every value can be overridden with the GUNICORN_* environment variables.
+Send HUP to the master to restart the workers gracefully; with preload
+enabled the code is loaded by the master, so a code change needs USR2
+(new master) followed by TERM to the old master.
+"""
+
+import os
+
+
+def cpu_count():
+    """CPUs available to this process, which may be fewer than the host's in a container"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# GUNICORN_ASGI=1 serves app.asgi with uvicorn workers, for the async/ endpoints
+asgi = bool(int(os.environ.get('GUNICORN_ASGI', default=0)))
+
+if asgi:
+    # Under ASGI every request runs in its own context and would leave its own
+    # persistent connection behind. Use pgbouncer to reuse server connections.
+    os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+wsgi_app = 'app.asgi:application' if asgi else 'app.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker' if asgi else 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', default=cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', default=4))
+
+# Loading Django before forking shares its memory copy-on-write between the
+# workers. Reloading on code changes (development) requires it off.
+reload = bool(int(os.environ.get('GUNICORN_RELOAD', default=0)))
+preload_app = not reload and bool(int(os.environ.get('GUNICORN_PRELOAD', default=1)))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', default=5))
+
+# Recycle workers now and then to bound slow memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', default=100))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading must not be shared by the workers
+    from django.db import connections
+    connections.close_all()
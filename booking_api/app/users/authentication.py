@@ -0,0 +1,167 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from asgiref.sync import sync_to_async
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+import copy
+import threading
+import time
+
+
+class TokenCache:
+    """
+    Bounded, thread safe LRU cache of token key -> (user, token).
+
+    Entries expire after ttl seconds. The entries live in the process, but
+    revocation is shared through a version per token key kept in the Django
+    cache: an entry is only served while the version of its token is still
+    the one read before the token was looked up. revoke() replaces the
+    versions, the signal handlers in users.signals call it once a logout,
+    password change or deactivation is committed, so every worker stops
+    serving the old entry on its next request.
+    """
+
+    version_prefix = 'auth:token-version'
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def version_key(self, key):
+        return f'{self.version_prefix}:{key}'
+
+    def get_version(self, key):
+        """Shared version of a token key, read before looking the token up"""
+        version_key = self.version_key(key)
+        version = cache.get(version_key)
+
+        if version is None:
+            # An expired version only costs a query, the entries holding it are dropped
+            cache.add(version_key, time.time_ns(), timeout=self.ttl + 1)
+            version = cache.get(version_key)
+
+        return version
+
+    def lookup(self, key):
+        """Entry of the process, before its version is checked"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            if entry[3] <= time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return entry
+
+    def check(self, key, entry, version):
+        if entry[2] != version:
+            self.invalidate(key)
+            return None
+
+        return entry[0], entry[1]
+
+    def get(self, key):
+        entry = self.lookup(key)
+        return None if entry is None else self.check(key, entry, cache.get(self.version_key(key)))
+
+    async def aget(self, key):
+        entry = self.lookup(key)
+        return None if entry is None else self.check(key, entry, await cache.aget(self.version_key(key)))
+
+    def set(self, key, user, token, version=None):
+        version = self.get_version(key) if version is None else version
+
+        with self.lock:
+            self.entries[key] = (user, token, version, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def revoke(self, keys):
+        """Make the entries of these token keys stale in every process"""
+        for key in keys:
+            self.invalidate(key)
+        cache.set_many({self.version_key(key): time.time_ns() for key in keys}, timeout=self.ttl + 1)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            for key in [key for key, (user, _, _, _) in self.entries.items() if user.pk == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+token_cache = TokenCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 10000), getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the Token and User query for recently seen tokens"""
+
+    def get_key(self, request):
+        """Token key of the Authorization header, None when the header is not a token one"""
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed('Invalid token header. No credentials provided.')
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain spaces.')
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                'Invalid token header. Token string should not contain invalid characters.')
+
+    def authenticate(self, request):
+        key = self.get_key(request)
+        return None if key is None else self.authenticate_credentials(key)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views, only a cache miss goes to the database"""
+        key = self.get_key(request)
+        if key is None:
+            return None
+
+        cached = await token_cache.aget(key)
+        if cached is not None:
+            user, token = cached
+            return copy.copy(user), token
+
+        return await sync_to_async(self.authenticate_credentials)(key)
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Each request gets its own instance, views may modify request.user
+            return copy.copy(user), token
+
+        # Read before the query, a revocation committed after it changes the version
+        version = token_cache.get_version(key)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token, version)
+        return copy.copy(user), token
@@ -0,0 +1,53 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from core.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.crypto import get_random_string
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.authentication import CachedTokenAuthentication, token_cache
+import time
+
+
+class Command(BaseCommand):
+    """Django command to compare the per-request cost of token authentication"""
+
+    help = 'Authenticate the same token repeatedly with TokenAuthentication and CachedTokenAuthentication. ' \
+           'All rows are rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def measure(self, authentication, request, count):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(count):
+                authentication.authenticate(request)
+            elapsed = time.perf_counter() - started
+
+        return elapsed / count * 1e6, len(queries) / count
+
+    def handle(self, *args, **options):
+        count = options['requests']
+
+        with transaction.atomic():
+            user = User.objects.create(email=f'benchmark-{get_random_string(8)}@upb.edu', is_active=True)
+            token = Token.objects.create(user=user)
+            request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}'))
+
+            token_cache.clear()
+            for name, authentication in (('TokenAuthentication', TokenAuthentication()),
+                                         ('CachedTokenAuthentication', CachedTokenAuthentication())):
+                per_request, queries = self.measure(authentication, request, count)
+                self.stdout.write(f'{name:<28} {per_request:8.1f} us/request  {queries:.3f} queries/request')
+
+            token_cache.clear()
+            transaction.set_rollback(True)
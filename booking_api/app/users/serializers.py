@@ -6,6 +6,7 @@ Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.models import Group
+from django.db import transaction
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from rest_framework import serializers
@@ -37,6 +38,7 @@ class UserSerializer(serializers.ModelSerializer):
                   'country', 'time_zone')
         extra_kwargs = {'password': {'write_only': True, 'min_length': 8}}
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create a new user with encrypted password and return it"""
         user = get_user_model().objects.create_user(**validated_data)
@@ -0,0 +1,61 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from users.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+    # Other processes are told once the logout is committed, before it they could cache the token again
+    transaction.on_commit(lambda: token_cache.revoke([instance.key]))
+
+
+# Fields whose change must end the sessions of a user in every process
+REVOKING_FIELDS = ('password', 'is_active')
+
+
+def revoking_state(instance):
+    # Deferred fields are left out instead of being loaded
+    return {field: instance.__dict__.get(field) for field in REVOKING_FIELDS}
+
+
+@receiver(post_init, sender=get_user_model())
+def snapshot_user(sender, instance, **kwargs):
+    instance._revoking_state = revoking_state(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+
+    state = revoking_state(instance)
+    changed = state != getattr(instance, '_revoking_state', state)
+    instance._revoking_state = state
+
+    # The user of this process is refreshed after a profile change, other processes keep it up to the ttl
+    token_cache.invalidate_user(instance.pk)
+    if changed:
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def invalidate_deleted_user_tokens(sender, instance, **kwargs):
+    # Before the tokens are deleted with the user
+    token_cache.invalidate_user(instance.pk)
+    revoke_user_tokens(instance.pk)
+
+
+def revoke_user_tokens(user_id):
+    keys = list(Token.objects.filter(user_id=user_id).values_list('key', flat=True))
+    if keys:
+        transaction.on_commit(lambda: token_cache.revoke(keys))
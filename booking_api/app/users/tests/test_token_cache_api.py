@@ -0,0 +1,142 @@
+"""
+Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+MIT License - See LICENSE file in the root directory
+Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.authentication import TokenCache, token_cache
+
+ME_URL = reverse('users:me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication"""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123', name='Test')
+        self.user.is_active = True
+        self.user.save()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        """Test a cached token is authenticated without querying the database"""
+        self.client.get(ME_URL)
+
+        # Only the groups of the profile are queried
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_deleted_token_is_rejected(self):
+        """Test logging out (deleting the token) invalidates the cache"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating the user invalidates the cache"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_refreshes_user(self):
+        """Test a password change drops the cached user"""
+        self.client.get(ME_URL)
+
+        self.user.set_password('NewPassword123')
+        self.user.save()
+
+        self.assertEqual(len(token_cache), 0)
+
+    def test_last_login_keeps_token_cached(self):
+        """Test logging in, or another save not touching the password or is_active, revokes nothing"""
+        self.client.get(ME_URL)
+        other = TokenCache(max_size=2, ttl=60)
+        other.set(self.token.key, self.user, self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+        self.assertEqual(len(token_cache), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = 'Renamed'
+            self.user.save()
+
+        self.assertIsNotNone(other.get(self.token.key))
+        self.assertEqual(self.client.get(ME_URL).data['name'], 'Renamed')
+
+    def test_deleted_user_is_revoked_between_processes(self):
+        """Test deleting a user revokes its token in another process"""
+        other = TokenCache(max_size=2, ttl=60)
+        other.set(self.token.key, self.user, self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertIsNone(other.get(self.token.key))
+
+    def test_logout_is_shared_between_processes(self):
+        """Test a token deleted in one process is not served by another"""
+        other = TokenCache(max_size=2, ttl=60)
+        other.set(self.token.key, self.user, self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+
+        self.assertIsNone(other.get(self.token.key))
+
+    def test_deactivation_is_shared_between_processes(self):
+        """Test a user deactivated in one process is not served by another"""
+        other = TokenCache(max_size=2, ttl=60)
+        other.set(self.token.key, self.user, self.token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertIsNone(other.get(self.token.key))
+
+
+class TokenCacheTests(TestCase):
+    """Test the bounds of the token cache"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('test@upb.edu', 'Password123')
+
+    def test_least_recently_used_is_evicted(self):
+        """Test the cache never grows past its size"""
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', self.user, None)
+        cache.set('b', self.user, None)
+        cache.get('a')
+        cache.set('c', self.user, None)
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        """Test entries are not served after their ttl"""
+        cache = TokenCache(max_size=2, ttl=0)
+        cache.set('a', self.user, None)
+
+        self.assertIsNone(cache.get('a'))
@@ -4,36 +4,55 @@ MIT License - See LICENSE file in the root directory
 Adriana Orellana, Angel Zenteno, Boris Pedraza, Alex Villazon, Omar Ormachea
 """
 
+from core.outbox import enqueue_email
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import EmailMultiAlternatives, BadHeaderError
-from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-import pytz
+import functools
 import six
 
+try:
+  import zoneinfo
+except ImportError:
+  # Python 3.8, installed along with Django
+  from backports import zoneinfo
+
 class TokenGenerator(PasswordResetTokenGenerator):
     def _make_hash_value(self, user, timestamp):
         return (six.text_type(user.pk) + six.text_type(timestamp) + six.text_type(user.is_active))
 account_activation_token = TokenGenerator()
 
 def send_custom_email(subject, template_name, context, recipient):
+  """Render the email and queue it in the outbox, the send_queued_emails worker delivers it"""
   email_body = render_to_string(template_name, context)
   email_body_plain = strip_tags(email_body)
   sender = settings.EMAIL_HOST_USER
 
+  if '\n' in subject or '\r' in subject:
+    print(f'Invalid header found, email to {recipient} not queued')
+    return
+
+  print(f'Queueing email to {recipient}')
+  enqueue_email(subject, email_body_plain, recipient, html_body=email_body, sender=sender)
+
+@functools.lru_cache(maxsize=256)
+def get_time_zone(name):
+  """Time zone by name, looked up once per process. Unknown or empty names fall back to UTC"""
   try:
-    print(f'Sending email to {recipient}')
-    msg = EmailMultiAlternatives(subject, email_body_plain, sender, recipient)
-    msg.attach_alternative(email_body, 'text/html')
-    msg.send()
-  except BadHeaderError:
-    return HttpResponse('Invalid header found.')
-  except Exception as e:
-    print(f'An unexpected error occurred: {e}')
+    return zoneinfo.ZoneInfo(name)
+  except (zoneinfo.ZoneInfoNotFoundError, ValueError, TypeError):
+    return zoneinfo.ZoneInfo('UTC')
+
+def get_user_time_zone(user):
+  """Time zone of an already loaded user, no query is made"""
+  return get_time_zone(getattr(user, 'time_zone', None))
+
+def localize_datetimes(input_dates, target_time_zone):
+  """Convert a batch of aware datetimes to a time zone (name or tzinfo), resolving the zone once"""
+  if isinstance(target_time_zone, str):
+    target_time_zone = get_time_zone(target_time_zone)
+  return [input_date.astimezone(target_time_zone) for input_date in input_dates]
 
 def get_correct_datetime(input_date, target_time_zone):
-  target_time_zone = pytz.timezone(target_time_zone)
-  target_date = input_date.astimezone(target_time_zone)
-  return target_time_zone.normalize(target_date)
+  return localize_datetimes((input_date,), target_time_zone)[0]
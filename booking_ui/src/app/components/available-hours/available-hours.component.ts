@@ -7,6 +7,7 @@
 import { Component, Input, OnInit } from '@angular/core';
 import { Output, EventEmitter } from '@angular/core';
 import { AvailableDate } from 'src/app/interfaces/available-date';
+import { Booking } from 'src/app/interfaces/booking';
 
 @Component({
   selector: 'app-available-hours',
@@ -14,12 +15,12 @@ import { AvailableDate } from 'src/app/interfaces/available-date';
   styleUrls: ['./available-hours.component.css'],
 })
 export class AvailableHoursComponent implements OnInit {
-  bookingId: number = 0;
+  selectedBooking: Booking | null = null;
 
   @Input() hours: AvailableDate[] = [];
   @Input() showSpinner: boolean = true;
 
-  @Output() selectedHourEvent = new EventEmitter<number>();
+  @Output() selectedHourEvent = new EventEmitter<Booking>();
   @Output() unavailableHoursEvent = new EventEmitter<number>();
 
   constructor() {}
@@ -29,11 +30,11 @@ export class AvailableHoursComponent implements OnInit {
   ngOnChanges() {
     if (this.hours.length == 0) {
       this.unavailableHoursEvent.emit();
-      this.bookingId = 0;
+      this.selectedBooking = null;
     }
   }
 
   updateSelectedHour(): void {
-    this.selectedHourEvent.emit(this.bookingId);
+    if (this.selectedBooking) this.selectedHourEvent.emit(this.selectedBooking);
   }
 }
@@ -12,7 +12,6 @@ import { MatDialogRef, MAT_DIALOG_DATA } from '@angular/material/dialog';
 import { ToastrService } from 'ngx-toastr';
 import { LabDescriptionComponent } from 'src/app/pages/lab-description/lab-description.component';
 import { LabService } from 'src/app/services/lab.service';
-import { lastValueFrom } from 'rxjs';
 import { Lab } from 'src/app/interfaces/lab';
 
 @Component({
@@ -86,12 +85,7 @@ export class LabDialogComponent implements OnInit {
     this.cleanDescription();
 
     if (!this.arraysAreEqual(this.labDescription.components, (this.labDescription.myLabContent || []))) {
-      var descriptionParams = await this.getDescriptionParams(this.labDescription.components);
-      if (descriptionParams.length == 0) {
-        await lastValueFrom(this.labService.deleteLabContent(this.selectedLabId));
-      } else {
-        await this.labService.postLabContent(descriptionParams);
-      }
+      await this.labService.saveLabContents(this.selectedLabId, this.labDescription.components);
     }
 
     if (this.labForm.valid) {
@@ -131,40 +125,6 @@ export class LabDialogComponent implements OnInit {
       });
   }
 
-  async getDescriptionParams(descriptionArray: any[]) {
-    var params: any[] = [];
-    for (var i = 0; i < descriptionArray.length; i++) {
-      if (descriptionArray[i]['image'] && typeof descriptionArray[i]['image'] == 'string') {
-        var blobImage = await lastValueFrom(
-          this.labService.getLabFile(descriptionArray[i]['image'])
-        );
-        var fileType = this.getImageName(descriptionArray[i]['image']);
-        const file = new File([blobImage], fileType);
-        params.push({
-          laboratory: this.selectedLabId,
-          order: i + 1,
-          image: file,
-        });
-      } else if (descriptionArray[i]['video'] && typeof descriptionArray[i]['video'] == 'string') {
-        var blobVideo = await lastValueFrom(
-          this.labService.getLabFile(descriptionArray[i]['video'])
-        );
-        var fileType = this.getImageName(descriptionArray[i]['video']);
-        const file = new File([blobVideo], fileType);
-        params.push({
-          laboratory: this.selectedLabId,
-          order: i + 1,
-          video: file,
-        });
-      } else {
-        descriptionArray[i].laboratory = this.selectedLabId;
-        descriptionArray[i].order = i + 1;
-        params.push(descriptionArray[i]);
-      }
-    }
-    return params;
-  }
-
   trimAndValidateUrl(control: AbstractControl) {
     const value = control.value;
     if (typeof value === 'string') {
@@ -4,10 +4,12 @@
 * MIT License - See LICENSE file in the root directory
 */
 
+import { Booking } from './booking';
+
 export interface AvailableDate {
   formattedDate: string;
   hour: {
-    bookingId: number;
+    booking: Booking;
     formattedStartHour: string;
     formattedEndHour: string;
   };
@@ -0,0 +1,15 @@
+/*
+* Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+* Adriana Orellana, Angel Zenteno, Alex Villazon, Omar Ormachea
+* MIT License - See LICENSE file in the root directory
+*/
+
+export interface BookingCalendar {
+  time_zone: string;
+  group: string;
+  periods: {
+    period: string;
+    free: number;
+    taken: number;
+  }[];
+}
@@ -5,7 +5,8 @@
 */
 
 export interface Booking {
-  id: number;
+  // null for an open slot of a virtual timeframe, addressed by timeframe and slot
+  id: number | null;
   start_date?: string;
   end_date?: string;
   available: boolean;
@@ -15,4 +16,6 @@ export interface Booking {
   owner?: number | null;
   reserved_by?: { email: string; last_name: string; name: string } | null;
   equipment?: number;
+  timeframe?: number;
+  slot?: number;
 }
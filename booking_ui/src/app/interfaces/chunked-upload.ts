@@ -0,0 +1,12 @@
+/*
+* Copyright (c) Universidad Privada Boliviana (UPB) - EUBBC-Digital
+* Adriana Orellana, Angel Zenteno, Alex Villazon, Omar Ormachea
+* MIT License - See LICENSE file in the root directory
+*/
+
+export interface ChunkedUpload {
+  id: string;
+  filename: string;
+  size: number;
+  offset: number;
+}
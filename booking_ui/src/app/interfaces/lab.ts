@@ -4,6 +4,11 @@
 * MIT License - See LICENSE file in the root directory
 */
 
+export interface ImageVariants {
+  thumbnail?: string;
+  medium?: string;
+}
+
 export interface Lab {
   id?: number;
   name?: string;
@@ -11,6 +16,7 @@ export interface Lab {
   university?: string;
   course?: string;
   image?: any;
+  image_variants?: ImageVariants;
   description?: string;
   url?: string;
   enabled?: boolean;
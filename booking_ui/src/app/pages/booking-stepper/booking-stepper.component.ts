@@ -10,7 +10,7 @@ import { BreakpointObserver } from '@angular/cdk/layout';
 import { MatStepper, StepperOrientation } from '@angular/material/stepper';
 import { CountdownComponent, CountdownEvent } from 'ngx-countdown';
 import { ActivatedRoute } from '@angular/router';
-import { Observable } from 'rxjs';
+import { Observable, forkJoin } from 'rxjs';
 import { map, switchMap } from 'rxjs/operators';
 import * as moment from 'moment';
 
@@ -56,6 +56,7 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
 
   cols: number;
   bookingId: number = 0;
+  selectedBooking: Booking | null = null;
 
   minDate = new Date();
   maxDate = new Date(new Date().setMonth(new Date().getMonth() + 5));
@@ -69,6 +70,7 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
   equipments: Equipment[] = [];
   availableHoursBySelectedDate: AvailableDate[] = [];
   availableDates: AvailableDate[] = [];
+  freeSlotsByDate: { [date: string]: number } = {};
 
   isEditable: boolean = true;
   showSpinner: boolean = false;
@@ -165,11 +167,7 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
   }
 
   getAvailableReservationsByDate(date: string): number {
-    let reservations = this.availableDates.filter(
-      (availableDate) => availableDate.formattedDate == date
-    );
-
-    return reservations.length;
+    return this.freeSlotsByDate[date] || 0;
   }
 
   handleSize(event: any) {
@@ -237,9 +235,30 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
 
     this.availableDates = [];
 
-    this.bookingService
-      .getBookingListByEquipmentId(equipmentId)
-      .subscribe((bookingList) => {
+    const rangeFormat = 'YYYY-MM-DDTHH:mm:ss[Z]';
+    const selectedDay = moment(selectedDate).startOf('day');
+
+    // Free slot counts per day for the month view, and the slots of the selected day only
+    forkJoin({
+      calendar: this.bookingService.getBookingCalendar(
+        equipmentId,
+        moment(this.minDate).startOf('day').utc().format(rangeFormat),
+        moment(this.maxDate).endOf('day').utc().format(rangeFormat)
+      ),
+      bookingList: this.bookingService.getBookingListByEquipmentIdAndRange(
+        equipmentId,
+        selectedDay.clone().utc().format(rangeFormat),
+        selectedDay.clone().add(1, 'day').utc().format(rangeFormat)
+      ),
+    }).subscribe(({ calendar, bookingList }) => {
+        this.freeSlotsByDate = {};
+        calendar.periods.forEach((period) => {
+          let formattedDate = moment(period.period, 'YYYY-MM-DD').format(
+            this.dateFormat
+          );
+          this.freeSlotsByDate[formattedDate] = period.free;
+        });
+
         bookingList.forEach((booking) => {
           if (
             booking.available &&
@@ -263,7 +282,7 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
             let availableDate = {
               formattedDate: formattedDate,
               hour: {
-                bookingId: booking.id,
+                booking: booking,
                 formattedStartHour: formattedStartHour,
                 formattedEndHour: formattedEndHour,
               },
@@ -298,8 +317,8 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
     return moment(date).format(format);
   }
 
-  updateSelectedHour(bookingId: number): void {
-    this.reservationFormGroup.controls['selectedHour'].setValue(bookingId);
+  updateSelectedHour(booking: Booking): void {
+    this.reservationFormGroup.controls['selectedHour'].setValue(booking);
   }
 
   onSelectDate(event: any): void {
@@ -314,11 +333,12 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
 
     this.getUserBookingAvailability(equipmentId!).subscribe(userBookingAvailability => {
       if (userBookingAvailability) {
-        this.bookingId = this.reservationFormGroup.controls['selectedHour'].value;
+        const selectedBooking: Booking = this.reservationFormGroup.controls['selectedHour'].value;
 
-        this.bookingService.getBookingById(this.bookingId).subscribe(async (booking) => {
+        this.bookingService.getBooking(selectedBooking).subscribe(async (booking) => {
           if (booking !== undefined && booking.available) {
             this.isFirstStepCompleted = true;
+            this.selectedBooking = selectedBooking;
             this.saveReservation();
           } else {
             this.toastService.error(
@@ -348,32 +368,17 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
     };
 
     if (!this.confirmedReservation) {
+      // Registering gives virtual slots their booking id, used from then on
+      booking = {
+        ...booking,
+        id: this.selectedBooking!.id,
+        timeframe: this.selectedBooking!.timeframe,
+        slot: this.selectedBooking!.slot,
+      };
       this.countdown.restart();
-      this.bookingService.registerBooking(booking).subscribe((updatedBooking) => {
-        this.userService.getUserData().subscribe((response) => {
-          if (response && response.id == updatedBooking.reserved_by) {
-            this.privateAccessUrl = `${this.selectedLab.url}?${config.urlParams.accessKey}=${updatedBooking.access_key}&${config.urlParams.password}=${updatedBooking.password}`;
-            this.publicAccessUrl = this.publicReservation
-              ? `${this.selectedLab.url}?${config.urlParams.accessKey}=${updatedBooking.access_key}`
-              : '';
-            this.reservationDate = moment(updatedBooking.start_date).format(
-              this.dateTimeFormat
-            );
-
-            this.stepper.next();
-          } else {
-            this.toastService.error(
-              'This booking is not available. Please choose another.'
-            );
-
-            this.getHoursByEquipmentIdAndDate(
-              this.selectedEquipment.id!,
-              this.selectedDate
-            );
-
-            this.bookingId = 0;
-          }
-        });
+      this.bookingService.registerBooking(booking).subscribe({
+        next: (updatedBooking) => this.onBookingRegistered(updatedBooking),
+        error: (_) => this.onBookingUnavailable(),
       });
     } else {
       this.bookingService.confirmBooking(booking).subscribe((confirmedBooking) => {
@@ -389,6 +394,38 @@ export class BookingStepperComponent implements OnInit, ComponentCanDeactivate {
     }
   }
 
+  onBookingRegistered(updatedBooking: Booking): void {
+    this.userService.getUserData().subscribe((response) => {
+      if (response && response.id == updatedBooking.reserved_by) {
+        this.bookingId = updatedBooking.id!;
+        this.privateAccessUrl = `${this.selectedLab.url}?${config.urlParams.accessKey}=${updatedBooking.access_key}&${config.urlParams.password}=${updatedBooking.password}`;
+        this.publicAccessUrl = this.publicReservation
+          ? `${this.selectedLab.url}?${config.urlParams.accessKey}=${updatedBooking.access_key}`
+          : '';
+        this.reservationDate = moment(updatedBooking.start_date).format(
+          this.dateTimeFormat
+        );
+
+        this.stepper.next();
+      } else {
+        this.onBookingUnavailable();
+      }
+    });
+  }
+
+  onBookingUnavailable(): void {
+    this.toastService.error(
+      'This booking is not available. Please choose another.'
+    );
+
+    this.getHoursByEquipmentIdAndDate(
+      this.selectedEquipment.id!,
+      this.selectedDate
+    );
+
+    this.bookingId = 0;
+  }
+
   undoReservation(): void {
     if (this.bookingId !== 0) {
       let booking: Booking = {
@@ -9,6 +9,7 @@ import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import config from '../config.json';
 import { Booking } from '../interfaces/booking';
+import { BookingCalendar } from '../interfaces/booking-calendar';
 
 @Injectable({
   providedIn: 'root',
@@ -19,22 +20,65 @@ export class BookingService {
   constructor(private http: HttpClient) {}
 
   getBookingListByEquipmentId(equipmentId: number): Observable<Booking[]> {
-    let params = new HttpParams().set('equipment', equipmentId);
+    let params = new HttpParams()
+      .set('equipment', equipmentId)
+      .set('paginate', false);
 
     return this.http.get<Booking[]>(this.url, { params });
   }
 
+  getBookingListByEquipmentIdAndRange(
+    equipmentId: number,
+    startDate: string,
+    endDate: string
+  ): Observable<Booking[]> {
+    let params = new HttpParams()
+      .set('equipment', equipmentId)
+      .set('start_date', startDate)
+      .set('end_date', endDate)
+      .set('paginate', false);
+
+    return this.http.get<Booking[]>(this.url, { params });
+  }
+
+  getBookingCalendar(
+    equipmentId: number,
+    startDate: string,
+    endDate: string
+  ): Observable<BookingCalendar> {
+    let url = `${this.url}${config.api.booking.calendar}`;
+    let params = new HttpParams()
+      .set('equipment', equipmentId)
+      .set('start_date', startDate)
+      .set('end_date', endDate);
+
+    return this.http.get<BookingCalendar>(url, { params });
+  }
+
   getBookingById(id: number): Observable<Booking> {
     return this.http.get<Booking>(`${this.url}${id}/`);
   }
 
+  getBooking(booking: Booking): Observable<Booking> {
+    return this.http.get<Booking>(this.getBookingUrl(booking));
+  }
+
   registerBooking(booking: Booking): Observable<Booking> {
     return this.http.patch<Booking>(
-      `${this.url}${booking.id}/?register=true`,
+      `${this.getBookingUrl(booking)}?register=true`,
       booking
     );
   }
 
+  // Open slots of virtual timeframes have no booking row yet, the API
+  // creates it when the slot is registered
+  private getBookingUrl(booking: Booking): string {
+    if (booking.id == null && booking.timeframe != null && booking.slot != null)
+      return `${config.api.baseUrl}${config.api.timeframes}${booking.timeframe}/${config.api.booking.slots}${booking.slot}/`;
+
+    return `${this.url}${booking.id}/`;
+  }
+
   confirmBooking(booking: Booking): Observable<Booking> {
     return this.http.patch<Booking>(
       `${this.url}${booking.id}/?confirmed=true`,
@@ -55,7 +99,9 @@ export class BookingService {
 
   getPersonalBookingList(): Observable<Booking[]> {
     let url = `${config.api.baseUrl}${config.api.booking.myList}`;
-    return this.http.get<Booking[]>(url);
+    let params = new HttpParams().set('paginate', false);
+
+    return this.http.get<Booking[]>(url, { params });
   }
 
   getPublicReservations(
@@ -64,7 +110,7 @@ export class BookingService {
     endDate: string
   ): Observable<Booking[]> {
     let url = `${config.api.baseUrl}${config.api.booking.publicReservations}`;
-    let params = new HttpParams();
+    let params = new HttpParams().set('paginate', false);
 
     if (equipmentId != 0) params = params.append('equipment', equipmentId);
 
@@ -19,11 +19,14 @@ export class EquipmentService {
   constructor(private http: HttpClient) {}
 
   getEquipments(): Observable<Equipment[]> {
-    return this.http.get<Equipment[]>(this.url);
+    const params = new HttpParams().set('paginate', false);
+    return this.http.get<Equipment[]>(this.url, { params });
   }
 
   getEquipmentsByLabId(labId: number): Observable<Equipment[]> {
-    const params = new HttpParams().set('laboratory', labId);
+    const params = new HttpParams()
+      .set('laboratory', labId)
+      .set('paginate', false);
     return this.http.get<Equipment[]>(this.url, { params });
   }
 
@@ -8,6 +8,7 @@ import { Injectable } from '@angular/core';
 import { HttpClient, HttpParams, HttpHeaders } from '@angular/common/http';
 import { Observable, lastValueFrom } from 'rxjs';
 import { Lab } from '../interfaces/lab';
+import { ChunkedUpload } from '../interfaces/chunked-upload';
 import config from '../config.json';
 
 @Injectable({
@@ -15,6 +16,8 @@ import config from '../config.json';
 })
 export class LabService {
   private url: string = `${config.api.baseUrl}${config.api.labs}`;
+  private uploadChunkSize: number = 5 * 1024 * 1024;
+  private uploadRetries: number = 3;
 
   constructor(private http: HttpClient) { }
 
@@ -83,29 +86,61 @@ export class LabService {
     return this.http.delete(url);
   }
 
-  async postLabContent(params: any) {
-    var url: string = `${config.api.baseUrl}${config.api.labs}${config.api.content}`;
-
-    for (var i = 0; i < params.length; i++) {
-      var element = params[i];
-
-      var formData = new FormData();
-      if (element.title) formData.append("title", element.title);
-      if (element.subtitle) formData.append("subtitle", element.subtitle);
-      if (element.image) formData.append("image", element.image);
-      if (element.link) formData.append("link", element.link);
-      if (element.video) formData.append("video", element.video);
-      if (element.text) formData.append("text", element.text);
-      if (element.video_link) formData.append("video_link", element.video_link);
-      formData.append("order", element.order);
-      formData.append("laboratory", element.laboratory);
+  /**
+   * Replace the contents of a laboratory in a single request. New images are
+   * sent as file parts, new videos as chunked uploads, and existing files are
+   * referenced by their URL instead of being sent again.
+   */
+  async saveLabContents(labId: number, components: any[]) {
+    var url: string = `${config.api.baseUrl}${config.api.labs}${labId}/${config.api.content}${config.api['content-batch']}`;
+    var formData = new FormData();
+    var contents: any[] = [];
+
+    for (var i = 0; i < components.length; i++) {
+      const field = Object.keys(components[i])[0];
+      var value = components[i][field];
+      if (!value) continue;
+
+      if (value instanceof File && field == 'video') {
+        value = (await this.uploadVideo(value)).id;
+      } else if (value instanceof File) {
+        formData.append(`file${i}`, value);
+        value = `file${i}`;
+      }
+      contents.push({ [field]: value });
+    }
 
-      if (i == params.length - 1) formData.append("is_last", "true");
-      else formData.append("is_last", "false");
+    formData.append('contents', JSON.stringify(contents));
+    return lastValueFrom(this.http.put<any>(url, formData));
+  }
 
-      await lastValueFrom(this.http.post<any>(url, formData));
+  /**
+   * Send a video in chunks. A failed chunk is resent from the offset the API
+   * kept, so a dropped connection does not restart the upload.
+   */
+  async uploadVideo(video: File) {
+    var url: string = `${config.api.baseUrl}${config.api.labs}${config.api.content}${config.api.uploads}`;
+    var upload = await lastValueFrom(this.http.post<ChunkedUpload>(url, { filename: video.name, size: video.size }));
+    const uploadUrl = `${url}${upload.id}/`;
+    var failures = 0;
+
+    while (upload.offset < video.size) {
+      const headers = new HttpHeaders({
+        'Upload-Offset': String(upload.offset),
+        'Content-Type': 'application/offset+octet-stream',
+      });
+
+      try {
+        const chunk = video.slice(upload.offset, upload.offset + this.uploadChunkSize);
+        upload = await lastValueFrom(this.http.patch<ChunkedUpload>(uploadUrl, chunk, { headers }));
+        failures = 0;
+      } catch (error) {
+        if (++failures > this.uploadRetries) throw error;
+        upload = await lastValueFrom(this.http.get<ChunkedUpload>(uploadUrl));
+      }
     }
 
+    return upload;
   }
 
   deleteLab(lab: Lab) {
@@ -19,11 +19,14 @@ export class TimeframeService {
   constructor(private http: HttpClient) {}
 
   getTimeframes(): Observable<Timeframe[]> {
-    return this.http.get<Timeframe[]>(this.url);
+    const params = new HttpParams().set('paginate', false);
+    return this.http.get<Timeframe[]>(this.url, { params });
   }
 
   getTimeframeByEquipmentId(id: number): Observable<Timeframe[]> {
-    const params = new HttpParams().set('equipment', id);
+    const params = new HttpParams()
+      .set('equipment', id)
+      .set('paginate', false);
     return this.http.get<Timeframe[]>(this.url, { params });
   }
 
@@ -45,18 +45,15 @@ export class RemoteLabComponent implements AfterViewInit {
   }
 
   getBookingInformation(): void{
-    this.bookingService.getBookingInfo(accessKey!, pwd!).subscribe( (response) => {
-      const data = response;
-      if (!data.length) {
+    this.bookingService.getAccessVerdict(accessKey!, pwd!).subscribe( (verdict) => {
+      if (!verdict.granted) {
         console.log('Access Denied');
         // your remote lab logic to deny access
         window.location.href = "https://eubbc-digital.upb.edu/booking/";
       } else {
         console.log('Access Granted');
-        // your remote lab logic to grant access
-        const endTime = Date.parse(data[0].end_date);
-        const date = Date.now();
-        labTime = Math.ceil((endTime - date) / 1000);
+        // your remote lab logic to grant access, the verdict holds until the booking ends
+        labTime = verdict.expires_in!;
       }
       this.config = {leftTime: labTime, notify: [60, 30], demand: false};
       this.countdown.begin();
@@ -0,0 +1,7 @@
+export interface AccessVerdict {
+  granted: boolean;
+  reason: 'granted' | 'invalid' | 'not_started' | 'ended';
+  start_date?: string;
+  end_date?: string;
+  expires_in?: number;
+}
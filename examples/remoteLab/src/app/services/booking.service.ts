@@ -2,14 +2,16 @@ import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 
 import config from '../../config.json';
-import { Observable } from 'rxjs';
+import { Observable, catchError, of } from 'rxjs';
 import { Booking } from '../interfaces/booking';
+import { AccessVerdict } from '../interfaces/access-verdict';
 
 @Injectable({
   providedIn: 'root',
 })
 export class BookingService {
   private bookingAccessUrl = config.bookingAccessUrl;
+  private bookingAccessVerdictUrl = config.bookingAccessVerdictUrl;
 
   constructor(private http: HttpClient) {}
 
@@ -19,4 +21,13 @@ export class BookingService {
     );
   }
 
+  getAccessVerdict(accessId: string, password: string): Observable<AccessVerdict> {
+    // A denied verdict is answered with 403 and the verdict as body
+    return this.http.get<AccessVerdict>(
+      `${this.bookingAccessVerdictUrl}?access_key=${accessId}&pwd=${password}`
+    ).pipe(
+      catchError((error) => of<AccessVerdict>(error.error ?? { granted: false, reason: 'invalid' }))
+    );
+  }
+
 }